@@ -87,7 +87,6 @@ def runSPH(G, pin_map, xs_name, mapping):
 
     # Create the initial SPH factors
     old_mu = np.ones((mapping.nCG, nPin))
-    fname = '_homo.'.join(xs_name.split('.')).replace('XS/', data_path + '/')
 
     # Solve for the reference problem
     ref = DGMSOLVER(G, xs_name, fm, cm, mm, nPin, mapping=mapping)
@@ -97,8 +96,8 @@ def runSPH(G, pin_map, xs_name, mapping):
 
     ref_XS = XS(ref.sig_t_homo, ref.sig_f_homo, ref.chi_homo, ref.sig_s_homo)
 
-    # Write the reference cross sections
-    ref_XS.write_homogenized_XS(fname, old_mu)
+    # Homogenize the reference cross sections
+    homo_XS = ref_XS.homogenized_XS(old_mu)
 
     ref_rate = ref.phi_homo * ref.sig_t_homo
     print(ref_rate)
@@ -112,7 +111,7 @@ def runSPH(G, pin_map, xs_name, mapping):
 
     for i in range(100000):
         # Get the homogenized solution
-        homo = DGMSOLVER(nCG, fname, fm, cm, mm, nPin, ref.norm, k=iter_k, phi=iter_phi, psi=iter_psi)
+        homo = DGMSOLVER(nCG, None, fm, cm, mm, nPin, ref.norm, XS=homo_XS, k=iter_k, phi=iter_phi, psi=iter_psi)
         iter_k = homo.iter_k
         iter_phi = homo.iter_phi
         iter_psi = homo.iter_psi
@@ -120,8 +119,8 @@ def runSPH(G, pin_map, xs_name, mapping):
         # Compute the SPH factors
         mu = ref.phi_homo / homo.phi_homo
 
-        # Write the new cross sections adjusted by SPH
-        ref_XS.write_homogenized_XS(fname, mu)
+        # Adjust the cross sections by SPH
+        homo_XS = ref_XS.homogenized_XS(mu)
 
         # Compute the error in reaction rates
         homo_rate = homo.phi_homo * homo.sig_t_homo
@@ -77,22 +77,21 @@ def run_reference(G, mmap, xs_name, mapping):
 
 def run_homogenized(G, mmap, xs_name, mapping, order, useSPH=True):
     print('running the homogenized problem')
-    # Write the homogenized cross sections
+    # Load the homogenized cross sections
     refXS = pickle.load(open('{}/refXS_sph_{}_o{}.p'.format(data_path, G, order), 'rb'))
 
-    xs_name = '_homo_o{}.'.join(xs_name.split('.')).format(order)
     if useSPH:
-        refXS.write_homogenized_XS(xs_name)
+        homo_XS = refXS.homogenized_XS()
         extra = ''
     else:
-        refXS.write_homogenized_XS(xs_name, np.ones(refXS.sig_t.shape))
+        homo_XS = refXS.homogenized_XS(np.ones(refXS.sig_t.shape))
         extra = '_nosph'
 
     # Build the reference geometry
     nPin, fm, cm, mm = buildGEO(mmap, True)
 
     # Run the homogenized problem
-    homo = sph.DGMSOLVER(mapping.nCG, xs_name, fm, cm, mm, nPin, vacuum=False)
+    homo = sph.DGMSOLVER(mapping.nCG, None, fm, cm, mm, nPin, XS=homo_XS, vacuum=False)
 
     # Save the flux and cross sections
     np.save('{}/homo_phi_{}{}_o{}'.format(data_path, G, extra, order), homo.phi)
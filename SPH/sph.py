@@ -13,6 +13,22 @@ class XS():
         self.sig_s = sig_s
         self.mu = mu if mu is None else np.ones(self.sig_t.shape)
 
+    def homogenized_XS(self, mu=None):
+        '''
+        Return the cross sections in the layout of pydgm.solver.initialize_solver_with_xs
+        '''
+        if mu is not None:
+            assert mu.shape == self.sig_t.shape
+            self.mu = mu
+
+        sig_t = np.asfortranarray(self.sig_t * self.mu)
+        vsig_f = np.asfortranarray(self.sig_f * self.mu)
+        chi = np.asfortranarray(self.chi)
+        # The library stores sig_s[gp, g] on row g
+        sig_s = np.asfortranarray((self.sig_s * self.mu).transpose(1, 0, 2)[np.newaxis])
+
+        return sig_t, vsig_f, chi, sig_s
+
     def write_homogenized_XS(self, fname, mu=None):
         if mu is not None:
             assert mu.shape == self.sig_t.shape
@@ -53,17 +69,18 @@ class XS():
 class DGMSOLVER():
 
     # Solve the problem using unotran
-    def __init__(self, G, fname, fm, cm, mm, nPin, norm=None, mapping=None, vacuum=False, k=None, phi=None, psi=None):
+    def __init__(self, G, fname, fm, cm, mm, nPin, norm=None, mapping=None, XS=None, vacuum=False, k=None, phi=None, psi=None):
         '''
         Inputs:
             G     - Number of energy groups
-            fname - Name of the cross section file
+            fname - Name of the cross section file (unused if XS is given)
             fm    - Fine mesh
             cm    - Coarse mesh
             mm    - Material map
             nPin  - Number of pincells
             norm  - norm of the flux to keep constant (match phi shape)
             mapping - structure class that holds fine -> coarse mapping
+            XS    - cross sections from XS.homogenized_XS used instead of the file
         '''
 
         self.G = G
@@ -74,6 +91,7 @@ class DGMSOLVER():
         self.npin = nPin
         self.norm = norm
         self.computenorm = self.norm is None
+        self.XS = XS
         self.vacuum = vacuum
 
         self.mapping = mapping
@@ -95,7 +113,8 @@ class DGMSOLVER():
         pydgm.control.fine_mesh_x = self.fm
         pydgm.control.coarse_mesh_x = self.cm
         pydgm.control.material_map = self.mm
-        pydgm.control.xs_name = self.fname.ljust(256)
+        if self.XS is None:
+            pydgm.control.xs_name = self.fname.ljust(256)
         pydgm.control.angle_order = 8
         pydgm.control.angle_option = pydgm.angle.gl
         pydgm.control.boundary_west = 0.0 if self.vacuum else 1.0
@@ -120,7 +139,10 @@ class DGMSOLVER():
         '''
 
         # Initialize the problem
-        pydgm.solver.initialize_solver()
+        if self.XS is None:
+            pydgm.solver.initialize_solver()
+        else:
+            pydgm.solver.initialize_solver_with_xs(*self.XS)
 
         if k is not None:
             pydgm.state.keff = k
@@ -229,7 +229,9 @@ class DGMSOLVER():
         self.sig_s = np.zeros((order, order, nCG, nCG, nC))
         self.vsig_f = np.zeros((order, nCG, nC))
         self.chi = np.zeros((order, nCG, nC))
-        self.basis = np.copy(pydgm.dgm.basis).T  # i,g
+        basis = np.zeros((self.G, int(pydgm.dgm.expansion_order) + 1), order='F')
+        pydgm.dgm.expand_basis(basis)
+        self.basis = basis.T  # i,g
         for c in range(nC):
             for o in range(order):
                 self.sig_t[:, o, :, c] = pydgm.dgm.expanded_sig_t[:, :, self.mat_map[c] - 1, o]
@@ -0,0 +1,130 @@
+module acceleration
+  ! ############################################################################
+  ! Extrapolation and mixing of fixed point iterations
+  ! ############################################################################
+
+  use control, only : dp
+
+  implicit none
+
+  contains
+
+  subroutine anderson_mix(x, gx, damping, delta_f, delta_g, last_f, last_g, count)
+    ! ##########################################################################
+    ! Replace the iterate with the Anderson mixture of the stored iterations
+    !
+    ! The history belongs to the caller so that nested fixed point loops keep
+    ! separate records.  Each column holds the change of the residual
+    ! f = g(x) - x and of g(x) between two iterations, and the oldest column is
+    ! overwritten once all columns are in use.  The mixture minimizes the
+    ! 2-norm of the linearized residual over the last size(delta_f, 2) steps,
+    ! and the damping relaxes the step just as it would a Krasnoselskii update.
+    ! ##########################################################################
+
+    ! Use Statements
+    use linear_algebra, only : factor_lu, solve_lu
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:) :: &
+        x,         & ! Input iterate on entry and mixed iterate on exit
+        last_f,    & ! Residual of the previous iteration
+        last_g       ! Map of the previous iteration
+    real(kind=dp), intent(in), dimension(:) :: &
+        gx           ! Map of the input iterate
+    real(kind=dp), intent(in) :: &
+        damping      ! Fraction of the mixed residual added to the iterate
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        delta_f,   & ! Differences of successive residuals
+        delta_g      ! Differences of successive maps
+    integer, intent(inout) :: &
+        count        ! Number of iterations seen so far
+    real(kind=dp), dimension(size(x)) :: &
+        f            ! Residual of the input iterate
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        normal       ! Normal equations of the least squares problem
+    real(kind=dp), allocatable, dimension(:) :: &
+        gamma        ! Weights of the stored differences
+    integer, allocatable, dimension(:) :: &
+        pivot        ! Row swapped with each row
+    integer :: &
+        info,      & ! Column of the first singular pivot (0 if none)
+        m,         & ! Number of stored differences
+        i,         & ! Column index
+        j            ! Column index
+
+    f = gx - x
+
+    if (count > 0) then
+      i = mod(count - 1, size(delta_f, 2)) + 1
+      delta_f(:, i) = f - last_f
+      delta_g(:, i) = gx - last_g
+    end if
+    last_f = f
+    last_g = gx
+    m = min(count, size(delta_f, 2))
+    count = count + 1
+
+    if (m == 0) then
+      x = x + damping * f
+      return
+    end if
+
+    allocate(normal(m, m), gamma(m), pivot(m))
+    do j = 1, m
+      do i = 1, m
+        normal(i, j) = dot_product(delta_f(:, i), delta_f(:, j))
+      end do  ! End i loop
+      gamma(j) = dot_product(delta_f(:, j), f)
+    end do  ! End j loop
+
+    ! Guard against nearly parallel differences
+    do i = 1, m
+      normal(i, i) = normal(i, i) * (1.0_8 + 1e-12_8)
+    end do  ! End i loop
+
+    call factor_lu(normal, pivot, info)
+    if (info > 0) then
+      ! The differences are degenerate, so fall back to the damped update
+      x = x + damping * f
+    else
+      call solve_lu(normal, pivot, gamma)
+
+      x = x + damping * f - matmul(delta_g(:, :m) - (1.0_8 - damping) * delta_f(:, :m), gamma)
+    end if
+
+    deallocate(normal, gamma, pivot)
+
+  end subroutine anderson_mix
+
+  subroutine chebyshev_coefficients(p, sigma, alpha, beta)
+    ! ##########################################################################
+    ! Coefficients of step p of the Chebyshev extrapolation
+    !
+    ! The extrapolated iterate is x + alpha (g(x) - x) + beta (x - x_previous)
+    ! for a map whose error modes lie within [0, sigma].
+    ! ##########################################################################
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        p         ! Step within the Chebyshev cycle (starting at 1)
+    real(kind=dp), intent(in) :: &
+        sigma     ! Estimate of the dominance ratio
+    real(kind=dp), intent(out) :: &
+        alpha,  & ! Weight of the change from the map
+        beta      ! Weight of the change from the previous step
+    real(kind=dp) :: &
+        gam       ! Inverse hyperbolic cosine of the bound
+
+    if (p == 1) then
+      alpha = 2.0_8 / (2.0_8 - sigma)
+      beta = 0.0_8
+    else
+      gam = acosh(2.0_8 / sigma - 1.0_8)
+      ! Ratio cosh((p - 1) gam) / cosh(p gam) written to avoid overflow
+      alpha = 4.0_8 / sigma * (exp(-gam) + exp((1 - 2 * p) * gam)) / (1.0_8 + exp(-2 * p * gam))
+      beta = (1.0_8 - 0.5_8 * sigma) * alpha - 1.0_8
+    end if
+
+  end subroutine chebyshev_coefficients
+
+end module acceleration
@@ -0,0 +1,467 @@
+module cmfd
+  ! ############################################################################
+  ! Coarse mesh finite difference acceleration of the eigenvalue iteration
+  ! ############################################################################
+
+  use control, only : dp
+
+  implicit none
+
+  contains
+
+  subroutine apply_cmfd()
+    ! ##########################################################################
+    ! Solve the low order eigenvalue problem on the coarse mesh regions and use
+    ! it to update keff and rescale the transport flux
+    !
+    ! The face currents are tallied during the last sweep.  The nonlinear
+    ! coupling coefficients make the coarse problem preserve the transport
+    ! currents, so both iterations share the same converged solution.
+    !
+    ! Each group only couples the coarse regions through its own leakage, so
+    ! the loss operator is stored as one banded matrix per group.  The groups
+    ! are solved from high to low energy with the scattering from the other
+    ! groups as a source (Gauss-Seidel iteration in energy).
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_groups, number_cells_x, number_cells_y, fine_mesh_x, &
+                        fine_mesh_y, coarse_mesh_x, coarse_mesh_y, spatial_dimension, &
+                        eigen_tolerance, max_eigen_iters, ignore_warnings
+    use mesh, only : dx, dy
+    use state, only : mg_phi, mg_sig_t, mg_sig_s, mg_nu_sig_f, mg_chi, mg_mMap, &
+                      mg_current_x, mg_current_y, keff
+    use linear_algebra, only : factor_band, solve_band
+
+    ! Variable definitions
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        flux,       & ! Coarse region flux
+        sig_t,      & ! Homogenized total cross section
+        sig_t_vol,  & ! Volume averaged total cross section
+        nu_sig_f,   & ! Homogenized fission cross section
+        chi,        & ! Homogenized fission spectrum
+        factor,     & ! Ratio of the updated to the transport coarse flux
+        cmfd_flux,  & ! Coarse flux of the low order problem
+        old_flux      ! Coarse flux of the previous low order iteration
+    real(kind=dp), allocatable, dimension(:,:,:) :: &
+        sig_s,      & ! Homogenized scattering cross section (gp to g)
+        current_x,  & ! Net current through the coarse x faces
+        current_y,  & ! Net current through the coarse y faces
+        loss          ! Banded coarse mesh loss operator of each group
+    real(kind=dp), dimension(size(fine_mesh_x) * size(fine_mesh_y)) :: &
+        volume,     & ! Volume of each coarse region
+        fission,    & ! Fission source in each coarse region
+        new_fission,& ! Updated fission source in each coarse region
+        rhs           ! Source of the low order problem for one group
+    real(kind=dp), dimension(number_groups) :: &
+        density       ! Group fission rate in a cell
+    integer, dimension(number_cells_x) :: &
+        region_x      ! Coarse x index of each fine x cell
+    integer, dimension(number_cells_y) :: &
+        region_y      ! Coarse y index of each fine y cell
+    real(kind=dp) :: &
+        cell_volume,& ! Volume of a fine cell
+        cmfd_keff,  & ! Eigenvalue of the low order problem
+        error         ! Change between low order iterations
+    integer :: &
+        nx,         & ! Number of coarse regions in x
+        ny,         & ! Number of coarse regions in y
+        nr,         & ! Number of coarse regions
+        band,       & ! Distance of the farthest neighbor row from the diagonal
+        info,       & ! Row of the first singular pivot (0 if none)
+        g,          & ! Group index
+        gp,         & ! Group prime index
+        r,          & ! Coarse region index
+        ix,         & ! Coarse x index
+        iy,         & ! Coarse y index
+        c,          & ! Cell index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        mat,        & ! Material index
+        iter          ! Low order iteration index
+
+    nx = size(fine_mesh_x)
+    ny = size(fine_mesh_y)
+    nr = nx * ny
+    band = merge(nx, 1, spatial_dimension == 2)
+
+    allocate(flux(number_groups, nr), sig_t(number_groups, nr), sig_t_vol(number_groups, nr))
+    allocate(nu_sig_f(number_groups, nr), chi(number_groups, nr), factor(number_groups, nr))
+    allocate(cmfd_flux(number_groups, nr), old_flux(number_groups, nr))
+    allocate(sig_s(number_groups, number_groups, nr))
+    allocate(current_x(number_groups, nx + 1, ny), current_y(number_groups, nx, ny + 1))
+    allocate(loss(2 * band + 1, nr, number_groups))
+
+    ! Map the fine cells to the coarse regions
+    cx = 0
+    do ix = 1, nx
+      region_x(cx + 1:cx + fine_mesh_x(ix)) = ix
+      cx = cx + fine_mesh_x(ix)
+    end do  ! End ix loop
+    cy = 0
+    do iy = 1, ny
+      region_y(cy + 1:cy + fine_mesh_y(iy)) = iy
+      cy = cy + fine_mesh_y(iy)
+    end do  ! End iy loop
+
+    ! Homogenize the cross sections over each coarse region
+    flux = 0.0_8
+    sig_t = 0.0_8
+    sig_t_vol = 0.0_8
+    sig_s = 0.0_8
+    nu_sig_f = 0.0_8
+    chi = 0.0_8
+    volume = 0.0_8
+    fission = 0.0_8
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        c = (cy - 1) * number_cells_x + cx
+        r = (region_y(cy) - 1) * nx + region_x(cx)
+        mat = mg_mMap(c)
+        cell_volume = dx(cx) * dy(cy)
+        density(:) = mg_nu_sig_f(:, mat) * mg_phi(0, :, c) * cell_volume
+
+        volume(r) = volume(r) + cell_volume
+        flux(:, r) = flux(:, r) + mg_phi(0, :, c) * cell_volume
+        sig_t(:, r) = sig_t(:, r) + mg_sig_t(:, mat) * mg_phi(0, :, c) * cell_volume
+        sig_t_vol(:, r) = sig_t_vol(:, r) + mg_sig_t(:, mat) * cell_volume
+        nu_sig_f(:, r) = nu_sig_f(:, r) + density(:)
+        chi(:, r) = chi(:, r) + mg_chi(:, mat) * sum(density)
+        fission(r) = fission(r) + sum(density)
+        do gp = 1, number_groups
+          sig_s(gp, :, r) = sig_s(gp, :, r) + mg_sig_s(0, gp, :, mat) * mg_phi(0, gp, c) * cell_volume
+        end do  ! End gp loop
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+    do r = 1, nr
+      do g = 1, number_groups
+        if (flux(g, r) > 0.0_8) then
+          sig_t(g, r) = sig_t(g, r) / flux(g, r)
+          nu_sig_f(g, r) = nu_sig_f(g, r) / flux(g, r)
+          sig_s(g, :, r) = sig_s(g, :, r) / flux(g, r)
+        else
+          ! Keep the diffusion coefficient finite for groups without flux
+          sig_t(g, r) = sig_t_vol(g, r) / volume(r)
+        end if
+      end do  ! End g loop
+      if (fission(r) > 0.0_8) then
+        chi(:, r) = chi(:, r) / fission(r)
+      end if
+      flux(:, r) = flux(:, r) / volume(r)
+    end do  ! End r loop
+
+    ! Average the tallied currents over the coarse faces
+    current_x = 0.0_8
+    do cy = 1, number_cells_y
+      cx = 1
+      do ix = 1, nx
+        current_x(:, ix, region_y(cy)) = current_x(:, ix, region_y(cy)) + mg_current_x(:, cx, cy) * dy(cy)
+        cx = cx + fine_mesh_x(ix)
+      end do  ! End ix loop
+      current_x(:, nx + 1, region_y(cy)) = current_x(:, nx + 1, region_y(cy)) &
+                                         + mg_current_x(:, number_cells_x + 1, cy) * dy(cy)
+    end do  ! End cy loop
+    do iy = 1, ny
+      current_x(:, :, iy) = current_x(:, :, iy) / (coarse_mesh_y(iy + 1) - coarse_mesh_y(iy))
+    end do  ! End iy loop
+
+    current_y = 0.0_8
+    if (spatial_dimension == 2) then
+      do cx = 1, number_cells_x
+        cy = 1
+        do iy = 1, ny
+          current_y(:, region_x(cx), iy) = current_y(:, region_x(cx), iy) + mg_current_y(:, cx, cy) * dx(cx)
+          cy = cy + fine_mesh_y(iy)
+        end do  ! End iy loop
+        current_y(:, region_x(cx), ny + 1) = current_y(:, region_x(cx), ny + 1) &
+                                           + mg_current_y(:, cx, number_cells_y + 1) * dx(cx)
+      end do  ! End cx loop
+      do ix = 1, nx
+        current_y(:, ix, :) = current_y(:, ix, :) / (coarse_mesh_x(ix + 1) - coarse_mesh_x(ix))
+      end do  ! End ix loop
+    end if
+
+    ! Build and factor the coarse mesh loss operator of each group
+    do g = 1, number_groups
+      call build_loss_operator(g, flux, sig_t, sig_s, volume, current_x, current_y, loss(:, :, g))
+
+      call factor_band(loss(:, :, g), info)
+      if (info > 0) then
+        ! A group without removal or leakage leaves the coarse problem singular
+        if (.not. ignore_warnings) then
+          write(*, 1001) g
+          1001 format ('skipping CMFD update for a singular coarse operator in group ', i4)
+        end if
+        return
+      end if
+    end do  ! End g loop
+
+    ! Power iterate on the low order problem
+    cmfd_flux = flux
+    do r = 1, nr
+      fission(r) = sum(nu_sig_f(:, r) * flux(:, r)) * volume(r)
+    end do  ! End r loop
+    cmfd_keff = keff
+
+    do iter = 1, max_eigen_iters
+      old_flux = cmfd_flux
+
+      ! Sweep the groups with the latest flux of the other groups
+      do g = 1, number_groups
+        rhs(:) = chi(g, :) * fission(:) / cmfd_keff
+        do gp = 1, number_groups
+          if (gp /= g) then
+            rhs(:) = rhs(:) + sig_s(gp, g, :) * cmfd_flux(gp, :) * volume(:)
+          end if
+        end do  ! End gp loop
+
+        call solve_band(loss(:, :, g), rhs)
+
+        cmfd_flux(g, :) = rhs(:)
+      end do  ! End g loop
+
+      do r = 1, nr
+        new_fission(r) = sum(nu_sig_f(:, r) * cmfd_flux(:, r)) * volume(r)
+      end do  ! End r loop
+
+      if (sum(new_fission) <= 0.0_8) then
+        ! The low order problem has no fission source to update
+        return
+      end if
+
+      cmfd_keff = cmfd_keff * sum(new_fission) / sum(fission)
+      cmfd_flux = cmfd_flux * sum(fission) / sum(new_fission)
+      error = maxval(abs(cmfd_flux - old_flux)) / maxval(abs(cmfd_flux))
+
+      fission = new_fission * sum(fission) / sum(new_fission)
+
+      if (error < eigen_tolerance) then
+        exit
+      end if
+    end do  ! End iter loop
+
+    ! Return the low order solution to the transport problem
+    keff = cmfd_keff
+    do r = 1, nr
+      do g = 1, number_groups
+        if (flux(g, r) > 0.0_8 .and. cmfd_flux(g, r) > 0.0_8) then
+          factor(g, r) = cmfd_flux(g, r) / flux(g, r)
+        else
+          factor(g, r) = 1.0_8
+        end if
+      end do  ! End g loop
+    end do  ! End r loop
+
+    call rescale_flux(factor, region_x, region_y)
+
+  end subroutine apply_cmfd
+
+  subroutine build_loss_operator(g, flux, sig_t, sig_s, volume, current_x, current_y, loss)
+    ! ##########################################################################
+    ! Assemble the removal and leakage of the coarse mesh diffusion problem
+    ! for group g.  Column r holds the coupling of region r with its neighbors
+    ! in the bands around the middle (diagonal) row, and the correction
+    ! coefficient of each face reproduces the transport current.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : fine_mesh_x, fine_mesh_y, coarse_mesh_x, coarse_mesh_y, &
+                        spatial_dimension
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        g             ! Group index
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        flux,       & ! Coarse region flux
+        sig_t         ! Homogenized total cross section
+    real(kind=dp), intent(in), dimension(:,:,:) :: &
+        sig_s,      & ! Homogenized scattering cross section (gp to g)
+        current_x,  & ! Net current through the coarse x faces
+        current_y     ! Net current through the coarse y faces
+    real(kind=dp), intent(in), dimension(:) :: &
+        volume        ! Volume of each coarse region
+    real(kind=dp), intent(out), dimension(:,:) :: &
+        loss          ! Banded coarse mesh loss operator
+    integer :: &
+        nx,         & ! Number of coarse regions in x
+        ny,         & ! Number of coarse regions in y
+        d,          & ! Row of the diagonal in the banded storage
+        r,          & ! Coarse region index
+        ix,         & ! Coarse x index
+        iy            ! Coarse y index
+
+    nx = size(fine_mesh_x)
+    ny = size(fine_mesh_y)
+    d = (size(loss, 1) + 1) / 2
+
+    loss = 0.0_8
+
+    ! Removal from the group within each region
+    do r = 1, nx * ny
+      loss(d, r) = (sig_t(g, r) - sig_s(g, g, r)) * volume(r)
+    end do  ! End r loop
+
+    ! Leakage through the x faces
+    do iy = 1, ny
+      do ix = 1, nx + 1
+        call add_face_coupling(loss, ix == 1, ix == nx + 1, current_x(g, ix, iy), &
+                               flux, sig_t, g, (iy - 1) * nx + ix - 1, (iy - 1) * nx + ix, &
+                               coarse_mesh_x(max(ix - 1, 1) + 1) - coarse_mesh_x(max(ix - 1, 1)), &
+                               coarse_mesh_x(min(ix, nx) + 1) - coarse_mesh_x(min(ix, nx)), &
+                               coarse_mesh_y(iy + 1) - coarse_mesh_y(iy))
+      end do  ! End ix loop
+    end do  ! End iy loop
+
+    ! Leakage through the y faces
+    if (spatial_dimension == 2) then
+      do iy = 1, ny + 1
+        do ix = 1, nx
+          call add_face_coupling(loss, iy == 1, iy == ny + 1, current_y(g, ix, iy), &
+                                 flux, sig_t, g, (iy - 2) * nx + ix, (iy - 1) * nx + ix, &
+                                 coarse_mesh_y(max(iy - 1, 1) + 1) - coarse_mesh_y(max(iy - 1, 1)), &
+                                 coarse_mesh_y(min(iy, ny) + 1) - coarse_mesh_y(min(iy, ny)), &
+                                 coarse_mesh_x(ix + 1) - coarse_mesh_x(ix))
+        end do  ! End ix loop
+      end do  ! End iy loop
+    end if
+
+  end subroutine build_loss_operator
+
+  subroutine add_face_coupling(loss, low_boundary, high_boundary, current, flux, sig_t, &
+                               g, r_low, r_high, width_low, width_high, area)
+    ! ##########################################################################
+    ! Add the leakage through one face between regions r_low and r_high
+    ! ##########################################################################
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        g,          & ! Group index
+        r_low,      & ! Region on the low side of the face
+        r_high        ! Region on the high side of the face
+    logical, intent(in) :: &
+        low_boundary, & ! The face is on the low boundary of the problem
+        high_boundary   ! The face is on the high boundary of the problem
+    real(kind=dp), intent(in) :: &
+        current,    & ! Net current through the face toward the high side
+        width_low,  & ! Width of the low side region normal to the face
+        width_high, & ! Width of the high side region normal to the face
+        area          ! Area of the face
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        loss          ! Banded coarse mesh loss operator
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        flux,       & ! Coarse region flux
+        sig_t         ! Homogenized total cross section
+    real(kind=dp) :: &
+        d_low,      & ! Diffusion coefficient on the low side
+        d_high,     & ! Diffusion coefficient on the high side
+        d_tilde,    & ! Finite difference coupling coefficient
+        d_hat         ! Nonlinear correction coefficient
+    integer :: &
+        d,          & ! Row of the diagonal in the banded storage
+        offset        ! Distance between the two regions in the banded storage
+
+    d = (size(loss, 1) + 1) / 2
+
+    if (low_boundary) then
+      ! The outgoing current is proportional to the boundary region flux
+      if (flux(g, r_high) > 0.0_8) then
+        loss(d, r_high) = loss(d, r_high) - area * current / flux(g, r_high)
+      end if
+    else if (high_boundary) then
+      if (flux(g, r_low) > 0.0_8) then
+        loss(d, r_low) = loss(d, r_low) + area * current / flux(g, r_low)
+      end if
+    else
+      d_low = 1.0_8 / (3.0_8 * sig_t(g, r_low))
+      d_high = 1.0_8 / (3.0_8 * sig_t(g, r_high))
+      d_tilde = 2.0_8 * d_low * d_high / (d_low * width_high + d_high * width_low)
+      if (flux(g, r_low) + flux(g, r_high) > 0.0_8) then
+        d_hat = -(current + d_tilde * (flux(g, r_high) - flux(g, r_low))) / (flux(g, r_low) + flux(g, r_high))
+      else
+        d_hat = 0.0_8
+      end if
+
+      offset = r_high - r_low
+      loss(d, r_low) = loss(d, r_low) + area * (d_tilde - d_hat)
+      loss(d + offset, r_low) = loss(d + offset, r_low) - area * (d_tilde + d_hat)
+      loss(d, r_high) = loss(d, r_high) + area * (d_tilde + d_hat)
+      loss(d - offset, r_high) = loss(d - offset, r_high) - area * (d_tilde - d_hat)
+    end if
+
+  end subroutine add_face_coupling
+
+  subroutine rescale_flux(factor, region_x, region_y)
+    ! ##########################################################################
+    ! Scale the fine mesh fluxes by the change of their coarse region flux
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells_x, number_cells_y, fine_mesh_x, spatial_dimension, &
+                        store_psi, boundary_east, boundary_west
+    use state, only : mg_phi, mg_psi, mg_incident_x, mg_incident_y
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        factor        ! Ratio of the updated to the transport coarse flux
+    integer, intent(in), dimension(:) :: &
+        region_x,   & ! Coarse x index of each fine x cell
+        region_y      ! Coarse y index of each fine y cell
+    integer :: &
+        nx,         & ! Number of coarse regions in x
+        c,          & ! Cell index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        r,          & ! Coarse region index
+        a             ! Angle index
+
+    nx = size(fine_mesh_x)
+
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        c = (cy - 1) * number_cells_x + cx
+        r = (region_y(cy) - 1) * nx + region_x(cx)
+        do a = 0, size(mg_phi, 1) - 1
+          mg_phi(a, :, c) = mg_phi(a, :, c) * factor(:, r)
+        end do  ! End a loop
+        if (store_psi) then
+          do a = 1, size(mg_psi, 2)
+            mg_psi(:, a, c) = mg_psi(:, a, c) * factor(:, r)
+          end do  ! End a loop
+        end if
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+    ! Scale the stored boundary fluxes with the region they leave
+    if (spatial_dimension == 1) then
+      ! The last octant of the sweep leaves through this boundary
+      r = merge(nx, 1, boundary_east == 0.0 .and. boundary_west /= 0.0)
+      do a = 1, size(mg_incident_x, 2)
+        mg_incident_x(:, a, 1, 1) = mg_incident_x(:, a, 1, 1) * factor(:, r)
+      end do  ! End a loop
+    else
+      do cy = 1, number_cells_y
+        do a = 1, size(mg_incident_x, 2)
+          r = (region_y(cy) - 1) * nx + 1
+          mg_incident_x(:, a, cy, 1) = mg_incident_x(:, a, cy, 1) * factor(:, r)
+          mg_incident_x(:, a, cy, 2) = mg_incident_x(:, a, cy, 2) * factor(:, r)
+          r = region_y(cy) * nx
+          mg_incident_x(:, a, cy, 3) = mg_incident_x(:, a, cy, 3) * factor(:, r)
+          mg_incident_x(:, a, cy, 4) = mg_incident_x(:, a, cy, 4) * factor(:, r)
+        end do  ! End a loop
+      end do  ! End cy loop
+      do cx = 1, number_cells_x
+        do a = 1, size(mg_incident_y, 2)
+          r = region_x(cx)
+          mg_incident_y(:, a, cx, 1) = mg_incident_y(:, a, cx, 1) * factor(:, r)
+          mg_incident_y(:, a, cx, 4) = mg_incident_y(:, a, cx, 4) * factor(:, r)
+          r = (region_y(number_cells_y) - 1) * nx + region_x(cx)
+          mg_incident_y(:, a, cx, 2) = mg_incident_y(:, a, cx, 2) * factor(:, r)
+          mg_incident_y(:, a, cx, 3) = mg_incident_y(:, a, cx, 3) * factor(:, r)
+        end do  ! End a loop
+      end do  ! End cx loop
+    end if
+
+  end subroutine rescale_flux
+
+end module cmfd
@@ -29,16 +29,27 @@ module control
       outer_tolerance=1e-8_8,     & ! Convergance criteria for outer iteration
       lamb=1.0_8,                 & ! Parameter (0 < lamb <= 1.0) for krasnoselskii iteration
       source_value=0.0_8,         & ! Value of external source for the problem
-      initial_keff=1.0_8            ! Initial value for the eigenvalue
+      initial_keff=1.0_8,         & ! Initial value for the eigenvalue
+      wielandt_shift=0.1_8,       & ! Shift of keff for the Wielandt eigenvalue
+      closure_cache_limit=512.0_8   ! Memory limit in MB for cached closure coefficients
   character(len=256) :: &
       xs_name,                    & ! Name of the cross section file
       dgm_basis_name,             & ! Name of file containing energy basis
       file_name,                  & ! Name of file containing the options
       initial_phi,                & ! Name of file with initial scalar flux
       initial_psi,                & ! Name of file with initial angular flux
-      solver_type                   ! Choice of [eigen, fixed] solver
+      solver_type,                & ! Choice of [eigen, fixed] solver
+      checkpoint_name='',         & ! Name of the checkpoint file of the eigen or recon loop
+      restart_name=''               ! Name of the checkpoint file to resume from (optional)
   character(len=2) :: &
       equation_type="DD"            ! Closure equation for discrete ordinates [DD, SC, SD]
+  character(len=12) :: &
+      energy_iteration="jacobi"     ! Iteration over the energy groups [jacobi, gauss_seidel]
+  character(len=6) :: &
+      iteration_type="source"       ! Solver for the outer problem [source, gmres]
+  character(len=9) :: &
+      eigen_acceleration="none",  & ! Acceleration of the eigen iteration [none, wielandt, chebyshev, anderson]
+      recon_acceleration="none"     ! Acceleration of the recon iteration [none, anderson]
   integer :: &
       spatial_dimension,          & ! Dimension of the spatial variable (1 for 1D, 2 for 2D)
       angle_order,                & ! Number of angles per octant
@@ -60,12 +71,16 @@ module control
       number_coarse_groups,       & ! Number of groups in the expansion
       number_legendre,            & ! Number of anisotropic scattering orders
       number_moments,             & ! Total number of legendre moments (equal to number_legendre in 1D)
-      recon_print=1,              & ! Enable/Disable recon iteration printing
+      recon_print=1,              & ! Enable/Disable recon iteration printing (2 adds the moment memory)
       eigen_print=1,              & ! Enable/Disable eigen iteration printing
       outer_print=1,              & ! Enable/Disable outer iteration printing
       store_phi_order=-1,         & ! Legendre order for storage of the scalar flux moments
       scatter_leg_order=-1,       & ! Legendre order for anisotropic scattering
-      delta_leg_order=-1            ! Legendre order for truncated expansion of delta term
+      delta_leg_order=-1,         & ! Legendre order for truncated expansion of delta term
+      number_group_blocks=1,      & ! Number of group blocks swept concurrently (0 for one per thread)
+      gmres_restart=20,           & ! Number of Krylov vectors kept before GMRES restarts
+      anderson_depth=5,           & ! Number of previous iterations kept for Anderson mixing
+      checkpoint_interval=0         ! Iterations between checkpoints (0 to disable)
   logical :: &
       allow_fission=.false.,      & ! Enable/Disable fission in the problem
       allow_scatter=.true.,       & ! Enable/Disable scattering in the problem
@@ -75,6 +90,13 @@ module control
       outer_converged=.false.,    & ! Flag to state if the outer iterations have converged
       eigen_converged=.false.,    & ! Flag to state if the eigen iterations have converged
       truncate_delta=.false.,     & ! Enable/Disable truncated expansion of delta term
+      parallel_sweep=.false.,     & ! Enable/Disable OpenMP threading of the transport sweep
+      upscatter_only=.false.,     & ! Enable/Disable iterating only the upscatter block (Gauss-Seidel)
+      use_dsa=.false.,            & ! Enable/Disable diffusion synthetic acceleration
+      use_cmfd=.false.,           & ! Enable/Disable coarse mesh finite difference acceleration
+      parallel_orders=.false.,    & ! Enable/Disable solving the higher DGM orders concurrently
+      sparse_scatter=.false.,     & ! Enable/Disable storing only the nonzero DGM scattering blocks
+      load_used_materials=.false.,& ! Enable/Disable loading only the materials in material_map
       verify_control=.true.         ! Enable/Disable checking control variables
 
   contains
@@ -82,24 +104,28 @@ module control
   subroutine initialize_control(fname, silent)
     ! ##########################################################################
     ! Read the options file and output the choices if not silent
+    !
+    ! The file is read in one piece and split into labels and values, so the
+    ! lines have no length limit.
     ! ##########################################################################
 
     ! Input variables
-    character(len=524288) :: &
-        buffer, & ! Buffer to hold read-in strings
-        label     ! Contains the read-variable name
     character(len=*), intent(in) :: &
-        fname     ! Name of the file containing options
+        fname       ! Name of the file containing options
+    character(len=:), allocatable :: &
+        text        ! Contents of the options file
+    integer, allocatable, dimension(:,:) :: &
+        bounds      ! First and last character of the label and value on each line
     integer :: &
-        pos,    & ! Position indicator in the line
-        ios=0,  & ! I/O file flag
-        line=0    ! Line number
+        ios,      & ! I/O file flag
+        line,     & ! Line number
+        file_size   ! Size of the options file in bytes
     integer, parameter :: &
-        fh=15     ! File number
+        fh=15       ! File number
     logical, optional :: &
-        silent    ! Flag to prevent printing the read variables and values
+        silent      ! Flag to prevent printing the read variables and values
     logical :: &
-        no_print  ! Local flag to prevent printing the read variables and values
+        no_print    ! Local flag to prevent printing the read variables and values
 
     ! Set the local value of no_print from silent
     if (present(silent)) then
@@ -111,127 +137,21 @@ module control
     ! Cut the trailing whitespace from fname
     file_name = trim(adjustl(fname))
 
-    ! Start reading the options file
-    open(fh, file=file_name, action='read', iostat=ios)
+    ! Read the whole options file
+    open(fh, file=file_name, access='stream', form='unformatted', action='read', status='old', iostat=ios)
     if (ios > 0) stop "*** ERROR: user input file not found ***"
-
-    ! ios is negative if an end of record condition is encountered or if
-    ! an endfile condition was detected.  It is positive if an error was
-    ! detected.  ios is zero otherwise.
-    do while (ios == 0)
-      read(fh, '(A)', iostat=ios) buffer
-      if (ios == 0) then
-        ! Increment the line count
-        line = line + 1
-
-        ! Find the first whitespace and split label and data
-        pos = scan(buffer, ' ')
-        label = buffer(1:pos)
-        buffer = buffer(pos+1:)
-
-        ! Parse the label and save the value to the proper variable
-        select case (label)
-        case ('fine_mesh')
-          allocate(fine_mesh(nitems(buffer)))
-          read(buffer, *, iostat=ios) fine_mesh
-        case ('coarse_mesh')
-          allocate(coarse_mesh(nitems(buffer)))
-          read(buffer, *, iostat=ios) coarse_mesh
-        case ('fine_mesh_x')
-          allocate(fine_mesh_x(nitems(buffer)))
-          read(buffer, *, iostat=ios) fine_mesh_x
-        case ('fine_mesh_y')
-          allocate(fine_mesh_y(nitems(buffer)))
-          read(buffer, *, iostat=ios) fine_mesh_y
-        case ('coarse_mesh_x')
-          allocate(coarse_mesh_x(nitems(buffer)))
-          read(buffer, *, iostat=ios) coarse_mesh_x
-        case ('coarse_mesh_y')
-          allocate(coarse_mesh_y(nitems(buffer)))
-          read(buffer, *, iostat=ios) coarse_mesh_y
-        case ('material_map')
-          allocate(material_map(nitems(buffer)))
-          read(buffer, *, iostat=ios) material_map
-        case ('homogenization_map')
-          allocate(homogenization_map(nitems(buffer)))
-          read(buffer, *, iostat=ios) homogenization_map
-        case ('xs_file')
-          xs_name=trim(adjustl(buffer))
-        case ('initial_phi')
-          initial_phi=trim(adjustl(buffer))
-        case ('initial_psi')
-          initial_psi=trim(adjustl(buffer))
-        case ('initial_keff')
-          read(buffer, *, iostat=ios) initial_keff
-        case ('angle_order')
-          read(buffer, *, iostat=ios) angle_order
-        case ('angle_option')
-          read(buffer, *, iostat=ios) angle_option
-        case ('boundary_east')
-          read(buffer, *, iostat=ios) boundary_east
-        case ('boundary_west')
-          read(buffer, *, iostat=ios) boundary_west
-        case ('boundary_north')
-          read(buffer, *, iostat=ios) boundary_north
-        case ('boundary_south')
-          read(buffer, *, iostat=ios) boundary_south
-        case ('allow_fission')
-          read(buffer, *, iostat=ios) allow_fission
-        case ('energy_group_map')
-          allocate(energy_group_map(nitems(buffer)))
-          read(buffer, *, iostat=ios) energy_group_map
-        case ('dgm_basis_file')
-          dgm_basis_name=trim(adjustl(buffer))
-        case ('truncation_map')
-          allocate(truncation_map(nitems(buffer)))
-          read(buffer, *, iostat=ios) truncation_map
-        case ('recon_print')
-          read(buffer, *, iostat=ios) recon_print
-        case ('eigen_print')
-          read(buffer, *, iostat=ios) eigen_print
-        case ('outer_print')
-          read(buffer, *, iostat=ios) outer_print
-        case ('recon_tolerance')
-          read(buffer, *, iostat=ios) recon_tolerance
-        case ('eigen_tolerance')
-          read(buffer, *, iostat=ios) eigen_tolerance
-        case ('outer_tolerance')
-          read(buffer, *, iostat=ios) outer_tolerance
-        case ('lambda')
-          read(buffer, *, iostat=ios) lamb
-        case ('use_DGM')
-          read(buffer, *, iostat=ios) use_DGM
-        case ('store_psi')
-          read(buffer, *, iostat=ios) store_psi
-        case ('ignore_warnings')
-          read(buffer, *, iostat=ios) ignore_warnings
-        case ('equation_type')
-          equation_type=trim(adjustl(buffer))
-        case ('solver_type')
-          solver_type=trim(adjustl(buffer))
-        case ('source')
-          read(buffer, *, iostat=ios) source_value
-        case ('scatter_legendre_order')
-          read(buffer, *, iostat=ios) scatter_leg_order
-        case ('delta_legendre_order')
-          read(buffer, *, iostat=ios) delta_leg_order
-        case ('truncate_delta')
-          read(buffer, *, iostat=ios) truncate_delta
-        case ('max_recon_iters')
-          read(buffer, *, iostat=ios) max_recon_iters
-        case ('max_eigen_iters')
-          read(buffer, *, iostat=ios) max_eigen_iters
-        case ('max_outer_iters')
-          read(buffer, *, iostat=ios) max_outer_iters
-        case ('spatial_dimension')
-          read(buffer, *, iostat=ios) spatial_dimension
-        case default
-          print *, 'Skipping invalid label at line', line
-        end select
-      end if
-    end do
+    inquire(unit=fh, size=file_size)
+    allocate(character(len=file_size) :: text)
+    read(fh) text
     close(fh)
 
+    ! Parse the label and save the value to the proper variable
+    allocate(bounds(4, count_lines(text)))
+    call split_options(text, bounds)
+    do line = 1, size(bounds, 2)
+      call set_option(text(bounds(1, line):bounds(2, line)), text(bounds(3, line):bounds(4, line)), line)
+    end do  ! End line loop
+
     ! If DGM is enabled, angular flux must be stored
     if (use_DGM) then
       store_psi = .true.
@@ -244,6 +164,237 @@ module control
 
   end subroutine initialize_control
 
+  function count_lines(text) result(number_lines)
+    ! ##########################################################################
+    ! Count the lines of the options file, including a last line without a
+    ! line feed
+    ! ##########################################################################
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        text            ! Contents of the options file
+    integer :: &
+        number_lines, & ! Number of lines in the file
+        first,        & ! First character of the line
+        next            ! Length of the line including the line feed
+
+    number_lines = 0
+    first = 1
+    do while (first <= len(text))
+      next = index(text(first:), new_line('a'))
+      if (next == 0) then
+        next = len(text) - first + 2
+      end if
+      number_lines = number_lines + 1
+      first = first + next
+    end do
+
+  end function count_lines
+
+  subroutine split_options(text, bounds)
+    ! ##########################################################################
+    ! Find the label and value on each line of the options file
+    !
+    ! A line ends at a line feed, dropping a carriage return before it, and
+    ! the label ends at the first space.  bounds holds the first and last
+    ! character of the label and of the value on each line.
+    ! ##########################################################################
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        text            ! Contents of the options file
+    integer, intent(out), dimension(:,:) :: &
+        bounds          ! First and last character of the label and value on each line
+    integer :: &
+        first,        & ! First character of the line
+        last,         & ! Last character of the line
+        next,         & ! Length of the line including the line feed
+        pos,          & ! Position of the first space in the line
+        line            ! Line index
+
+    first = 1
+    do line = 1, size(bounds, 2)
+      next = index(text(first:), new_line('a'))
+      if (next == 0) then
+        next = len(text) - first + 2
+      end if
+      last = first + next - 2
+      if (last >= first) then
+        if (text(last:last) == achar(13)) then
+          last = last - 1
+        end if
+      end if
+      pos = index(text(first:last), ' ')
+      if (pos == 0) then
+        bounds(:, line) = [first, last, last + 1, last]
+      else
+        bounds(:, line) = [first, first + pos - 2, first + pos, last]
+      end if
+      first = first + next
+    end do  ! End line loop
+
+  end subroutine split_options
+
+  subroutine set_option(label, value, line)
+    ! ##########################################################################
+    ! Save the value of an option to the proper variable
+    ! ##########################################################################
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        label,  & ! Name of the option
+        value     ! Text following the name
+    integer, intent(in) :: &
+        line      ! Line number of the option
+    integer :: &
+        ios       ! I/O flag of reading the value
+
+    ios = 0
+
+    select case (label)
+    case ('fine_mesh')
+      allocate(fine_mesh(nitems(value)))
+      read(value, *, iostat=ios) fine_mesh
+    case ('coarse_mesh')
+      allocate(coarse_mesh(nitems(value)))
+      read(value, *, iostat=ios) coarse_mesh
+    case ('fine_mesh_x')
+      allocate(fine_mesh_x(nitems(value)))
+      read(value, *, iostat=ios) fine_mesh_x
+    case ('fine_mesh_y')
+      allocate(fine_mesh_y(nitems(value)))
+      read(value, *, iostat=ios) fine_mesh_y
+    case ('coarse_mesh_x')
+      allocate(coarse_mesh_x(nitems(value)))
+      read(value, *, iostat=ios) coarse_mesh_x
+    case ('coarse_mesh_y')
+      allocate(coarse_mesh_y(nitems(value)))
+      read(value, *, iostat=ios) coarse_mesh_y
+    case ('material_map')
+      allocate(material_map(nitems(value)))
+      read(value, *, iostat=ios) material_map
+    case ('homogenization_map')
+      allocate(homogenization_map(nitems(value)))
+      read(value, *, iostat=ios) homogenization_map
+    case ('xs_file')
+      xs_name=trim(adjustl(value))
+    case ('load_used_materials')
+      read(value, *, iostat=ios) load_used_materials
+    case ('initial_phi')
+      initial_phi=trim(adjustl(value))
+    case ('initial_psi')
+      initial_psi=trim(adjustl(value))
+    case ('initial_keff')
+      read(value, *, iostat=ios) initial_keff
+    case ('angle_order')
+      read(value, *, iostat=ios) angle_order
+    case ('angle_option')
+      read(value, *, iostat=ios) angle_option
+    case ('boundary_east')
+      read(value, *, iostat=ios) boundary_east
+    case ('boundary_west')
+      read(value, *, iostat=ios) boundary_west
+    case ('boundary_north')
+      read(value, *, iostat=ios) boundary_north
+    case ('boundary_south')
+      read(value, *, iostat=ios) boundary_south
+    case ('allow_fission')
+      read(value, *, iostat=ios) allow_fission
+    case ('energy_group_map')
+      allocate(energy_group_map(nitems(value)))
+      read(value, *, iostat=ios) energy_group_map
+    case ('dgm_basis_file')
+      dgm_basis_name=trim(adjustl(value))
+    case ('truncation_map')
+      allocate(truncation_map(nitems(value)))
+      read(value, *, iostat=ios) truncation_map
+    case ('recon_print')
+      read(value, *, iostat=ios) recon_print
+    case ('eigen_print')
+      read(value, *, iostat=ios) eigen_print
+    case ('outer_print')
+      read(value, *, iostat=ios) outer_print
+    case ('recon_tolerance')
+      read(value, *, iostat=ios) recon_tolerance
+    case ('eigen_tolerance')
+      read(value, *, iostat=ios) eigen_tolerance
+    case ('outer_tolerance')
+      read(value, *, iostat=ios) outer_tolerance
+    case ('lambda')
+      read(value, *, iostat=ios) lamb
+    case ('use_DGM')
+      read(value, *, iostat=ios) use_DGM
+    case ('store_psi')
+      read(value, *, iostat=ios) store_psi
+    case ('ignore_warnings')
+      read(value, *, iostat=ios) ignore_warnings
+    case ('equation_type')
+      equation_type=trim(adjustl(value))
+    case ('solver_type')
+      solver_type=trim(adjustl(value))
+    case ('source')
+      read(value, *, iostat=ios) source_value
+    case ('scatter_legendre_order')
+      read(value, *, iostat=ios) scatter_leg_order
+    case ('delta_legendre_order')
+      read(value, *, iostat=ios) delta_leg_order
+    case ('truncate_delta')
+      read(value, *, iostat=ios) truncate_delta
+    case ('max_recon_iters')
+      read(value, *, iostat=ios) max_recon_iters
+    case ('max_eigen_iters')
+      read(value, *, iostat=ios) max_eigen_iters
+    case ('max_outer_iters')
+      read(value, *, iostat=ios) max_outer_iters
+    case ('spatial_dimension')
+      read(value, *, iostat=ios) spatial_dimension
+    case ('parallel_sweep')
+      read(value, *, iostat=ios) parallel_sweep
+    case ('group_blocks')
+      read(value, *, iostat=ios) number_group_blocks
+    case ('energy_iteration')
+      energy_iteration=trim(adjustl(value))
+    case ('upscatter_only')
+      read(value, *, iostat=ios) upscatter_only
+    case ('use_dsa')
+      read(value, *, iostat=ios) use_dsa
+    case ('use_cmfd')
+      read(value, *, iostat=ios) use_cmfd
+    case ('iteration_type')
+      iteration_type=trim(adjustl(value))
+    case ('gmres_restart')
+      read(value, *, iostat=ios) gmres_restart
+    case ('eigen_acceleration')
+      eigen_acceleration=trim(adjustl(value))
+    case ('wielandt_shift')
+      read(value, *, iostat=ios) wielandt_shift
+    case ('parallel_orders')
+      read(value, *, iostat=ios) parallel_orders
+    case ('sparse_scatter')
+      read(value, *, iostat=ios) sparse_scatter
+    case ('recon_acceleration')
+      recon_acceleration=trim(adjustl(value))
+    case ('anderson_depth')
+      read(value, *, iostat=ios) anderson_depth
+    case ('closure_cache_limit')
+      read(value, *, iostat=ios) closure_cache_limit
+    case ('checkpoint_file')
+      checkpoint_name=trim(adjustl(value))
+    case ('checkpoint_interval')
+      read(value, *, iostat=ios) checkpoint_interval
+    case ('restart_file')
+      restart_name=trim(adjustl(value))
+    case default
+      print *, 'Skipping invalid label at line', line
+      return
+    end select
+
+    if (ios /= 0) then
+      print *, 'Skipping invalid value at line', line
+    end if
+
+  end subroutine set_option
+
   subroutine output_control()
     ! ##########################################################################
     ! Output the variables/options to the standard output
@@ -268,6 +419,7 @@ module control
     end if
     print *, 'MATERIAL VARIABLES'
     print *, '  xs_file_name       = "', trim(xs_name), '"'
+    print *, '  load_used_materials= ', load_used_materials
     print *, 'ANGLE VARIABLES'
     print *, '  angle_option       = ', angle_option
     print *, 'SOURCE'
@@ -290,6 +442,33 @@ module control
     print *, '  max_outer_iters    = ', max_outer_iters
     print *, '  lambda             = ', lamb
     print *, '  ignore_warnings    = ', ignore_warnings
+    print *, '  parallel_sweep     = ', parallel_sweep
+    print *, '  group_blocks       = ', number_group_blocks
+    print *, '  energy_iteration   = "', trim(energy_iteration), '"'
+    if (energy_iteration == 'gauss_seidel') then
+      print *, '  upscatter_only     = ', upscatter_only
+    end if
+    print *, '  closure_cache_limit= ', closure_cache_limit
+    print *, '  use_dsa            = ', use_dsa
+    print *, '  use_cmfd           = ', use_cmfd
+    print *, '  iteration_type     = "', trim(iteration_type), '"'
+    if (iteration_type == 'gmres') then
+      print *, '  gmres_restart      = ', gmres_restart
+    end if
+    print *, '  eigen_acceleration = "', trim(eigen_acceleration), '"'
+    if (eigen_acceleration == 'wielandt') then
+      print *, '  wielandt_shift     = ', wielandt_shift
+    end if
+    if (eigen_acceleration == 'anderson' .or. recon_acceleration == 'anderson') then
+      print *, '  anderson_depth     = ', anderson_depth
+    end if
+    print *, '  checkpoint_interval= ', checkpoint_interval
+    if (checkpoint_interval > 0) then
+      print *, '  checkpoint_file    = "', trim(checkpoint_name), '"'
+    end if
+    if (len_trim(restart_name) > 0) then
+      print *, '  restart_file       = "', trim(restart_name), '"'
+    end if
     if (scatter_leg_order > -1) then
       print *, '  scatter_order      = ', scatter_leg_order
     else
@@ -302,6 +481,9 @@ module control
       print *, '  recon_print        = ', recon_print
       print *, '  recon_tolerance    = ', recon_tolerance
       print *, '  max_recon_iters    = ', max_recon_iters
+      print *, '  recon_acceleration = "', trim(recon_acceleration), '"'
+      print *, '  parallel_orders    = ', parallel_orders
+      print *, '  sparse_scatter     = ', sparse_scatter
       if (allocated(energy_group_map)) then
         print *, '  energy_group_map   = [', energy_group_map, ']'
       end if
@@ -334,6 +516,75 @@ module control
       stop
     end if
 
+    ! Check energy iteration type
+    if (.not. (energy_iteration == 'jacobi' .or. energy_iteration == 'gauss_seidel')) then
+      print *, 'INPUT ERROR : Invalid energy iteration'
+      stop
+    end if
+
+    ! Check the outer iteration type
+    if (.not. (iteration_type == 'source' .or. iteration_type == 'gmres')) then
+      print *, 'INPUT ERROR : Invalid iteration type'
+      stop
+    end if
+    if (gmres_restart < 1) then
+      print *, 'INPUT ERROR : gmres_restart must be positive'
+      stop
+    end if
+    if (iteration_type == 'gmres' .and. use_dsa) then
+      print *, 'INPUT ERROR : use_dsa is only available with iteration_type source'
+      stop
+    end if
+    if (iteration_type == 'gmres' .and. energy_iteration == 'gauss_seidel') then
+      print *, 'INPUT ERROR : energy_iteration gauss_seidel is only available with iteration_type source'
+      stop
+    end if
+    if (iteration_type == 'gmres' .and. number_group_blocks /= 1) then
+      print *, 'INPUT ERROR : group_blocks is only available with iteration_type source'
+      stop
+    end if
+
+    ! Check the eigen acceleration
+    if (.not. (eigen_acceleration == 'none' .or. eigen_acceleration == 'wielandt' .or. &
+               eigen_acceleration == 'chebyshev' .or. eigen_acceleration == 'anderson')) then
+      print *, 'INPUT ERROR : Invalid eigen acceleration'
+      stop
+    end if
+    if (.not. (recon_acceleration == 'none' .or. recon_acceleration == 'anderson')) then
+      print *, 'INPUT ERROR : Invalid recon acceleration'
+      stop
+    end if
+    if (wielandt_shift <= 0.0_8) then
+      print *, 'INPUT ERROR : wielandt_shift must be positive'
+      stop
+    end if
+    if (anderson_depth < 1) then
+      print *, 'INPUT ERROR : anderson_depth must be positive'
+      stop
+    end if
+
+    ! Check the closure cache limit
+    if (closure_cache_limit < 0.0_8) then
+      print *, 'INPUT ERROR : closure_cache_limit must be non-negative'
+      stop
+    end if
+
+    ! Check the checkpoint options
+    if (checkpoint_interval < 0) then
+      print *, 'INPUT ERROR : checkpoint_interval must be zero (disabled) or positive'
+      stop
+    end if
+    if (checkpoint_interval > 0 .and. len_trim(checkpoint_name) == 0) then
+      print *, 'INPUT ERROR : checkpoint_interval requires a checkpoint_file'
+      stop
+    end if
+
+    ! Check the number of group blocks
+    if (number_group_blocks < 0) then
+      print *, 'INPUT ERROR : group_blocks must be zero (one per thread) or positive'
+      stop
+    end if
+
     ! Check that the homogenization_map is provided correctly
     if (allocated(homogenization_map)) then
       if (spatial_dimension == 1) then
@@ -7,27 +7,43 @@ module dgm
 
   implicit none
 
+  real(kind=dp), allocatable, dimension(:) :: &
+      basis_blocks,         & ! Basis of each coarse group stored block after block
+      cell_volume             ! Volume of each cell for the homogenization
   real(kind=dp), allocatable, dimension(:,:) :: &
-      basis,                & ! Basis for expansion in energy
       source_m                ! Source moments
   real(kind=dp), allocatable, dimension(:,:,:) :: &
       chi_m,                & ! Chi spectrum moments
-      expanded_nu_sig_f       ! Expanded fission cross sections
+      expanded_nu_sig_f,    & ! Expanded fission cross sections
+      sig_s_m_blocks          ! Nonzero coarse group blocks of sig_s_m
   real(kind=dp), allocatable, dimension(:,:,:,:) :: &
       delta_m,              & ! Angular total XS moments
       phi_m,                & ! Scalar flux moments
       psi_m,                & ! Angular flux moments
-      expanded_sig_t          ! Expanded total cross sections
+      expanded_sig_t,       & ! Expanded total cross sections
+      expanded_sig_s_blocks   ! Nonzero coarse group blocks of expanded_sig_s
   real(kind=dp), allocatable, dimension(:,:,:,:,:) :: &
       sig_s_m                 ! Scattering XS moments
   real(kind=dp), allocatable, dimension(:,:,:,:,:,:) :: &
       expanded_sig_s          ! Expanded scattering cross sections
+  logical, allocatable, dimension(:,:,:) :: &
+      scatter_block_nonzero   ! Coarse group pairs of each material with scattering
+  real(kind=dp) :: &
+      moment_memory=0.0_8     ! Memory held by the moment containers (MB)
   integer :: &
       expansion_order,      & ! Maximum expansion order
       dgm_order=0             ! Current order
   integer, allocatable, dimension(:) :: &
       order,                & ! Expansion order for each coarse energy group
-      basismap                ! Starting index for fine group for each coarse group
+      basismap,             & ! Starting index for fine group for each coarse group
+      coarse_group_start,   & ! First fine group of each coarse group in coarse_group_fine
+      coarse_group_fine,    & ! Fine groups sorted by coarse group
+      basis_block_start,    & ! First entry of each coarse group in basis_blocks
+      region_block_offset,  & ! First block of each region in the block lists
+      region_block_cgp,     & ! Coarse group scattered from for each region block
+      region_block_cg         ! Coarse group scattered into for each region block
+  integer, allocatable, dimension(:,:,:) :: &
+      scatter_block_index     ! Block of expanded_sig_s_blocks for each material pair
 
   contains
 
@@ -103,6 +119,68 @@ module dgm
   subroutine initialize_basis()
     ! ##########################################################################
     ! Load basis set from file
+    !
+    ! Each coarse group keeps one block holding its fine groups and retained
+    ! orders.  The file is either the text basis with one row per fine group
+    ! or the binary block format, which starts with the characters DGMBASIS.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : dgm_basis_name
+
+    ! Variable definitions
+    character(len=8) :: &
+        magic  ! First characters of the file
+    integer :: &
+        ios    ! I/O status
+
+    call group_basis()
+
+    ! Check for the binary format
+    open(unit=5, file=dgm_basis_name, access='stream', form='unformatted', status='old', iostat=ios)
+    if (ios /= 0) then
+      print *, "INPUT ERROR : Unable to open the basis file ", trim(dgm_basis_name)
+      stop
+    end if
+    magic = ''
+    read(5, iostat=ios) magic
+    close(unit=5)
+
+    if (magic == 'DGMBASIS') then
+      call read_binary_basis()
+    else
+      call read_text_basis()
+    end if
+
+  end subroutine initialize_basis
+
+  subroutine expand_basis(dense)
+    ! ##########################################################################
+    ! Fill the basis with one row per fine group from the coarse group blocks
+    !
+    ! Only the blocks are kept, so this builds the dense view on demand for
+    ! Python.  dense has a column for each order up to expansion_order, which
+    ! is zero past the retained order of each coarse group.
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        dense  ! Basis for each fine group (row) and order (column)
+    integer :: &
+        cg     ! Coarse group index
+
+    dense = 0.0_8
+    do cg = 1, size(order)
+      dense(coarse_group_fine(coarse_group_start(cg):coarse_group_start(cg + 1) - 1), :order(cg) + 1) = &
+          reshape(basis_blocks(basis_block_start(cg):basis_block_start(cg + 1) - 1), &
+                  [coarse_group_start(cg + 1) - coarse_group_start(cg), order(cg) + 1])
+    end do  ! End cg loop
+
+  end subroutine expand_basis
+
+  subroutine read_text_basis()
+    ! ##########################################################################
+    ! Read the retained orders of each coarse group from the text basis
     ! ##########################################################################
 
     ! Use Statements
@@ -115,111 +193,387 @@ module dgm
         g,   & ! Fine group index
         gp,  & ! Fine group prime index
         cg,  & ! Coarse group index
-        i      ! Cell index
-
-    ! allocate the basis array
-    allocate(basis(number_fine_groups, 0:expansion_order))
-
-    ! initialize the basis to zero
-    basis = 0.0_8
+        n,   & ! Number of fine groups in the coarse group
+        r,   & ! Row of the fine group within its coarse group
+        i      ! Order index
 
     ! open the file and read into the basis container
     open(unit=5, file=dgm_basis_name)
     do g = 1, number_fine_groups
       cg = energy_group_map(g)
-      array1(:) = 0.0_8
+      n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+      r = count(energy_group_map(:g) == cg)
       read(5,*) array1
       i = 0
       do gp = 1, number_fine_groups
-        if (energy_group_map(gp) == cg) then
-          basis(g, i) = array1(gp)
-          i = i + 1
-        end if
         if (order(cg) < i) then
           exit
         end if
+        if (energy_group_map(gp) == cg) then
+          basis_blocks(basis_block_start(cg) + i * n + r - 1) = array1(gp)
+          i = i + 1
+        end if
       end do  ! End gp loop
     end do  ! End g loop
 
     ! clean up
     close(unit=5)
 
-  end subroutine initialize_basis
+  end subroutine read_text_basis
+
+  subroutine read_binary_basis()
+    ! ##########################################################################
+    ! Read the retained orders of each coarse group from the binary basis
+    !
+    ! The file holds the characters DGMBASIS, the number of fine and coarse
+    ! groups and the energy group map as 4 byte integers, followed by the
+    ! square block of each coarse group in column major order
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : dgm_basis_name, number_fine_groups, number_coarse_groups, energy_group_map
+
+    ! Variable definitions
+    character(len=8) :: &
+        magic        ! First characters of the file
+    integer(kind=4) :: &
+        file_groups, & ! Number of fine groups in the file
+        file_coarse    ! Number of coarse groups in the file
+    integer(kind=4), dimension(number_fine_groups) :: &
+        file_map       ! Energy group map of the file
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        block          ! Full basis of a coarse group
+    integer :: &
+        cg,          & ! Coarse group index
+        n              ! Number of fine groups in the coarse group
+
+    open(unit=5, file=dgm_basis_name, access='stream', form='unformatted', status='old')
+    read(5) magic, file_groups, file_coarse
+    if (file_groups /= number_fine_groups .or. file_coarse /= number_coarse_groups) then
+      print *, "INPUT ERROR : The basis file has ", file_groups, " fine and ", file_coarse, " coarse groups"
+      stop
+    end if
+    read(5) file_map
+    if (any(file_map /= energy_group_map)) then
+      print *, "INPUT ERROR : The basis file was written for a different energy_group_map"
+      stop
+    end if
+
+    do cg = 1, number_coarse_groups
+      n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+      allocate(block(n, 0:n - 1))
+      read(5) block
+      basis_blocks(basis_block_start(cg):basis_block_start(cg + 1) - 1) = reshape(block(:, 0:order(cg)), [n * (order(cg) + 1)])
+      deallocate(block)
+    end do  ! End cg loop
+
+    ! clean up
+    close(unit=5)
+
+  end subroutine read_binary_basis
+
+  subroutine group_basis()
+    ! ##########################################################################
+    ! Sort the fine groups by coarse group and size the basis blocks
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_fine_groups, number_coarse_groups, energy_group_map
+
+    ! Variable definitions
+    integer :: &
+        g,   & ! Fine group index
+        cg     ! Coarse group index
+
+    if (allocated(basis_blocks)) then
+      deallocate(basis_blocks, basis_block_start, coarse_group_start, coarse_group_fine)
+    end if
+    allocate(coarse_group_start(number_coarse_groups + 1))
+    allocate(coarse_group_fine(number_fine_groups))
+    allocate(basis_block_start(number_coarse_groups + 1))
+
+    coarse_group_start(1) = 1
+    basis_block_start(1) = 1
+    do cg = 1, number_coarse_groups
+      coarse_group_start(cg + 1) = coarse_group_start(cg) + count(energy_group_map == cg)
+      coarse_group_fine(coarse_group_start(cg):coarse_group_start(cg + 1) - 1) = &
+          pack([(g, g = 1, number_fine_groups)], energy_group_map == cg)
+      basis_block_start(cg + 1) = basis_block_start(cg) &
+                                + (coarse_group_start(cg + 1) - coarse_group_start(cg)) * (order(cg) + 1)
+    end do  ! End cg loop
+
+    allocate(basis_blocks(basis_block_start(number_coarse_groups + 1) - 1))
+    basis_blocks = 0.0_8
+
+  end subroutine group_basis
 
   subroutine compute_expanded_cross_sections()
     ! ##########################################################################
     ! Initialize and fill the expanded cross section containers
+    !
+    ! Each coarse group pair is projected onto the basis with matrix products
+    ! of the fine group block of the cross section with the basis rows of the
+    ! two coarse groups.  Scattering blocks that are zero for every fine group
+    ! pair are skipped and recorded in scatter_block_nonzero.  With
+    ! sparse_scatter only the nonzero blocks are stored.
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : number_coarse_groups, scatter_leg_order, number_fine_groups, &
-                        energy_group_map
+    use control, only : number_coarse_groups, scatter_leg_order, sparse_scatter
     use material, only : number_materials, sig_t, nu_sig_f, sig_s
 
     ! Variable definitions
     integer :: &
         m,   & ! Material index
-        g,   & ! Group index
-        gp,  & ! Group prime index
         cg,  & ! Coarse group index
         cgp, & ! Coarse group prime index
+        k,   & ! Block index
         l,   & ! Legendre index
-        i      ! order index
+        g1,  & ! First row of the coarse group
+        g2,  & ! Last row of the coarse group
+        gp1, & ! First row of the coarse group prime
+        gp2, & ! Last row of the coarse group prime
+        o,   & ! Retained order of the coarse group
+        op     ! Retained order of the coarse group prime
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        basis_cg,      & ! Basis block of the coarse group
+        basis_cgp        ! Basis block of the coarse group prime
 
     allocate(expanded_sig_t(0:expansion_order, number_coarse_groups, number_materials, 0:expansion_order))
     allocate(expanded_nu_sig_f(0:expansion_order, number_coarse_groups, number_materials))
-    allocate(expanded_sig_s(0:expansion_order, 0:scatter_leg_order, number_coarse_groups, &
-                            number_coarse_groups, number_materials, 0:expansion_order))
+    allocate(scatter_block_nonzero(number_coarse_groups, number_coarse_groups, number_materials))
 
     expanded_sig_t = 0.0_8
     expanded_nu_sig_f = 0.0_8
-    expanded_sig_s = 0.0_8
 
-    ! Fill the expanded total cross section
-    do i = 0, expansion_order
-      do m = 1, number_materials
-        do g = 1, number_fine_groups
-          cg = energy_group_map(g)
-          expanded_sig_t(:, cg, m, i) = expanded_sig_t(:, cg, m, i) &
-                                      + basis(g, i) * sig_t(g, m) * basis(g, :)
-        end do  ! End g loop
-      end do  ! End m loop
-    end do  ! End i loop
-
-    ! Fill the expanded fission cross section
-    do m = 1, number_materials
-      do g = 1, number_fine_groups
-        cg = energy_group_map(g)
-        expanded_nu_sig_f(:, cg, m) = expanded_nu_sig_f(:, cg, m) &
-                                    + nu_sig_f(g, m) * basis(g, :)
-      end do  ! End g loop
-    end do  ! End m loop
+    ! Find the coarse group pairs with scattering
+    do cg = 1, number_coarse_groups
+      g1 = coarse_group_start(cg)
+      g2 = coarse_group_start(cg + 1) - 1
+      do cgp = 1, number_coarse_groups
+        gp1 = coarse_group_start(cgp)
+        gp2 = coarse_group_start(cgp + 1) - 1
+        do m = 1, number_materials
+          scatter_block_nonzero(cgp, cg, m) = any(sig_s(0:scatter_leg_order, coarse_group_fine(gp1:gp2), &
+                                                        coarse_group_fine(g1:g2), m) /= 0.0_8)
+        end do  ! End m loop
+      end do  ! End cgp loop
+    end do  ! End cg loop
+
+    call index_scatter_blocks()
+
+    if (sparse_scatter) then
+      allocate(expanded_sig_s_blocks(0:expansion_order, 0:scatter_leg_order, &
+                                     count(scatter_block_nonzero), 0:expansion_order))
+      expanded_sig_s_blocks = 0.0_8
+    else
+      allocate(expanded_sig_s(0:expansion_order, 0:scatter_leg_order, number_coarse_groups, &
+                              number_coarse_groups, number_materials, 0:expansion_order))
+      expanded_sig_s = 0.0_8
+    end if
+
+    do cg = 1, number_coarse_groups
+      g1 = coarse_group_start(cg)
+      g2 = coarse_group_start(cg + 1) - 1
+      o = order(cg)
+      basis_cg = reshape(basis_blocks(basis_block_start(cg):basis_block_start(cg + 1) - 1), [g2 - g1 + 1, o + 1])
 
-    ! Fill the expanded scatter cross section
-    do i = 0, expansion_order
       do m = 1, number_materials
-        do g = 1, number_fine_groups
-          cg = energy_group_map(g)
-          do gp = 1, number_fine_groups
-            cgp = energy_group_map(gp)
-            do l = 0, scatter_leg_order
-              expanded_sig_s(:, l, cgp, cg, m, i) = expanded_sig_s(:, l, cgp, cg, m, i) &
-                                                  + basis(g, i) * sig_s(l, gp, g, m) * basis(gp, :)
-            end do  ! End l loop
-          end do  ! End gp loop
-        end do  ! End g loop
+        ! Fill the expanded total cross section
+        expanded_sig_t(:o, cg, m, :o) = matmul(transpose(basis_cg), &
+                                               spread(sig_t(coarse_group_fine(g1:g2), m), 2, o + 1) &
+                                               * basis_cg)
+
+        ! Fill the expanded fission cross section
+        expanded_nu_sig_f(:o, cg, m) = matmul(nu_sig_f(coarse_group_fine(g1:g2), m), basis_cg)
       end do  ! End m loop
-    end do  ! End i loop
+
+      ! Fill the expanded scatter cross section
+      do cgp = 1, number_coarse_groups
+        gp1 = coarse_group_start(cgp)
+        gp2 = coarse_group_start(cgp + 1) - 1
+        op = order(cgp)
+        basis_cgp = reshape(basis_blocks(basis_block_start(cgp):basis_block_start(cgp + 1) - 1), [gp2 - gp1 + 1, op + 1])
+        do m = 1, number_materials
+          k = scatter_block_index(cgp, cg, m)
+          if (k == 0) then
+            cycle
+          end if
+          do l = 0, scatter_leg_order
+            if (sparse_scatter) then
+              expanded_sig_s_blocks(:op, l, k, :o) = &
+                  matmul(transpose(basis_cgp), &
+                         matmul(sig_s(l, coarse_group_fine(gp1:gp2), coarse_group_fine(g1:g2), m), &
+                                basis_cg))
+            else
+              expanded_sig_s(:op, l, cgp, cg, m, :o) = &
+                  matmul(transpose(basis_cgp), &
+                         matmul(sig_s(l, coarse_group_fine(gp1:gp2), coarse_group_fine(g1:g2), m), &
+                                basis_cg))
+            end if
+          end do  ! End l loop
+        end do  ! End m loop
+      end do  ! End cgp loop
+    end do  ! End cg loop
 
   end subroutine compute_expanded_cross_sections
 
+  subroutine index_scatter_blocks()
+    ! ##########################################################################
+    ! Number the coarse group pairs of each material that have scattering
+    ! ##########################################################################
+
+    ! Variable definitions
+    integer :: &
+        m,   & ! Material index
+        cg,  & ! Coarse group index
+        cgp, & ! Coarse group prime index
+        k      ! Block index
+
+    if (allocated(scatter_block_index)) then
+      deallocate(scatter_block_index)
+    end if
+    allocate(scatter_block_index(size(scatter_block_nonzero, 1), size(scatter_block_nonzero, 2), &
+                                 size(scatter_block_nonzero, 3)))
+
+    k = 0
+    do m = 1, size(scatter_block_nonzero, 3)
+      do cg = 1, size(scatter_block_nonzero, 2)
+        do cgp = 1, size(scatter_block_nonzero, 1)
+          if (scatter_block_nonzero(cgp, cg, m)) then
+            k = k + 1
+            scatter_block_index(cgp, cg, m) = k
+          else
+            scatter_block_index(cgp, cg, m) = 0
+          end if
+        end do  ! End cgp loop
+      end do  ! End cg loop
+    end do  ! End m loop
+
+  end subroutine index_scatter_blocks
+
+  subroutine index_region_blocks(region_nonzero)
+    ! ##########################################################################
+    ! Build the lists of coarse group pairs with scattering in each region
+    ! ##########################################################################
+
+    ! Variable definitions
+    logical, intent(in), dimension(:,:,:) :: &
+        region_nonzero ! Coarse group pairs with scattering in each region
+    integer :: &
+        r,   & ! Region index
+        cg,  & ! Coarse group index
+        cgp, & ! Coarse group prime index
+        k      ! Block index
+
+    if (allocated(region_block_offset)) then
+      deallocate(region_block_offset, region_block_cgp, region_block_cg)
+    end if
+    allocate(region_block_offset(size(region_nonzero, 3) + 1))
+    allocate(region_block_cgp(count(region_nonzero)), region_block_cg(count(region_nonzero)))
+
+    k = 1
+    do r = 1, size(region_nonzero, 3)
+      region_block_offset(r) = k
+      do cg = 1, size(region_nonzero, 2)
+        do cgp = 1, size(region_nonzero, 1)
+          if (region_nonzero(cgp, cg, r)) then
+            region_block_cgp(k) = cgp
+            region_block_cg(k) = cg
+            k = k + 1
+          end if
+        end do  ! End cgp loop
+      end do  ! End cg loop
+    end do  ! End r loop
+    region_block_offset(size(region_nonzero, 3) + 1) = k
+
+  end subroutine index_region_blocks
+
+  subroutine measure_moment_memory(report)
+    ! ##########################################################################
+    ! Total the memory held by the moment containers and optionally print it
+    ! ##########################################################################
+
+    ! Variable definitions
+    logical, intent(in) :: &
+        report ! Print the memory of each container
+
+    moment_memory = 0.0_8
+    if (report) then
+      print *, 'DGM MOMENT MEMORY (MB)'
+    end if
+    if (allocated(phi_m)) then
+      call add_moment_memory('phi_m', size(phi_m, kind=8), report)
+    end if
+    if (allocated(psi_m)) then
+      call add_moment_memory('psi_m', size(psi_m, kind=8), report)
+    end if
+    if (allocated(source_m)) then
+      call add_moment_memory('source_m', size(source_m, kind=8), report)
+    end if
+    if (allocated(chi_m)) then
+      call add_moment_memory('chi_m', size(chi_m, kind=8), report)
+    end if
+    if (allocated(delta_m)) then
+      call add_moment_memory('delta_m', size(delta_m, kind=8), report)
+    end if
+    if (allocated(sig_s_m)) then
+      call add_moment_memory('sig_s_m', size(sig_s_m, kind=8), report)
+    end if
+    if (allocated(sig_s_m_blocks)) then
+      call add_moment_memory('sig_s_m_blocks', size(sig_s_m_blocks, kind=8), report)
+    end if
+    if (allocated(expanded_sig_t)) then
+      call add_moment_memory('expanded_sig_t', size(expanded_sig_t, kind=8), report)
+    end if
+    if (allocated(expanded_nu_sig_f)) then
+      call add_moment_memory('expanded_nu_sig_f', size(expanded_nu_sig_f, kind=8), report)
+    end if
+    if (allocated(expanded_sig_s)) then
+      call add_moment_memory('expanded_sig_s', size(expanded_sig_s, kind=8), report)
+    end if
+    if (allocated(expanded_sig_s_blocks)) then
+      call add_moment_memory('expanded_sig_s_blocks', size(expanded_sig_s_blocks, kind=8), report)
+    end if
+    if (report) then
+      print '(A, T24, A, F12.3)', '   total', '= ', moment_memory
+    end if
+
+  end subroutine measure_moment_memory
+
+  subroutine add_moment_memory(name, number, report)
+    ! ##########################################################################
+    ! Add the memory of one double precision container to the total
+    ! ##########################################################################
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        name     ! Name of the container
+    integer(kind=8), intent(in) :: &
+        number   ! Number of entries in the container
+    logical, intent(in) :: &
+        report   ! Print the memory of the container
+    real(kind=dp) :: &
+        megabytes ! Memory of the container
+
+    megabytes = real(number, kind=dp) * storage_size(1.0_dp) / 8.0_8 / 1048576.0_8
+    moment_memory = moment_memory + megabytes
+    if (report) then
+      print '(A, A, T24, A, F12.3)', '   ', name, '= ', megabytes
+    end if
+
+  end subroutine add_moment_memory
+
   subroutine finalize_moments()
     ! ##########################################################################
     ! Deallocate the variable containers
     ! ##########################################################################
 
-    if (allocated(basis)) then
-      deallocate(basis)
+    if (allocated(basis_blocks)) then
+      deallocate(basis_blocks, basis_block_start, coarse_group_start, coarse_group_fine)
+    end if
+    if (allocated(cell_volume)) then
+      deallocate(cell_volume)
     end if
     if (allocated(order)) then
       deallocate(order)
@@ -254,6 +608,21 @@ module dgm
     if (allocated(expanded_sig_s)) then
       deallocate(expanded_sig_s)
     end if
+    if (allocated(scatter_block_nonzero)) then
+      deallocate(scatter_block_nonzero)
+    end if
+    if (allocated(scatter_block_index)) then
+      deallocate(scatter_block_index)
+    end if
+    if (allocated(expanded_sig_s_blocks)) then
+      deallocate(expanded_sig_s_blocks)
+    end if
+    if (allocated(sig_s_m_blocks)) then
+      deallocate(sig_s_m_blocks)
+    end if
+    if (allocated(region_block_offset)) then
+      deallocate(region_block_offset, region_block_cgp, region_block_cg)
+    end if
   end subroutine finalize_moments
 
 end module dgm
@@ -28,6 +28,9 @@ module dgmsolver
 
     call compute_source_moments()
 
+    ! Size the cross section moment containers
+    call initialize_xs_moments()
+
     ! Delete the fine-group cross sections
     call finalize_material()
 
@@ -40,7 +43,7 @@ module dgmsolver
     ! The mg containers in state are set to coarse group size
     ! ##########################################################################
 
-    use dgm, only : expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, expansion_order, chi_m
+    use dgm, only : expansion_order
     use control, only : number_coarse_groups, scatter_leg_order, number_fine_groups, homogenization_map
     use material, only : number_materials, finalize_material
     use state, only : initialize_state, mg_mMap
@@ -56,8 +59,55 @@ module dgmsolver
       nFG              ! Input for the number of fine groups
     integer, dimension(6) :: &
       size6            ! Container to hold the array sizes
-    integer, dimension(3) :: &
-      size3            ! Container
+
+    size6 = shape(sig_s_mass)
+
+    expansion_order = size6(1) - 1
+    scatter_leg_order = size6(2) - 1
+    number_coarse_groups = size6(3)
+    number_materials = size6(5)
+    number_fine_groups = nFG
+
+    call update_dgmsolver_moments(sig_t_mass, nu_sig_f_mass, sig_s_mass, chi_m_in)
+
+    ! allocate the solutions variables
+    call initialize_state(.true.)
+
+    ! Fill the multigroup material map
+    mg_mMap = homogenization_map
+
+    ! Delete the fine-group cross sections
+    call finalize_material()
+
+    ! Build the source moments
+    call compute_source_moments(.True.)
+
+    ! Size the cross section moment containers
+    call initialize_xs_moments()
+
+  end subroutine initialize_dgmsolver_with_moments
+
+  subroutine update_dgmsolver_moments(sig_t_mass, nu_sig_f_mass, sig_s_mass, chi_m_in)
+    ! ##########################################################################
+    ! Replace the mass matrices of the cross sections
+    ! The expansion order, number of coarse groups and number of materials
+    ! must match the initialized solver.  The mesh, basis and flux moments are
+    ! kept, so the next dgmsolve starts from the last solution
+    ! ##########################################################################
+
+    use dgm, only : expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, expansion_order, chi_m, &
+                    scatter_block_nonzero, scatter_block_index, expanded_sig_s_blocks, &
+                    index_scatter_blocks, cell_volume
+    use control, only : number_coarse_groups, scatter_leg_order, sparse_scatter
+    use material, only : number_materials
+
+    real(kind=dp), dimension(:,:,:,:), intent(in) :: &
+      sig_t_mass       ! Input for the sig_t mass matrix
+    real(kind=dp), dimension(:,:,:), intent(in) :: &
+      nu_sig_f_mass, & ! Input for the sig_f mass matrix
+      chi_m_in         ! Input for the chi moment values
+    real(kind=dp), dimension(:,:,:,:,:,:), intent(in) :: &
+      sig_s_mass       ! Input for the sig_s mass matrix
     integer :: &
       nC, &
       c, &
@@ -68,20 +118,32 @@ module dgmsolver
       l, &
       m
 
-    size6 = shape(sig_s_mass)
-    size3 = shape(chi_m_in)
+    if (any(shape(sig_s_mass) /= [expansion_order + 1, scatter_leg_order + 1, number_coarse_groups, &
+                                  number_coarse_groups, number_materials, expansion_order + 1])) then
+      print *, 'INPUT ERROR : mass matrices do not match the shape of the initialized solver'
+      stop
+    end if
 
-    expansion_order = size6(1) - 1
-    scatter_leg_order = size6(2) - 1
-    number_coarse_groups = size6(3)
-    number_materials = size6(5)
-    number_fine_groups = nFG
-    nC = size3(2)
+    nC = size(chi_m_in, 2)
+
+    if (allocated(expanded_sig_t)) then
+      deallocate(expanded_sig_t, expanded_nu_sig_f)
+    end if
+    if (allocated(chi_m)) then
+      deallocate(chi_m)
+    end if
+    if (allocated(scatter_block_nonzero)) then
+      deallocate(scatter_block_nonzero)
+    end if
+    if (allocated(expanded_sig_s)) then
+      deallocate(expanded_sig_s)
+    end if
+    if (allocated(expanded_sig_s_blocks)) then
+      deallocate(expanded_sig_s_blocks)
+    end if
 
     allocate(expanded_sig_t(0:expansion_order, number_coarse_groups, number_materials, 0:expansion_order))
     allocate(expanded_nu_sig_f(0:expansion_order, number_coarse_groups, number_materials))
-    allocate(expanded_sig_s(0:expansion_order, 0:scatter_leg_order, number_coarse_groups, &
-                            number_coarse_groups, number_materials, 0:expansion_order))
     allocate(chi_m(number_coarse_groups, nC, 0:expansion_order))
 
     do o = 0, expansion_order
@@ -102,19 +164,45 @@ module dgmsolver
       end do
     end do
 
-    do o = 0, expansion_order
+    allocate(scatter_block_nonzero(number_coarse_groups, number_coarse_groups, number_materials))
+    do m = 1, number_materials
+      do g = 1, number_coarse_groups
+        do gp = 1, number_coarse_groups
+          scatter_block_nonzero(gp,g,m) = any(sig_s_mass(:,:,gp,g,m,:) /= 0.0_8)
+        end do
+      end do
+    end do
+    call index_scatter_blocks()
+
+    if (sparse_scatter) then
+      allocate(expanded_sig_s_blocks(0:expansion_order, 0:scatter_leg_order, &
+                                     count(scatter_block_nonzero), 0:expansion_order))
       do m = 1, number_materials
         do g = 1, number_coarse_groups
           do gp = 1, number_coarse_groups
-            do l = 0, scatter_leg_order
-              do oo = 0, expansion_order
-                expanded_sig_s(oo,l,gp,g,m,o) = sig_s_mass(oo+1,l+1,gp,g,m,o+1)
+            if (scatter_block_index(gp,g,m) > 0) then
+              expanded_sig_s_blocks(:,:,scatter_block_index(gp,g,m),:) = sig_s_mass(:,:,gp,g,m,:)
+            end if
+          end do
+        end do
+      end do
+    else
+      allocate(expanded_sig_s(0:expansion_order, 0:scatter_leg_order, number_coarse_groups, &
+                              number_coarse_groups, number_materials, 0:expansion_order))
+      do o = 0, expansion_order
+        do m = 1, number_materials
+          do g = 1, number_coarse_groups
+            do gp = 1, number_coarse_groups
+              do l = 0, scatter_leg_order
+                do oo = 0, expansion_order
+                  expanded_sig_s(oo,l,gp,g,m,o) = sig_s_mass(oo+1,l+1,gp,g,m,o+1)
+                end do
               end do
             end do
           end do
         end do
       end do
-    end do
+    end if
 
     do o = 0, expansion_order
       do c = 1, nC
@@ -124,19 +212,29 @@ module dgmsolver
       end do
     end do
 
-    ! allocate the solutions variables
-    call initialize_state(.true.)
+    ! The region block lists depend on which scattering blocks are nonzero
+    if (allocated(cell_volume)) then
+      call initialize_xs_moments()
+    end if
 
-    ! Fill the multigroup material map
-    mg_mMap = homogenization_map
+  end subroutine update_dgmsolver_moments
 
-    ! Delete the fine-group cross sections
-    call finalize_material()
+  subroutine update_dgmsolver_source(value)
+    ! ##########################################################################
+    ! Replace the constant source and rebuild its moments
+    ! ##########################################################################
 
-    ! Build the source moments
+    ! Use Statements
+    use solver, only : update_source
+
+    ! Variable definitions
+    real(kind=dp), intent(in) :: &
+        value      ! Constant source before scaling
+
+    call update_source(value)
     call compute_source_moments(.True.)
 
-  end subroutine initialize_dgmsolver_with_moments
+  end subroutine update_dgmsolver_source
 
   subroutine dgmsolve(bypass_arg)
     ! ##########################################################################
@@ -146,12 +244,16 @@ module dgmsolver
     ! Use Statements
     use control, only : max_recon_iters, recon_print, recon_tolerance, store_psi, &
                         ignore_warnings, lamb, number_cells, spatial_dimension, &
-                        number_moments, number_angles_per_octant, min_recon_iters, number_coarse_groups
+                        number_moments, number_angles_per_octant, min_recon_iters, number_coarse_groups, &
+                        recon_acceleration, anderson_depth, parallel_orders, checkpoint_interval, &
+                        restart_name
     use state, only : keff, phi, psi, mg_phi, mg_psi, normalize_flux, &
                       update_fission_density, output_moments, recon_convergence_rate, &
-                      mg_incident_x, mg_incident_y, eigen_count, recon_count, exit_status
+                      mg_incident_x, mg_incident_y, eigen_count, recon_count, exit_status, &
+                      write_checkpoint, read_checkpoint
     use dgm, only : expansion_order, phi_m, psi_m, dgm_order
     use solver, only : solve
+    use acceleration, only : anderson_mix
     use omp_lib, only : omp_get_wtime
 
     ! Variable definitions
@@ -172,9 +274,20 @@ module dgmsolver
     real(kind=dp), dimension(0:expansion_order, number_coarse_groups, 2 * spatial_dimension * &
                                 number_angles_per_octant, number_cells) :: &
         old_psi_m         ! Angular flux from previous iteration
+    real(kind=dp), allocatable, dimension(:) :: &
+        x,              & ! Packed flux moments entering the iteration
+        gx,             & ! Packed flux moments leaving the iteration
+        last_f,         & ! Anderson residual of the previous iteration
+        last_g            ! Anderson map of the previous iteration
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        delta_f,        & ! Anderson history of the residual differences
+        delta_g           ! Anderson history of the map differences
     integer :: &
-        recon_estimate    ! Estimate for the total number of iterations
-        
+        recon_estimate, & ! Estimate for the total number of iterations
+        history,        & ! Number of iterations seen by the Anderson mixing
+        n1,             & ! End of the scalar flux moments in the packed vector
+        first_recon       ! First recon iteration (after a restart)
+
 
     if (present(bypass_arg)) then
       bypass_flag = bypass_arg
@@ -185,10 +298,30 @@ module dgmsolver
     ! Expand the fluxes into moment form
     call compute_flux_moments()
 
+    ! Resume from a checkpoint of the recon loop
+    first_recon = 1
+    if (len_trim(restart_name) > 0) then
+      call read_checkpoint('recon', first_recon)
+      call update_fission_density()
+    end if
+
     past_error = 0.0_8
     ave_sweep_time = 0.0_8
 
-    do recon_count = 1, max_recon_iters
+    ! Storage for the Anderson mixing of the flux moments
+    n1 = size(phi_m)
+    if (recon_acceleration == 'anderson') then
+      if (store_psi) then
+        allocate(x(n1 + size(psi_m)))
+      else
+        allocate(x(n1))
+      end if
+      allocate(gx(size(x)), last_f(size(x)), last_g(size(x)))
+      allocate(delta_f(size(x), anderson_depth), delta_g(size(x), anderson_depth))
+      history = 0
+    end if
+
+    do recon_count = first_recon, max_recon_iters
       start = omp_get_wtime()
     
       ! Save the old value of the scalar flux
@@ -205,6 +338,11 @@ module dgmsolver
       ! Solve for each order
       do dgm_order = 0, expansion_order
 
+        ! The higher orders are solved together after the loop
+        if (parallel_orders .and. dgm_order > 0) then
+          cycle
+        end if
+
         ! Reset the incident conditions to vacuum
         mg_incident_x(:,:,:,:) = 0.0_8
         mg_incident_y(:,:,:,:) = 0.0_8
@@ -229,10 +367,32 @@ module dgmsolver
 
       end do  ! End dgm_order loop
 
-      ! Update flux using krasnoselskii iteration
-      phi_m = (1.0_8 - lamb) * old_phi_m + lamb * phi_m
-      if (store_psi) then
-        psi_m = (1.0_8 - lamb) * old_psi_m + lamb * psi_m
+      if (parallel_orders .and. expansion_order > 0) then
+        call solve_higher_orders()
+        if (exit_status == 1) then
+            return
+        end if
+      end if
+
+      if (recon_acceleration == 'anderson') then
+        ! Update flux by mixing the previous iterations with lamb as damping
+        x(:n1) = reshape(old_phi_m, [n1])
+        gx(:n1) = reshape(phi_m, [n1])
+        if (store_psi) then
+          x(n1 + 1:) = reshape(old_psi_m, [size(psi_m)])
+          gx(n1 + 1:) = reshape(psi_m, [size(psi_m)])
+        end if
+        call anderson_mix(x, gx, lamb, delta_f, delta_g, last_f, last_g, history)
+        phi_m = reshape(x(:n1), shape(phi_m))
+        if (store_psi) then
+          psi_m = reshape(x(n1 + 1:), shape(psi_m))
+        end if
+      else
+        ! Update flux using krasnoselskii iteration
+        phi_m = (1.0_8 - lamb) * old_phi_m + lamb * phi_m
+        if (store_psi) then
+          psi_m = (1.0_8 - lamb) * old_psi_m + lamb * psi_m
+        end if
       end if
 
       ! Compute the fission density
@@ -253,7 +413,8 @@ module dgmsolver
         recon_estimate = 1000000
       end if
 
-      ave_sweep_time = ((recon_count - 1) * ave_sweep_time + (omp_get_wtime() - start)) / recon_count
+      ave_sweep_time = ((recon_count - first_recon) * ave_sweep_time + (omp_get_wtime() - start)) / &
+                       (recon_count - first_recon + 1)
 
       ! Print output
       if (recon_print > 0) then
@@ -267,6 +428,13 @@ module dgmsolver
         end if
       end if
 
+      ! Save the flux moments so an interrupted solve can resume
+      if (checkpoint_interval > 0) then
+        if (mod(recon_count, checkpoint_interval) == 0) then
+          call write_checkpoint('recon', recon_count)
+        end if
+      end if
+
       ! Check if tolerance is reached
       if ((recon_error < recon_tolerance .and. recon_count >= min_recon_iters) .or. bypass_flag) then
         exit
@@ -274,6 +442,10 @@ module dgmsolver
 
     end do  ! End recon_count loop
 
+    if (allocated(x)) then
+      deallocate(x, gx, last_f, last_g, delta_f, delta_g)
+    end if
+
     ! Unfold to fine-group flux
     call unfold_flux_moments()
 
@@ -293,46 +465,165 @@ module dgmsolver
 
   end subroutine dgmsolve
 
+  subroutine solve_higher_orders()
+    ! ##########################################################################
+    ! Solve the expansion orders above zero concurrently
+    !
+    ! The higher orders only depend on the zeroth order moments, so each order
+    ! is a fixed source problem that needs no scattering iterations.  Every
+    ! order is swept into its own containers and the mg containers are left
+    ! untouched, which lets the orders run on separate threads.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : spatial_dimension, number_groups, number_angles, number_angles_per_octant, &
+                        number_cells, number_cells_x, number_cells_y, number_moments, &
+                        max_outer_iters, max_eigen_iters, min_outer_iters, outer_tolerance, &
+                        store_psi, recon_print
+    use state, only : mg_psi, sweep_count, exit_status
+    use dgm, only : expansion_order, phi_m, psi_m
+    use sources, only : compute_order_source
+    use sweeper_1D, only : update_closure_tables_1D, sweep_source_1D
+    use sweeper_2D, only : update_closure_tables_2D, sweep_source_2D
+
+    ! Variable definitions
+    real(kind=dp), allocatable, dimension(:,:,:,:) :: &
+        incident_x,   & ! Angular flux incident on the current cell in x direction
+        incident_y      ! Angular flux incident on the current cell in y direction
+    real(kind=dp), allocatable, dimension(:,:,:) :: &
+        source,       & ! Angular source of the order
+        phi,          & ! Scalar flux moments of the order
+        old_phi,      & ! Scalar flux moments from the previous sweep
+        psi             ! Angular flux of the order
+    integer :: &
+        o,            & ! Expansion order
+        count,        & ! Number of sweeps for the order
+        sweeps          ! Total number of sweeps over all orders
+
+    ! The orders share the closure tables, so they must be current beforehand
+    if (spatial_dimension == 1) then
+      call update_closure_tables_1D()
+    else
+      call update_closure_tables_2D()
+    end if
+
+    sweeps = 0
+
+    !$omp parallel do default(shared) schedule(dynamic) reduction(+:sweeps) &
+    !$omp private(o, count, source, phi, old_phi, psi, incident_x, incident_y)
+    do o = 1, expansion_order
+      allocate(source(number_groups, number_angles, number_cells))
+      allocate(phi(0:number_moments, number_groups, number_cells))
+      allocate(old_phi(0:number_moments, number_groups, number_cells))
+      allocate(psi(number_groups, number_angles, number_cells))
+      if (spatial_dimension == 1) then
+        allocate(incident_x(number_groups, number_angles_per_octant, number_cells_y, 1))
+        allocate(incident_y(number_groups, number_angles_per_octant, number_cells_x, 1))
+      else
+        allocate(incident_x(number_groups, number_angles_per_octant, number_cells_y, 4))
+        allocate(incident_y(number_groups, number_angles_per_octant, number_cells_x, 4))
+      end if
+
+      call compute_order_source(o, source)
+
+      ! Start from vacuum and sweep until the boundary fluxes converge
+      incident_x = 0.0_8
+      incident_y = 0.0_8
+      phi = 0.0_8
+      do count = 1, max(max_eigen_iters, max_outer_iters)
+        old_phi = phi
+        if (spatial_dimension == 1) then
+          call sweep_source_1D(source, incident_x(:, :, 1, 1), phi, psi)
+        else
+          call sweep_source_2D(source, incident_x, incident_y, phi, psi)
+        end if
+        sweeps = sweeps + 1
+
+        if (maxval(abs(phi - old_phi)) < outer_tolerance .and. count >= min_outer_iters) then
+          exit
+        end if
+      end do  ! End count loop
+
+      ! Save the new flux moments
+      phi_m(o, :, :, :) = phi
+      if (store_psi) then
+        psi_m(o, :, :, :) = psi
+      else
+        psi_m(o, :, :, :) = mg_psi
+      end if
+
+      deallocate(source, phi, old_phi, psi, incident_x, incident_y)
+    end do  ! End o loop
+    !$omp end parallel do
+
+    sweep_count = sweep_count + sweeps
+
+    ! Check for NaN during convergence
+    if (any(phi_m /= phi_m)) then
+      print *, "NaN detected...exiting"
+      exit_status = 1
+      return
+    end if
+
+    ! Print the moments if verbose printing is on
+    if (recon_print > 1) then
+      do o = 1, expansion_order
+        print *, o, phi_m(o, :, :, :)
+      end do  ! End o loop
+    end if
+
+  end subroutine solve_higher_orders
+
   subroutine unfold_flux_moments()
     ! ##########################################################################
     ! Unfold the fluxes from the moments
+    !
+    ! Each basis entry of a coarse group adds its moment to the flux of its
+    ! fine group for all cells and angles.  The truncated angular flux is the
+    ! Legendre sum of the unfolded scalar flux moments.
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : number_fine_groups, number_angles, number_cells, &
-                        energy_group_map, store_psi, truncate_delta, delta_leg_order
+    use control, only : number_cells, number_coarse_groups, store_psi, truncate_delta, delta_leg_order
     use angle, only : p_leg
-    use dgm, only : basis, expansion_order, phi_m, psi_m
+    use dgm, only : basis_blocks, basis_block_start, coarse_group_start, coarse_group_fine, order, phi_m, psi_m
     use state, only : phi, psi
 
     ! Variable definitions
-    real(kind=dp), dimension(0:expansion_order) :: &
-        tmp_psi_m     ! Legendre polynomial integration vector
     integer :: &
-        a,          & ! Angle index
         c,          & ! Cell index
-        g             ! Fine group index
+        cg,         & ! Coarse group index
+        g,          & ! Fine group index
+        j,          & ! Expansion order index
+        i,          & ! Fine group index within the coarse group
+        n,          & ! Number of fine groups in the coarse group
+        b             ! Index of the basis entry in basis_blocks
+
+    phi = 0.0_8
+    if (store_psi .and. .not. truncate_delta) then
+      psi = 0.0_8
+    end if
 
-    ! Get scalar flux from moments
-    do c = 1, number_cells
-      do g = 1, number_fine_groups
-        phi(:, g, c) = matmul(basis(g, :), phi_m(:, :, energy_group_map(g), c))
-      end do  ! End g loop
-    end do  ! End c loop
+    do cg = 1, number_coarse_groups
+      n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+      b = basis_block_start(cg)
+      do j = 0, order(cg)
+        do i = 1, n
+          g = coarse_group_fine(coarse_group_start(cg) + i - 1)
+          ! Get scalar flux from moments
+          phi(:, g, :) = phi(:, g, :) + basis_blocks(b) * phi_m(j, :, cg, :)
+          ! Get angular flux from moments
+          if (store_psi .and. .not. truncate_delta) then
+            psi(g, :, :) = psi(g, :, :) + basis_blocks(b) * psi_m(j, cg, :, :)
+          end if
+          b = b + 1
+        end do  ! End i loop
+      end do  ! End j loop
+    end do  ! End cg loop
 
-    if (store_psi) then
+    if (store_psi .and. truncate_delta) then
       do c = 1, number_cells
-        do a = 1, number_angles
-          do g = 1, number_fine_groups
-            if (truncate_delta) then
-              tmp_psi_m = matmul(phi_m(:, :delta_leg_order, energy_group_map(g), c), &
-                                 p_leg(:delta_leg_order, a))
-            else
-              tmp_psi_m = psi_m(:, energy_group_map(g), a, c)
-            end if
-            psi(g, a, c) = dot_product(basis(g, :), tmp_psi_m)
-          end do  ! End g loop
-        end do  ! End a loop
+        psi(:, :, c) = matmul(transpose(phi(:delta_leg_order, :, c)), p_leg(:delta_leg_order, :))
       end do  ! End c loop
     end if
 
@@ -359,73 +650,77 @@ module dgmsolver
 
     ! Use Statements
     use state, only : finalize_state
+    use sweeper_1D, only : finalize_sweeper_1D
+    use sweeper_2D, only : finalize_sweeper_2D
 
     call finalize_state()
+    call finalize_sweeper_1D()
+    call finalize_sweeper_2D()
 
   end subroutine finalize_dgmsolver
 
   subroutine compute_flux_moments()
     ! ##########################################################################
     ! Expand the flux moments using the basis functions
+    !
+    ! Each basis entry of a coarse group adds the flux of its fine group to
+    ! the moment for all cells and angles
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : number_angles, number_fine_groups, number_cells, &
-                        energy_group_map, delta_leg_order, truncate_delta
+    use control, only : number_cells, number_coarse_groups, delta_leg_order, truncate_delta
     use state, only : phi, psi
-    use dgm, only : phi_m, psi_m, basis, expansion_order
+    use dgm, only : phi_m, psi_m, basis_blocks, basis_block_start, coarse_group_start, coarse_group_fine, &
+                    order
     use angle, only : p_leg
 
     ! Variable definitions
     integer :: &
-        a,    & ! Angle index
         c,    & ! Cell index
+        cg,   & ! Coarse group index
+        g,    & ! Fine group index
         j,    & ! Expansion order index
-        cg,   & ! Outer coarse group index
-        ord,  & ! Delta truncation order
-        g       ! Outer fine group index
-    real(kind=dp) :: &
-        tmp_psi ! temporary angular
-
+        i,    & ! Fine group index within the coarse group
+        n,    & ! Number of fine groups in the coarse group
+        b       ! Index of the basis entry in basis_blocks
 
     ! initialize all moments to zero
     phi_m = 0.0_8
     psi_m = 0.0_8
 
-    ! Get moments for the Angular flux
-    do c = 1, number_cells
-      do a = 1, number_angles
-        do g = 1, number_fine_groups
-          cg = energy_group_map(g)
-
-          if (truncate_delta) then
-            ! If we are truncating the delta term, then first truncate
-            ! the angular flux (because the idea is that we would only store
-            ! the angular moments and then the discrete delta term would be
-            ! generated on the fly from the corresponding delta moments)
-            ord = delta_leg_order
-            tmp_psi = dot_product(p_leg(:ord, a), phi(:ord, g, c))
-          else
-            tmp_psi = psi(g, a, c)
+    do cg = 1, number_coarse_groups
+      n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+      b = basis_block_start(cg)
+      do j = 0, order(cg)
+        do i = 1, n
+          g = coarse_group_fine(coarse_group_start(cg) + i - 1)
+          ! Get moments for the Angular flux
+          if (.not. truncate_delta) then
+            psi_m(j, cg, :, :) = psi_m(j, cg, :, :) + basis_blocks(b) * psi(g, :, :)
           end if
-          do j = 0, expansion_order
-            psi_m(j, cg, a, c) = psi_m(j, cg, a, c) + basis(g, j) * tmp_psi
-          end do  ! End j loop
-        end do  ! End g loop
-      end do  ! End a loop
-    end do  ! End c loop
-
-    !TODO: Integrate psi_m_zero over angle to get phi_m_zero
 
-    ! Get moments for the Scalar flux
-    do c = 1, number_cells
-      do g = 1, number_fine_groups
-        cg = energy_group_map(g)
-        do j = 0, expansion_order
-          phi_m(j, :, cg, c) = phi_m(j, :, cg, c) + basis(g, j) * phi(:, g, c)
-        end do  ! End j loop
-      end do  ! End g loop
-    end do  ! End c loop
+          !TODO: Integrate psi_m_zero over angle to get phi_m_zero
+
+          ! Get moments for the Scalar flux
+          phi_m(j, :, cg, :) = phi_m(j, :, cg, :) + basis_blocks(b) * phi(:, g, :)
+          b = b + 1
+        end do  ! End i loop
+      end do  ! End j loop
+    end do  ! End cg loop
+
+    if (truncate_delta) then
+      ! If we are truncating the delta term, then the angular flux is
+      ! truncated to its Legendre moments (because the idea is that we would
+      ! only store the angular moments and then the discrete delta term would
+      ! be generated on the fly from the corresponding delta moments).  The
+      ! truncation is linear, so the moments follow from the scalar flux
+      ! moments without storing the truncated fine group angular flux.
+      do c = 1, number_cells
+        do cg = 1, number_coarse_groups
+          psi_m(:order(cg), cg, :, c) = matmul(phi_m(:order(cg), :delta_leg_order, cg, c), p_leg(:delta_leg_order, :))
+        end do  ! End cg loop
+      end do  ! End c loop
+    end if
 
   end subroutine compute_flux_moments
 
@@ -435,31 +730,121 @@ module dgmsolver
     ! ##########################################################################
 
     ! Use Statements
-    use state, only : mg_chi, mg_sig_s
-    use dgm, only : chi_m, sig_s_m
+    use state, only : mg_chi, mg_sig_s, update_scatter_kernel
+    use control, only : sparse_scatter, number_regions
+    use dgm, only : chi_m, sig_s_m, sig_s_m_blocks, region_block_offset, region_block_cgp, &
+                    region_block_cg
 
     ! Variable definitions
     integer, intent(in) :: &
         order  ! Expansion order
+    integer :: &
+        r,   & ! Region index
+        k      ! Block index
 
     mg_chi(:, :) = chi_m(:, :, order)
-    mg_sig_s(:,:,:,:) = sig_s_m(:, :, :, :, order)
+    if (sparse_scatter) then
+      ! Expand the stored blocks of this order
+      mg_sig_s = 0.0_8
+      do r = 1, number_regions
+        do k = region_block_offset(r), region_block_offset(r + 1) - 1
+          mg_sig_s(:, region_block_cgp(k), region_block_cg(k), r) = sig_s_m_blocks(:, k, order)
+        end do  ! End k loop
+      end do  ! End r loop
+    else
+      mg_sig_s(:,:,:,:) = sig_s_m(:, :, :, :, order)
+    end if
+
+    ! Refresh the cached scattering kernel
+    call update_scatter_kernel()
 
   end subroutine slice_xs_moments
 
+  subroutine initialize_xs_moments()
+    ! ##########################################################################
+    ! Allocate the cross section moment containers once for the whole solve
+    ! The cell volumes and region block lists do not change between recon
+    ! iterations, so they are computed here as well
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_angles, number_cells, number_cells_x, number_cells_y, &
+                        number_groups, number_regions, scatter_leg_order, sparse_scatter, &
+                        recon_print
+    use state, only : mg_mMap
+    use mesh, only : mMap, dx, dy
+    use dgm, only : sig_s_m, delta_m, expansion_order, scatter_block_nonzero, sig_s_m_blocks, &
+                    region_block_cg, cell_volume, index_region_blocks, measure_moment_memory
+
+    ! Variable definitions
+    integer :: &
+        c,             & ! Cell index
+        cx,            & ! Cell index for x cells
+        cy,            & ! Cell index for y cells
+        r                ! Region index
+    logical, dimension(number_groups, number_groups, number_regions) :: &
+        region_nonzero   ! Coarse group pairs with scattering in each region
+
+    if (allocated(delta_m)) then
+      deallocate(delta_m)
+    end if
+    if (allocated(sig_s_m)) then
+      deallocate(sig_s_m)
+    end if
+    if (allocated(sig_s_m_blocks)) then
+      deallocate(sig_s_m_blocks)
+    end if
+    if (allocated(cell_volume)) then
+      deallocate(cell_volume)
+    end if
+
+    allocate(delta_m(number_groups, number_angles, number_regions, 0:expansion_order))
+    delta_m = 0.0_8
+
+    if (sparse_scatter) then
+      ! A region holds the blocks of every material within it
+      region_nonzero = .false.
+      do c = 1, number_cells
+        r = mg_mMap(c)
+        region_nonzero(:, :, r) = region_nonzero(:, :, r) .or. scatter_block_nonzero(:, :, mMap(c))
+      end do  ! End c loop
+      call index_region_blocks(region_nonzero)
+      allocate(sig_s_m_blocks(0:scatter_leg_order, size(region_block_cg), 0:expansion_order))
+      sig_s_m_blocks = 0.0_8
+    else
+      allocate(sig_s_m(0:scatter_leg_order, number_groups, number_groups, number_regions, 0:expansion_order))
+      sig_s_m = 0.0_8
+    end if
+
+    allocate(cell_volume(number_cells))
+    c = 1
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        cell_volume(c) = dx(cx) * dy(cy)
+        c = c + 1
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+    ! The report is only printed at the verbose recon output level
+    call measure_moment_memory(recon_print > 1)
+
+  end subroutine initialize_xs_moments
+
   subroutine compute_xs_moments()
     ! ##########################################################################
     ! Expand the cross section moments using the basis functions
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : number_angles, number_cells_x, number_cells_y, number_moments, &
-                        number_groups, delta_leg_order, truncate_delta, number_regions, &
-                        scatter_leg_order, number_coarse_groups
+    use control, only : number_angles, number_cells, number_moments, number_groups, &
+                        delta_leg_order, truncate_delta, number_regions, &
+                        scatter_leg_order, number_coarse_groups, sparse_scatter
     use state, only : mg_sig_t, mg_nu_sig_f, mg_mMap
-    use mesh, only : mMap, dx, dy
+    use mesh, only : mMap
     use dgm, only : phi_m, psi_m, sig_s_m, delta_m, expansion_order, &
-                    expanded_sig_t, expanded_nu_sig_f, expanded_sig_s
+                    expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, scatter_block_nonzero, &
+                    scatter_block_index, expanded_sig_s_blocks, sig_s_m_blocks, &
+                    region_block_offset, region_block_cgp, region_block_cg, cell_volume
     use angle, only : p_leg
 
     ! Variable definitions
@@ -467,35 +852,34 @@ module dgmsolver
         o,           & ! Order index
         a,           & ! Angle index
         c,           & ! Cell index
-        cx,          & ! Cell index for x cells
-        cy,          & ! Cell index for y cells
         cg,          & ! Outer coarse group index
         cgp,         & ! Inner coarse group index
         l,           & ! Legendre moment index
         r,           & ! Region index
         ord,         & ! Delta truncation order
+        k,           & ! Region block index
+        km,          & ! Material block index
         mat            ! Material index
     real(kind=dp) :: &
-        tolerance,   & ! Variable to hold the tolerance check for dividing by zero
-        float          ! temporary double precision number
+        tolerance      ! Variable to hold the tolerance check for dividing by zero
     real(kind=dp), dimension(0:expansion_order) :: &
-        tmp_psi_m      ! flux arrays
+        tmp_psi_m,   & ! flux arrays
+        delta          ! Angular total cross section moment of each order
     real(kind=dp), dimension(0:number_moments, number_groups, number_regions) :: &
-        homog_phi      ! Homogenization container
+        homog_phi,   & ! Homogenization container
+        weight         ! Inverse of the homogenization container where it is nonzero
 
-    ! Reset the moment containers if need be
-    if (allocated(delta_m)) then
-      deallocate(delta_m)
-    end if
-    if (allocated(sig_s_m)) then
-      deallocate(sig_s_m)
+    ! The containers are sized once per solve
+    if (.not. allocated(cell_volume)) then
+      call initialize_xs_moments()
     end if
 
-    allocate(delta_m(number_groups, number_angles, number_regions, 0:expansion_order))
-    allocate(sig_s_m(0:scatter_leg_order, number_groups, number_groups, number_regions, 0:expansion_order))
-
     ! initialize all moments and mg containers to zero
-    sig_s_m = 0.0_8
+    if (sparse_scatter) then
+      sig_s_m_blocks = 0.0_8
+    else
+      sig_s_m = 0.0_8
+    end if
     delta_m = 0.0_8
 
     ! Set the tolerance as the smallest number of the same type as homog_phi
@@ -503,112 +887,94 @@ module dgmsolver
 
     ! Compute the denominator for spatial homogenization
     homog_phi = 0.0_8
-    c = 1
-    do cy = 1, number_cells_y
-      do cx = 1, number_cells_x
-        r = mg_mMap(c)
-        homog_phi(0:, :, r) = homog_phi(0:, :, r) + dx(cx) * dy(cy) * phi_m(0, 0:, :, c)
-        c = c + 1
-      end do  ! End cx loop
-    end do  ! End cy loop
+    do c = 1, number_cells
+      r = mg_mMap(c)
+      homog_phi(:, :, r) = homog_phi(:, :, r) + cell_volume(c) * phi_m(0, :, :, c)
+    end do  ! End c loop
 
-    ! Compute the total cross section moments
-    mg_sig_t = 0.0_8
-    c = 1
-    do cy = 1, number_cells_y
-      do cx = 1, number_cells_x
-        mat = mMap(c)
-        r = mg_mMap(c)
-        do cg = 1, number_coarse_groups
-          float = dot_product(phi_m(:, 0, cg, c), expanded_sig_t(:, cg, mat, 0))
-          ! Avoid dividing by zero
-          if (abs(homog_phi(0, cg, r)) > tolerance) then
-            mg_sig_t(cg, r) = mg_sig_t(cg, r) + dx(cx) * dy(cy) * float / homog_phi(0, cg, r)
-          end if
-        end do  ! End cg loop
-        c = c + 1
-      end do  ! End cx loop
-    end do  ! End cy loop
+    ! Avoid dividing by zero
+    where (abs(homog_phi) > tolerance)
+      weight = 1.0_8 / homog_phi
+    elsewhere
+      weight = 0.0_8
+    end where
 
-    ! Compute the fission cross section moments
+    ! Compute the total and fission cross section moments
+    mg_sig_t = 0.0_8
     mg_nu_sig_f = 0.0_8
-    c = 1
-    do cy = 1, number_cells_y
-      do cx = 1, number_cells_x
-        mat = mMap(c)
-        r = mg_mMap(c)
-        do cg = 1, number_coarse_groups
-          float = dot_product(phi_m(:, 0, cg, c), expanded_nu_sig_f(:, cg, mat))
-          ! Avoid dividing by zero
-          if (abs(homog_phi(0, cg, r)) > tolerance) then
-            mg_nu_sig_f(cg, r) = mg_nu_sig_f(cg, r) + dx(cx) * dy(cy) * float / homog_phi(0, cg, r)
-          end if
-        end do  ! End cg loop
-        c = c + 1
-      end do  ! End cx loop
-    end do  ! End cy loop
+    do c = 1, number_cells
+      mat = mMap(c)
+      r = mg_mMap(c)
+      mg_sig_t(:, r) = mg_sig_t(:, r) + cell_volume(c) * weight(0, :, r) &
+                     * sum(phi_m(:, 0, :, c) * expanded_sig_t(:, :, mat, 0), dim=1)
+      mg_nu_sig_f(:, r) = mg_nu_sig_f(:, r) + cell_volume(c) * weight(0, :, r) &
+                        * sum(phi_m(:, 0, :, c) * expanded_nu_sig_f(:, :, mat), dim=1)
+    end do  ! End c loop
 
     ! Compute the scattering cross section moments
-    do o = 0, expansion_order
-      c = 1
-      do cy = 1, number_cells_y
-        do cx = 1, number_cells_x
-          ! get the material for the current cell
-          mat = mMap(c)
-          r = mg_mMap(c)
-          do cg = 1, number_coarse_groups
-            do cgp = 1, number_coarse_groups
+    do c = 1, number_cells
+      ! get the material for the current cell
+      mat = mMap(c)
+      r = mg_mMap(c)
+      if (sparse_scatter) then
+        ! Only the stored blocks are expanded
+        do k = region_block_offset(r), region_block_offset(r + 1) - 1
+          cgp = region_block_cgp(k)
+          km = scatter_block_index(cgp, region_block_cg(k), mat)
+          if (km == 0) then
+            cycle
+          end if
+          do o = 0, expansion_order
+            do l = 0, scatter_leg_order
+              sig_s_m_blocks(l, k, o) = sig_s_m_blocks(l, k, o) + cell_volume(c) * weight(l, cgp, r) &
+                                      * dot_product(phi_m(:, l, cgp, c), expanded_sig_s_blocks(:, l, km, o))
+            end do  ! End l loop
+          end do  ! End o loop
+        end do  ! End k loop
+      else
+        do cg = 1, number_coarse_groups
+          do cgp = 1, number_coarse_groups
+            ! Skip the coarse group pairs without scattering
+            if (.not. scatter_block_nonzero(cgp, cg, mat)) then
+              cycle
+            end if
+            do o = 0, expansion_order
               do l = 0, scatter_leg_order
-                float = dot_product(phi_m(:, l, cgp, c), expanded_sig_s(:, l, cgp, cg, mat, o))
-                ! Avoid dividing by zero
-                if (abs(homog_phi(l, cgp, r)) > tolerance) then
-                    sig_s_m(l, cgp, cg, r, o) = sig_s_m(l, cgp, cg, r, o) &
-                                              + dx(cx) * dy(cy) * float / homog_phi(l, cgp, r)
-                end if
+                sig_s_m(l, cgp, cg, r, o) = sig_s_m(l, cgp, cg, r, o) + cell_volume(c) * weight(l, cgp, r) &
+                                          * dot_product(phi_m(:, l, cgp, c), expanded_sig_s(:, l, cgp, cg, mat, o))
               end do  ! End l loop
-            end do  ! End cgp loop
-          end do  ! End cg loop
-          c = c + 1
-        end do  ! End cx loop
-      end do  ! End cy loop
-    end do  ! End o loop
+            end do  ! End o loop
+          end do  ! End cgp loop
+        end do  ! End cg loop
+      end if
+    end do  ! End c loop
 
-    ! Compute delta
+    ! Compute delta for all orders at once
     ord = delta_leg_order
-    do o = 0, expansion_order
-      ! Add angular total cross section moment (delta) to the external source
-      c = 1
-      do cy = 1, number_cells_y
-        do cx = 1, number_cells_x
-          ! get the material for the current cell
-          mat = mMap(c)
-          r = mg_mMap(c)
-          do a = 1, number_angles
-            do cg = 1, number_coarse_groups
-              if (truncate_delta) then
-                ! If we are truncating the delta term, then first truncate
-                ! the angular flux (because the idea is that we would only store
-                ! the angular moments and then the discrete delta term would be
-                ! generated on the fly from the corresponding delta moments)
-                tmp_psi_m = matmul(phi_m(:, :ord, cg, c), p_leg(:ord, a))
-              else
-                tmp_psi_m = psi_m(:, cg, a, c)
-              end if
-              ! Check if producing nan and not computing with a nan
-              float = dot_product(tmp_psi_m(:), expanded_sig_t(:, cg, mat, o))
-              float = float - mg_sig_t(cg, r) * tmp_psi_m(o)
-              ! Avoid dividing by zero
-              if (abs(homog_phi(0, cg, r)) > tolerance .and. (abs(tmp_psi_m(0)) > tolerance)) then
-                delta_m(cg, a, r, o) = delta_m(cg, a, r, o) &
-                                     + dx(cx) * dy(cy) * float / tmp_psi_m(0) * phi_m(0, 0, cg, c) / homog_phi(0, cg, r)
-              end if
-            end do  ! End cg loop
-          end do  ! End a loop
-          c = c + 1
-        end do  ! End cx loop
-      end do  ! End cy loop
-    end do  ! End o loop
-
+    do c = 1, number_cells
+      ! get the material for the current cell
+      mat = mMap(c)
+      r = mg_mMap(c)
+      do a = 1, number_angles
+        do cg = 1, number_coarse_groups
+          if (truncate_delta) then
+            ! If we are truncating the delta term, then first truncate
+            ! the angular flux (because the idea is that we would only store
+            ! the angular moments and then the discrete delta term would be
+            ! generated on the fly from the corresponding delta moments)
+            tmp_psi_m = matmul(phi_m(:, :ord, cg, c), p_leg(:ord, a))
+          else
+            tmp_psi_m = psi_m(:, cg, a, c)
+          end if
+          ! Avoid dividing by zero
+          if (abs(homog_phi(0, cg, r)) > tolerance .and. (abs(tmp_psi_m(0)) > tolerance)) then
+            delta = matmul(tmp_psi_m, expanded_sig_t(:, cg, mat, :)) - mg_sig_t(cg, r) * tmp_psi_m
+            delta_m(cg, a, r, :) = delta_m(cg, a, r, :) &
+                                 + cell_volume(c) * delta / tmp_psi_m(0) * phi_m(0, 0, cg, c) * weight(0, cg, r)
+          end if
+        end do  ! End cg loop
+      end do  ! End a loop
+    end do  ! End c loop
 
   end subroutine compute_xs_moments
 
@@ -618,16 +984,19 @@ module dgmsolver
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : number_cells_x, number_cells_y, number_regions, number_fine_groups, &
-                        number_groups, energy_group_map
+    use control, only : number_cells_x, number_cells_y, number_regions, number_groups
     use material, only : chi
     use state, only : mg_constant_source, mg_mMap
     use mesh, only : mMap, dx, dy
-    use dgm, only : chi_m, source_m, expansion_order, basis
+    use dgm, only : chi_m, source_m, expansion_order, order, basis_blocks, basis_block_start, &
+                    coarse_group_start, coarse_group_fine
 
     ! Variable definitions
     integer :: &
-        order, & ! Expansion order index
+        j,     & ! Expansion order index
+        i,     & ! Fine group index within the coarse group
+        n,     & ! Number of fine groups in the coarse group
+        b,     & ! Index of the basis entry in basis_blocks
         c,     & ! Cell index
         cx,    & ! Cell index for x cells
         cy,    & ! Cell index for y cells
@@ -664,31 +1033,41 @@ module dgmsolver
     if (.not. skip_chi_m_val) then
       allocate(chi_m(number_groups, number_regions, 0:expansion_order))
       chi_m = 0.0_8
-      do order = 0, expansion_order
-        c = 1
-        do cy = 1, number_cells_y
-          do cx = 1, number_cells_x
-            mat = mMap(c)
-            r = mg_mMap(c)
-            do g = 1, number_fine_groups
-              cg = energy_group_map(g)
-              chi_m(cg, r, order) = chi_m(cg, r, order) + basis(g, order) * chi(g, mat) * dx(cx) * dy(cy) / lengths(r)
-            end do  ! End g loop
-            c = c + 1
-          end do  ! End cx loop
-        end do  ! End cy loop
-      end do  ! End order loop
+      c = 1
+      do cy = 1, number_cells_y
+        do cx = 1, number_cells_x
+          mat = mMap(c)
+          r = mg_mMap(c)
+          do cg = 1, number_groups
+            n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+            b = basis_block_start(cg)
+            do j = 0, order(cg)
+              do i = 1, n
+                g = coarse_group_fine(coarse_group_start(cg) + i - 1)
+                chi_m(cg, r, j) = chi_m(cg, r, j) + basis_blocks(b) * chi(g, mat) * dx(cx) * dy(cy) / lengths(r)
+                b = b + 1
+              end do  ! End i loop
+            end do  ! End j loop
+          end do  ! End cg loop
+          c = c + 1
+        end do  ! End cx loop
+      end do  ! End cy loop
     end if
 
     ! Source moment
+    if (allocated(source_m)) then
+      deallocate(source_m)
+    end if
     allocate(source_m(number_groups, 0:expansion_order))
     source_m = 0.0_8
-    do order = 0, expansion_order
-      do g = 1, number_fine_groups
-        cg = energy_group_map(g)
-        source_m(cg, order) = source_m(cg, order) + basis(g, order) * mg_constant_source
-      end do  ! End g loop
-    end do  ! End order loop
+    do cg = 1, number_groups
+      n = coarse_group_start(cg + 1) - coarse_group_start(cg)
+      b = basis_block_start(cg)
+      do j = 0, order(cg)
+        source_m(cg, j) = sum(basis_blocks(b:b + n - 1)) * mg_constant_source
+        b = b + n
+      end do  ! End j loop
+    end do  ! End cg loop
 
   end subroutine compute_source_moments
 
@@ -0,0 +1,446 @@
+module dsa
+  ! ############################################################################
+  ! Diffusion synthetic acceleration of the scattering source iteration
+  ! ############################################################################
+
+  use control, only : dp
+
+  implicit none
+
+  contains
+
+  subroutine apply_dsa(old_phi, gmin, gmax)
+    ! ##########################################################################
+    ! Correct the scalar flux of groups gmin to gmax with a diffusion solve
+    ! driven by the change in the within-group scattering source
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells, number_cells_x, number_cells_y, spatial_dimension, &
+                        boundary_east, boundary_west, boundary_north, boundary_south
+    use state, only : mg_phi, mg_sig_t, mg_sig_s, mg_mMap
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        old_phi       ! Scalar flux before the sweep (group gmin at index 1)
+    integer, intent(in) :: &
+        gmin,       & ! Lower group to correct
+        gmax          ! Upper group to correct
+    real(kind=dp), dimension(number_cells) :: &
+        diffusion,  & ! Diffusion coefficient in each cell
+        removal,    & ! Within-group removal cross section in each cell
+        residual,   & ! Change in the within-group scattering source
+        correction    ! Diffusion estimate of the remaining error
+    real(kind=dp), dimension(merge((number_cells_x + 1) * (number_cells_y + 1), number_cells + 1, &
+                                   spatial_dimension == 2)) :: &
+        vertex        ! Correction on the cell edges (1D) or vertices (2D)
+    logical :: &
+        leaks         ! Flag if any boundary lets neutrons out
+    integer :: &
+        g,          & ! Group index
+        c,          & ! Cell index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        v,          & ! Index of the first vertex of a cell
+        mat           ! Material index
+
+    if (spatial_dimension == 1) then
+      leaks = min(boundary_east, boundary_west) < 1.0_8
+    else
+      leaks = min(boundary_east, boundary_west, boundary_north, boundary_south) < 1.0_8
+    end if
+
+    !$omp parallel do default(shared) &
+    !$omp private(g, c, cx, cy, v, mat, diffusion, removal, residual, correction, vertex) &
+    !$omp schedule(dynamic)
+    do g = gmin, gmax
+      do c = 1, number_cells
+        mat = mg_mMap(c)
+        diffusion(c) = 1.0_8 / (3.0_8 * mg_sig_t(g, mat))
+        removal(c) = mg_sig_t(g, mat) - mg_sig_s(0, g, g, mat)
+        residual(c) = mg_sig_s(0, g, g, mat) * (mg_phi(0, g, c) - old_phi(g - gmin + 1, c))
+      end do  ! End c loop
+
+      ! Without removal or leakage the diffusion operator is singular
+      if (.not. leaks .and. all(removal <= epsilon(1.0_8) * mg_sig_t(g, mg_mMap))) then
+        cycle
+      end if
+
+      if (spatial_dimension == 1) then
+        call solve_diffusion_1D(diffusion, removal, residual, vertex)
+        correction(:) = 0.5_8 * (vertex(:number_cells) + vertex(2:))
+        mg_phi(0, g, :) = mg_phi(0, g, :) + correction(:)
+        call correct_incident_flux_1D(g, vertex)
+      else
+        call solve_diffusion_2D(diffusion, removal, residual, vertex)
+        ! The diamond difference cell flux is the average of the corners
+        do cy = 1, number_cells_y
+          do cx = 1, number_cells_x
+            c = (cy - 1) * number_cells_x + cx
+            v = (cy - 1) * (number_cells_x + 1) + cx
+            correction(c) = 0.25_8 * (vertex(v) + vertex(v + 1) + vertex(v + number_cells_x + 1) &
+                                      + vertex(v + number_cells_x + 2))
+          end do  ! End cx loop
+        end do  ! End cy loop
+        mg_phi(0, g, :) = mg_phi(0, g, :) + correction(:)
+        call correct_incident_flux_2D(g, vertex)
+      end if
+    end do  ! End g loop
+    !$omp end parallel do
+
+  end subroutine apply_dsa
+
+  subroutine correct_incident_flux_1D(g, edge)
+    ! ##########################################################################
+    ! Add the isotropic part of the edge correction to the stored boundary flux
+    ! Otherwise reflective boundaries reintroduce the uncorrected error
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : wt
+    use control, only : number_cells, boundary_east, boundary_west
+    use state, only : mg_incident_x
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        g             ! Group index
+    real(kind=dp), intent(in), dimension(:) :: &
+        edge          ! Correction on the cell edges
+    real(kind=dp) :: &
+        iso           ! Angular flux of an isotropic unit scalar flux
+
+    iso = 1.0_8 / (2.0_8 * sum(wt))
+
+    ! The last octant of the sweep leaves through this boundary
+    if (boundary_east == 0.0 .and. boundary_west /= 0.0) then
+      mg_incident_x(g, :, 1, 1) = mg_incident_x(g, :, 1, 1) + iso * edge(number_cells + 1)
+    else
+      mg_incident_x(g, :, 1, 1) = mg_incident_x(g, :, 1, 1) + iso * edge(1)
+    end if
+
+  end subroutine correct_incident_flux_1D
+
+  subroutine correct_incident_flux_2D(g, vertex)
+    ! ##########################################################################
+    ! Add the isotropic part of the face correction to the stored boundary fluxes
+    ! Otherwise reflective boundaries reintroduce the uncorrected error
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : wt
+    use control, only : number_cells_x, number_cells_y
+    use state, only : mg_incident_x, mg_incident_y
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        g             ! Group index
+    real(kind=dp), intent(in), dimension(:) :: &
+        vertex        ! Correction on the cell vertices
+    real(kind=dp) :: &
+        iso           ! Angular flux of an isotropic unit scalar flux
+    integer :: &
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        v,          & ! Vertex at the start of the face
+        row           ! Number of vertices in each row
+
+    iso = 1.0_8 / (4.0_8 * sum(wt))
+    row = number_cells_x + 1
+
+    ! Outgoing fluxes through the west and east faces
+    do cy = 1, number_cells_y
+      v = (cy - 1) * row + 1
+      mg_incident_x(g, :, cy, 1:2) = mg_incident_x(g, :, cy, 1:2) &
+                                   + iso * 0.5_8 * (vertex(v) + vertex(v + row))
+      v = cy * row
+      mg_incident_x(g, :, cy, 3:4) = mg_incident_x(g, :, cy, 3:4) &
+                                   + iso * 0.5_8 * (vertex(v) + vertex(v + row))
+    end do  ! End cy loop
+
+    ! Outgoing fluxes through the north and south faces
+    do cx = 1, number_cells_x
+      v = cx
+      mg_incident_y(g, :, cx, 1) = mg_incident_y(g, :, cx, 1) + iso * 0.5_8 * (vertex(v) + vertex(v + 1))
+      mg_incident_y(g, :, cx, 4) = mg_incident_y(g, :, cx, 4) + iso * 0.5_8 * (vertex(v) + vertex(v + 1))
+      v = number_cells_y * row + cx
+      mg_incident_y(g, :, cx, 2:3) = mg_incident_y(g, :, cx, 2:3) &
+                                   + iso * 0.5_8 * (vertex(v) + vertex(v + 1))
+    end do  ! End cx loop
+
+  end subroutine correct_incident_flux_2D
+
+  subroutine solve_diffusion_1D(diffusion, removal, source, edge)
+    ! ##########################################################################
+    ! Solve the diffusion equation differenced consistently with diamond
+    ! difference (Alcouffe) for the scalar flux on the cell edges
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells, boundary_east, boundary_west
+    use mesh, only : dx
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        diffusion,  & ! Diffusion coefficient in each cell
+        removal,    & ! Removal cross section in each cell
+        source        ! Source in each cell
+    real(kind=dp), intent(out), dimension(:) :: &
+        edge          ! Scalar flux on each cell edge
+    real(kind=dp), dimension(number_cells) :: &
+        off           ! Coupling between the two edges of each cell
+    real(kind=dp), dimension(number_cells + 1) :: &
+        diag,       & ! Diagonal of the diffusion matrix
+        rhs           ! Source integrated over the cells next to each edge
+    real(kind=dp) :: &
+        leakage,    & ! Leakage coupling across a cell
+        absorption    ! Removal shared between the two edges of a cell
+    integer :: &
+        c             ! Cell index
+
+    diag(:) = 0.0_8
+    rhs(:) = 0.0_8
+    do c = 1, number_cells
+      leakage = 2.0_8 * diffusion(c) / dx(c)
+      absorption = 0.5_8 * removal(c) * dx(c)
+      off(c) = absorption - leakage
+      diag(c:c + 1) = diag(c:c + 1) + leakage + absorption
+      rhs(c:c + 1) = rhs(c:c + 1) + source(c) * dx(c)
+    end do  ! End c loop
+    diag(1) = diag(1) + 2.0_8 * marshak_beta(boundary_west)
+    diag(number_cells + 1) = diag(number_cells + 1) + 2.0_8 * marshak_beta(boundary_east)
+
+    call solve_tridiagonal(off, diag, rhs, edge)
+
+  end subroutine solve_diffusion_1D
+
+  subroutine solve_diffusion_2D(diffusion, removal, source, vertex)
+    ! ##########################################################################
+    ! Solve the diffusion equation for the scalar flux on the cell vertices
+    !
+    ! Bilinear continuous finite elements with the removal and source lumped
+    ! onto the corners.  The vertex unknowns play the part of the diamond
+    ! difference corner fluxes, as the edge unknowns do in 1D, which keeps
+    ! the correction stable for optically thick cells.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells, number_cells_x, number_cells_y, boundary_east, &
+                        boundary_west, boundary_north, boundary_south
+    use mesh, only : dx, dy
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        diffusion,  & ! Diffusion coefficient in each cell
+        removal,    & ! Removal cross section in each cell
+        source        ! Source in each cell
+    real(kind=dp), intent(out), dimension(:) :: &
+        vertex        ! Scalar flux on each cell vertex
+    real(kind=dp), dimension(number_cells) :: &
+        stiff_x,    & ! Leakage coupling along x in each cell
+        stiff_y       ! Leakage coupling along y in each cell
+    real(kind=dp), dimension(size(vertex)) :: &
+        diag,       & ! Diagonal of the diffusion matrix
+        rhs           ! Source lumped onto each vertex
+    integer, dimension(4) :: &
+        corners       ! Vertices of a cell
+    integer :: &
+        c,          & ! Cell index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        v,          & ! Vertex at the start of a cell or face
+        row           ! Number of vertices in each row
+
+    row = number_cells_x + 1
+    diag(:) = 0.0_8
+    rhs(:) = 0.0_8
+
+    ! Assemble the cell contributions to the corners
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        c = (cy - 1) * number_cells_x + cx
+        v = (cy - 1) * row + cx
+        corners = [v, v + 1, v + row, v + row + 1]
+        stiff_x(c) = diffusion(c) * dy(cy) / (6.0_8 * dx(cx))
+        stiff_y(c) = diffusion(c) * dx(cx) / (6.0_8 * dy(cy))
+        diag(corners) = diag(corners) + 2.0_8 * (stiff_x(c) + stiff_y(c)) &
+                      + 0.25_8 * removal(c) * dx(cx) * dy(cy)
+        rhs(corners) = rhs(corners) + 0.25_8 * source(c) * dx(cx) * dy(cy)
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+    ! Lump the Marshak boundary leakage onto the boundary vertices
+    do cy = 1, number_cells_y
+      v = (cy - 1) * row + 1
+      diag([v, v + row]) = diag([v, v + row]) + 0.5_8 * marshak_beta(boundary_west) * dy(cy)
+      v = cy * row
+      diag([v, v + row]) = diag([v, v + row]) + 0.5_8 * marshak_beta(boundary_east) * dy(cy)
+    end do  ! End cy loop
+    do cx = 1, number_cells_x
+      v = cx
+      diag([v, v + 1]) = diag([v, v + 1]) + 0.5_8 * marshak_beta(boundary_north) * dx(cx)
+      v = number_cells_y * row + cx
+      diag([v, v + 1]) = diag([v, v + 1]) + 0.5_8 * marshak_beta(boundary_south) * dx(cx)
+    end do  ! End cx loop
+
+    call solve_conjugate_gradient(stiff_x, stiff_y, diag, rhs, vertex)
+
+  end subroutine solve_diffusion_2D
+
+  function marshak_beta(albedo) result(beta)
+    ! ##########################################################################
+    ! Ratio of the net outgoing current to the scalar flux on an albedo boundary
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in) :: &
+        albedo  ! Albedo of the boundary
+    real(kind=dp) :: &
+        beta    ! Ratio of the outgoing current to the boundary flux
+
+    beta = (1.0_8 - albedo) / (2.0_8 * (1.0_8 + albedo))
+
+  end function marshak_beta
+
+  subroutine solve_tridiagonal(off, diag, rhs, x)
+    ! ##########################################################################
+    ! Solve a symmetric tridiagonal system with the Thomas algorithm
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        off,   & ! Off diagonal entries
+        diag,  & ! Diagonal entries
+        rhs      ! Right hand side
+    real(kind=dp), intent(out), dimension(:) :: &
+        x        ! Solution
+    real(kind=dp), dimension(size(diag)) :: &
+        cp       ! Modified upper diagonal
+    real(kind=dp) :: &
+        denom    ! Pivot of the current row
+    integer :: &
+        n,     & ! Number of unknowns
+        i        ! Row index
+
+    n = size(diag)
+
+    cp(1) = 0.0_8
+    x(1) = rhs(1) / diag(1)
+    if (n > 1) then
+      cp(1) = off(1) / diag(1)
+    end if
+    do i = 2, n
+      denom = diag(i) - off(i - 1) * cp(i - 1)
+      if (i < n) then
+        cp(i) = off(i) / denom
+      end if
+      x(i) = (rhs(i) - off(i - 1) * x(i - 1)) / denom
+    end do  ! End i loop
+    do i = n - 1, 1, -1
+      x(i) = x(i) - cp(i) * x(i + 1)
+    end do  ! End i loop
+
+  end subroutine solve_tridiagonal
+
+  subroutine solve_conjugate_gradient(stiff_x, stiff_y, diag, rhs, x)
+    ! ##########################################################################
+    ! Solve the nine point vertex diffusion system with Jacobi preconditioned CG
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        stiff_x,   & ! Leakage coupling along x in each cell
+        stiff_y,   & ! Leakage coupling along y in each cell
+        diag,      & ! Diagonal of the matrix
+        rhs          ! Right hand side
+    real(kind=dp), intent(out), dimension(:) :: &
+        x            ! Solution
+    real(kind=dp), dimension(size(x)) :: &
+        r,         & ! Residual
+        z,         & ! Preconditioned residual
+        p,         & ! Search direction
+        q            ! Matrix times search direction
+    real(kind=dp) :: &
+        rz,        & ! Inner product of r and z
+        rz_old,    & ! Inner product from the previous iteration
+        alpha,     & ! Step length
+        tolerance    ! Convergence criteria on the residual norm
+    integer :: &
+        k            ! Iteration index
+
+    x(:) = 0.0_8
+    r(:) = rhs(:)
+    tolerance = 1e-10_8 * sqrt(dot_product(rhs, rhs))
+    if (tolerance == 0.0_8) then
+      return
+    end if
+
+    z(:) = r(:) / diag(:)
+    p(:) = z(:)
+    rz = dot_product(r, z)
+
+    do k = 1, size(x)
+      call apply_diffusion_operator(stiff_x, stiff_y, diag, p, q)
+      alpha = rz / dot_product(p, q)
+      x(:) = x(:) + alpha * p(:)
+      r(:) = r(:) - alpha * q(:)
+      if (sqrt(dot_product(r, r)) < tolerance) then
+        exit
+      end if
+      z(:) = r(:) / diag(:)
+      rz_old = rz
+      rz = dot_product(r, z)
+      p(:) = z(:) + (rz / rz_old) * p(:)
+    end do  ! End k loop
+
+  end subroutine solve_conjugate_gradient
+
+  subroutine apply_diffusion_operator(stiff_x, stiff_y, diag, f, af)
+    ! ##########################################################################
+    ! Multiply the nine point vertex diffusion matrix by a vector
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells_x, number_cells_y
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        stiff_x,   & ! Leakage coupling along x in each cell
+        stiff_y,   & ! Leakage coupling along y in each cell
+        diag,      & ! Diagonal of the matrix
+        f            ! Input vector
+    real(kind=dp), intent(out), dimension(:) :: &
+        af           ! Matrix times the input vector
+    real(kind=dp) :: &
+        along_x,   & ! Coupling of corners on the same row
+        along_y,   & ! Coupling of corners on the same column
+        across       ! Coupling of opposite corners
+    integer :: &
+        c,         & ! Cell index
+        cx,        & ! x cell index
+        cy,        & ! y cell index
+        v1,        & ! Corner at the lower x and y index
+        v2,        & ! Corner at the upper x index
+        v3,        & ! Corner at the upper y index
+        v4           ! Corner at the upper x and y index
+
+    af(:) = diag(:) * f(:)
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        c = (cy - 1) * number_cells_x + cx
+        v1 = (cy - 1) * (number_cells_x + 1) + cx
+        v2 = v1 + 1
+        v3 = v1 + number_cells_x + 1
+        v4 = v3 + 1
+        along_x = stiff_y(c) - 2.0_8 * stiff_x(c)
+        along_y = stiff_x(c) - 2.0_8 * stiff_y(c)
+        across = -(stiff_x(c) + stiff_y(c))
+        af(v1) = af(v1) + along_x * f(v2) + along_y * f(v3) + across * f(v4)
+        af(v2) = af(v2) + along_x * f(v1) + across * f(v3) + along_y * f(v4)
+        af(v3) = af(v3) + along_y * f(v1) + across * f(v2) + along_x * f(v4)
+        af(v4) = af(v4) + across * f(v1) + along_y * f(v2) + along_x * f(v3)
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+  end subroutine apply_diffusion_operator
+
+end module dsa
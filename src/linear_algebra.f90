@@ -0,0 +1,186 @@
+module linear_algebra
+  ! ############################################################################
+  ! Direct solution of the small linear systems of the accelerations
+  ! ############################################################################
+
+  use control, only : dp
+
+  implicit none
+
+  contains
+
+  subroutine factor_band(matrix, info)
+    ! ##########################################################################
+    ! Factor a banded matrix in place without pivoting
+    !
+    ! Element matrix(d + k, i) holds row i and column i + k, where d is the
+    ! middle row.  The fill of the elimination stays inside the band, so the
+    ! factors replace the matrix.
+    ! info returns the first row with a singular pivot (0 if none).
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        matrix   ! Banded matrix to factor, replaced by its LU factors
+    integer, intent(out) :: &
+        info     ! Row of the first singular pivot
+    real(kind=dp) :: &
+        l,     & ! Multiplier of the pivot row
+        scale    ! Largest magnitude in the matrix
+    integer :: &
+        n,     & ! Size of the matrix
+        d,     & ! Row of the diagonal
+        w,     & ! Half width of the band
+        i,     & ! Row index
+        j,     & ! Column index
+        k        ! Pivot row index
+
+    n = size(matrix, 2)
+    d = (size(matrix, 1) + 1) / 2
+    w = d - 1
+    scale = maxval(abs(matrix))
+    info = 0
+
+    do k = 1, n
+      ! Pivots at the rounding level of the matrix belong to a singular matrix
+      if (abs(matrix(d, k)) <= n * epsilon(1.0_8) * scale) then
+        info = k
+        return
+      end if
+      do i = k + 1, min(k + w, n)
+        l = matrix(d + k - i, i) / matrix(d, k)
+        matrix(d + k - i, i) = l
+        do j = k + 1, min(k + w, n)
+          matrix(d + j - i, i) = matrix(d + j - i, i) - l * matrix(d + j - k, k)
+        end do  ! End j loop
+      end do  ! End i loop
+    end do  ! End k loop
+
+  end subroutine factor_band
+
+  subroutine solve_band(matrix, x)
+    ! ##########################################################################
+    ! Solve with the factors from factor_band, overwriting the right hand side
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        matrix   ! Banded LU factors
+    real(kind=dp), intent(inout), dimension(:) :: &
+        x        ! Right hand side on entry and solution on exit
+    integer :: &
+        n,     & ! Size of the matrix
+        d,     & ! Row of the diagonal
+        w,     & ! Half width of the band
+        i,     & ! Row index
+        k        ! Pivot row index
+
+    n = size(matrix, 2)
+    d = (size(matrix, 1) + 1) / 2
+    w = d - 1
+
+    ! Forward substitution with the unit lower factor
+    do k = 1, n - 1
+      do i = k + 1, min(k + w, n)
+        x(i) = x(i) - matrix(d + k - i, i) * x(k)
+      end do  ! End i loop
+    end do  ! End k loop
+
+    ! Back substitution with the upper factor
+    do k = n, 1, -1
+      do i = k + 1, min(k + w, n)
+        x(k) = x(k) - matrix(d + i - k, k) * x(i)
+      end do  ! End i loop
+      x(k) = x(k) / matrix(d, k)
+    end do  ! End k loop
+
+  end subroutine solve_band
+
+  subroutine factor_lu(matrix, pivot, info)
+    ! ##########################################################################
+    ! Factor a dense matrix in place with partial pivoting
+    ! info returns the first column with a singular pivot (0 if none)
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        matrix   ! Matrix to factor, replaced by its LU factors
+    integer, intent(out), dimension(:) :: &
+        pivot    ! Row swapped with each row
+    integer, intent(out) :: &
+        info     ! Column of the first singular pivot
+    real(kind=dp), dimension(size(matrix, 1)) :: &
+        row      ! Temporary row for swapping
+    real(kind=dp) :: &
+        scale    ! Largest magnitude in the matrix
+    integer :: &
+        n,     & ! Size of the matrix
+        i,     & ! Row index
+        k        ! Pivot column index
+
+    n = size(matrix, 1)
+    scale = maxval(abs(matrix))
+    info = 0
+
+    do k = 1, n
+      pivot(k) = k - 1 + maxloc(abs(matrix(k:, k)), 1)
+      if (pivot(k) /= k) then
+        row(:) = matrix(k, :)
+        matrix(k, :) = matrix(pivot(k), :)
+        matrix(pivot(k), :) = row(:)
+      end if
+      ! Pivots at the rounding level of the matrix belong to a singular matrix
+      if (abs(matrix(k, k)) <= n * epsilon(1.0_8) * scale) then
+        info = k
+        return
+      end if
+      matrix(k + 1:, k) = matrix(k + 1:, k) / matrix(k, k)
+      do i = k + 1, n
+        matrix(k + 1:, i) = matrix(k + 1:, i) - matrix(k + 1:, k) * matrix(k, i)
+      end do  ! End i loop
+    end do  ! End k loop
+
+  end subroutine factor_lu
+
+  subroutine solve_lu(matrix, pivot, x)
+    ! ##########################################################################
+    ! Solve with the factors from factor_lu, overwriting the right hand side
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        matrix   ! LU factors
+    integer, intent(in), dimension(:) :: &
+        pivot    ! Row swapped with each row
+    real(kind=dp), intent(inout), dimension(:) :: &
+        x        ! Right hand side on entry and solution on exit
+    real(kind=dp) :: &
+        temp     ! Temporary value for swapping
+    integer :: &
+        n,     & ! Size of the matrix
+        k        ! Row index
+
+    n = size(matrix, 1)
+
+    do k = 1, n
+      if (pivot(k) /= k) then
+        temp = x(k)
+        x(k) = x(pivot(k))
+        x(pivot(k)) = temp
+      end if
+    end do  ! End k loop
+
+    ! Forward substitution with the unit lower factor
+    do k = 1, n - 1
+      x(k + 1:) = x(k + 1:) - matrix(k + 1:, k) * x(k)
+    end do  ! End k loop
+
+    ! Back substitution with the upper factor
+    do k = n, 1, -1
+      x(k) = x(k) / matrix(k, k)
+      x(:k - 1) = x(:k - 1) - matrix(:k - 1, k) * x(k)
+    end do  ! End k loop
+
+  end subroutine solve_lu
+
+end module linear_algebra
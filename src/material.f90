@@ -8,8 +8,10 @@ module material
   implicit none
 
   integer :: &
-      number_materials, & ! Number of materials in the cross section library
+      number_materials, & ! Number of materials loaded from the cross section library
       debugFlag           ! Unused flag in the cross section library
+  integer, allocatable, dimension(:) :: &
+      library_material    ! Index within the library of each loaded material
   real(kind=dp), allocatable, dimension(:) :: &
       ebounds,          & ! Bounds for the energy groups
       velocity            ! Velocity within each energy group
@@ -24,23 +26,69 @@ module material
   contains
 
   subroutine create_material()
+    ! ##########################################################################
+    ! Read the cross section data from a file in the proteus format or in the
+    ! binary library format, which starts with the characters DGMXSLIB
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : allow_fission, allow_scatter, xs_name
+
+    ! Variable definitions
+    character(len=8) :: &
+        magic  ! First characters of the file
+    integer :: &
+        ios    ! I/O status
+
+    ! Check for the binary format
+    open(unit=1, file=xs_name, access='stream', form='unformatted', status='old', iostat=ios)
+    if (ios /= 0) then
+      print *, "INPUT ERROR : Unable to open the cross section file ", trim(xs_name)
+      stop
+    end if
+    magic = ''
+    read(1, iostat=ios) magic
+    close(unit=1)
+
+    if (magic == 'DGMXSLIB') then
+      call read_binary_material()
+    else
+      call read_text_material()
+    end if
+
+    ! If fissioning is not allowed, set fission cross sections to zero
+    if (.not. allow_fission) then
+      sig_f = 0.0
+      nu_sig_f = 0.0
+    end if
+
+    ! If scattering is not allowed, set scattering cross sections to zero
+    if (.not. allow_scatter) then
+      sig_s = 0.0
+    end if
+
+  end subroutine create_material
+
+  subroutine read_text_material()
     ! ##########################################################################
     ! Read the cross section data from a file in the proteus format
     ! ##########################################################################
 
     ! Use Statements
-    use control, only : allow_fission, allow_scatter, number_fine_groups, &
-                        number_legendre, xs_name, number_coarse_groups, &
-                        scatter_leg_order
+    use control, only : number_fine_groups, number_legendre, xs_name, number_coarse_groups
+
     ! Variable definitions
     character(256) :: &
         materialName     ! Name of each material
     integer :: &
         mat,           & ! Material index
+        lib,           & ! Material index within the library
         g,             & ! Outer group index
         L,             & ! Legendre moment index
         number_groups, & ! Number of groups in the cross section library
         dataPresent      ! Flag deciding which cross sections are present
+    logical :: &
+        keep             ! Flag to store the current material
     real(kind=dp) :: &
         t,             & ! Total cross section value
         f,             & ! fission cross section value
@@ -55,6 +103,7 @@ module material
     ! Read the file parameters
     open(unit=1, file=xs_name)
     read(1,*) number_materials, number_groups, debugFlag
+    call select_materials()
     number_fine_groups = number_groups
     number_coarse_groups = number_groups
     allocate(ebounds(number_groups + 1))
@@ -65,14 +114,7 @@ module material
     read(1,*) number_legendre, dataPresent, energyFission, energyCapture, gramAtomWeight
     ! Count the highest order + zeroth order
     number_legendre = number_legendre - 1
-    if (scatter_leg_order > number_legendre) then
-      print *, 'Requesting higher scattering order than the cross sections provided'
-      print *, 'Reducing the scattering order to ', number_legendre
-      scatter_leg_order = number_legendre
-    else if (scatter_leg_order == -1) then
-      print *, 'No scattering order defined.  Defaulting to order ', number_legendre
-      scatter_leg_order = number_legendre
-    end if
+    call check_scatter_order()
 
     ! Make space for cross sections
     allocate(sig_t(number_groups, number_materials))
@@ -83,55 +125,196 @@ module material
     allocate(array1(number_groups))
 
     ! Read the cross sections from the file
-    do mat = 1, number_materials
-      if (mat > 1) then  ! The first material was read above to get array sizes
+    mat = 1
+    do lib = 1, library_material(number_materials)
+      if (lib > 1) then  ! The first material was read above to get array sizes
         read(1,'(a)') materialName
         read(1,*) number_legendre, dataPresent, energyFission, energyCapture, gramAtomWeight
         ! Count the highest order + zeroth order
         number_legendre = number_legendre - 1
       end if
+      ! Materials outside of the selection are parsed but not stored
+      keep = library_material(mat) == lib
       do g = 1, number_groups
         if (dataPresent == 1) then
           ! Read total and fission cross sections
           read(1,*) t, f, vf, c
-          sig_t(g, mat) = t
-          sig_f(g, mat) = f
-          nu_sig_f(g, mat) = vf
-          chi(g, mat) = c
         else
           ! Read just the total cross section
           read(1,*) t
+          f = 0.0
+          vf = 0.0
+          c = 0.0
+        end if
+        if (keep) then
           sig_t(g, mat) = t
-          sig_f(g, mat) = 0.0
-          nu_sig_f(g, mat) = 0.0
-          chi(g, mat) = 0.0
+          sig_f(g, mat) = f
+          nu_sig_f(g, mat) = vf
+          chi(g, mat) = c
         end if
       end do  ! End g loop
       ! Read scattering cross section
       do l = 0, number_legendre
         do g = 1, number_groups
           read(1,*) array1
-          sig_s(l, g, :, mat) = array1(:)
+          if (keep) then
+            sig_s(l, g, :, mat) = array1(:)
+          end if
         end do  ! End g loop
       end do  ! End l loop
-    end do  ! End mat loop
+      if (keep) then
+        mat = mat + 1
+      end if
+    end do  ! End lib loop
 
     ! Close the file and clean up
     close(unit=1)
     deallocate(array1)
 
-    ! If fissioning is not allowed, set fission cross sections to zero
-    if (.not. allow_fission) then
-      sig_f = 0.0
-      nu_sig_f = 0.0
+  end subroutine read_text_material
+
+  subroutine read_binary_material()
+    ! ##########################################################################
+    ! Read the cross section data from a file in the binary library format
+    !
+    ! The file starts with the characters DGMXSLIB and six 4 byte integers:
+    ! the format version, the number of materials, the number of groups, the
+    ! highest Legendre order, the debug flag and a reserved entry.  The energy
+    ! bounds and velocities follow, then a 96 byte record for each material
+    ! (64 character name, Legendre order, data flag, energy per fission,
+    ! energy per capture and atomic weight).  The cross sections come last as
+    ! sig_t, sig_f, nu_sig_f, chi and sig_s in the layout of this module.
+    ! Every section starts on an 8 byte boundary, so the arrays can also be
+    ! memory mapped, and the columns of the selected materials are read
+    ! directly from their positions.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_fine_groups, number_legendre, xs_name, number_coarse_groups
+
+    ! Variable definitions
+    character(len=8) :: &
+        magic              ! First characters of the file
+    character(len=64) :: &
+        materialName       ! Name of each material
+    integer(kind=4), dimension(6) :: &
+        header             ! Format version, sizes and flags of the library
+    integer(kind=4), dimension(2) :: &
+        materialFlags      ! Legendre order and data flag of each material
+    real(kind=dp), dimension(3) :: &
+        materialData       ! Energy per fission, energy per capture and atomic weight
+    integer :: &
+        mat,             & ! Material index
+        lib,             & ! Material index within the library
+        number_library,  & ! Number of materials in the library
+        number_groups      ! Number of groups in the cross section library
+    integer(kind=8) :: &
+        start,           & ! Position of the first cross section
+        group_size,      & ! Bytes per material of a group array
+        scatter_size       ! Bytes per material of the scattering array
+
+    open(unit=1, file=xs_name, access='stream', form='unformatted', status='old')
+    read(1) magic, header
+    if (header(1) /= 1) then
+      print *, "INPUT ERROR : Unknown version ", header(1), " of the binary cross section library"
+      stop
     end if
+    number_library = header(2)
+    number_materials = number_library
+    call select_materials()
+    number_groups = header(3)
+    number_legendre = header(4)
+    debugFlag = header(5)
+    number_fine_groups = number_groups
+    number_coarse_groups = number_groups
+    call check_scatter_order()
 
-    ! If scattering is not allowed, set scattering cross sections to zero
-    if (.not. allow_scatter) then
-      sig_s = 0.0
+    allocate(ebounds(number_groups + 1))
+    allocate(velocity(number_groups))
+    read(1) ebounds, velocity
+
+    ! The material records are only descriptive
+    do lib = 1, number_library
+      read(1) materialName, materialFlags, materialData
+    end do  ! End lib loop
+
+    ! Make space for cross sections
+    allocate(sig_t(number_groups, number_materials))
+    allocate(sig_f(number_groups, number_materials))
+    allocate(nu_sig_f(number_groups, number_materials))
+    allocate(chi(number_groups, number_materials))
+    allocate(sig_s(0:number_legendre, number_groups, number_groups, number_materials))
+
+    group_size = 8_8 * number_groups
+    scatter_size = group_size * number_groups * (number_legendre + 1)
+    inquire(unit=1, pos=start)
+    do mat = 1, number_materials
+      lib = library_material(mat) - 1
+      read(1, pos=start + lib * group_size) sig_t(:, mat)
+      read(1, pos=start + (number_library + lib) * group_size) sig_f(:, mat)
+      read(1, pos=start + (2 * number_library + lib) * group_size) nu_sig_f(:, mat)
+      read(1, pos=start + (3 * number_library + lib) * group_size) chi(:, mat)
+      read(1, pos=start + 4 * number_library * group_size + lib * scatter_size) sig_s(:, :, :, mat)
+    end do  ! End mat loop
+
+    ! Close the file
+    close(unit=1)
+
+  end subroutine read_binary_material
+
+  subroutine select_materials()
+    ! ##########################################################################
+    ! Choose the library materials to load
+    !
+    ! All materials are loaded unless load_used_materials is set, in which case
+    ! only the materials in material_map are kept in library order.  On entry
+    ! number_materials is the size of the library and on exit it is the number
+    ! of loaded materials.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : load_used_materials, material_map
+
+    ! Variable definitions
+    integer :: &
+        lib  ! Material index within the library
+
+    if (allocated(library_material)) then
+      deallocate(library_material)
     end if
 
-  end subroutine create_material
+    if (load_used_materials .and. allocated(material_map)) then
+      if (maxval(material_map) > number_materials .or. minval(material_map) < 1) then
+        print *, "INPUT ERROR : material_map refers to materials missing from the cross section library"
+        stop
+      end if
+      library_material = pack([(lib, lib = 1, number_materials)], &
+                              [(any(material_map == lib), lib = 1, number_materials)])
+      number_materials = size(library_material)
+    else
+      library_material = [(lib, lib = 1, number_materials)]
+    end if
+
+  end subroutine select_materials
+
+  subroutine check_scatter_order()
+    ! ##########################################################################
+    ! Limit the scattering order to the orders in the cross section library
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_legendre, scatter_leg_order
+
+    if (scatter_leg_order > number_legendre) then
+      print *, 'Requesting higher scattering order than the cross sections provided'
+      print *, 'Reducing the scattering order to ', number_legendre
+      scatter_leg_order = number_legendre
+    else if (scatter_leg_order == -1) then
+      print *, 'No scattering order defined.  Defaulting to order ', number_legendre
+      scatter_leg_order = number_legendre
+    end if
+
+  end subroutine check_scatter_order
 
   subroutine finalize_material()
     ! ##########################################################################
@@ -159,6 +342,9 @@ module material
     if (allocated(sig_s)) then
       deallocate(sig_s)
     end if
+    if (allocated(library_material)) then
+      deallocate(library_material)
+    end if
   end subroutine finalize_material
 
 end module material
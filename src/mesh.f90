@@ -28,6 +28,7 @@ module mesh
     use control, only : number_cells, number_cells_x, number_cells_y, fine_mesh_x, &
                         fine_mesh_y, coarse_mesh_x, coarse_mesh_y, material_map, &
                         spatial_dimension, boundary_north, boundary_south
+    use material, only : library_material
 
     ! Variable definitions
     real(kind=dp) :: &
@@ -43,6 +44,8 @@ module mesh
         iy,  & ! coarse cell index for y cells
         jx,  & ! fine cell index for x cells
         jy     ! fine cell index for y cells
+    integer, allocatable, dimension(:) :: &
+        local_material  ! Loaded index of each material in material_map
 
     ! Check for 1D problem
     if (spatial_dimension == 1) then
@@ -67,6 +70,17 @@ module mesh
     number_cells = number_cells_x * number_cells_y
     allocate(dx(number_cells_x), dy(number_cells_y), mMap(number_cells))
 
+    ! Translate the library indices if only part of the library was loaded
+    allocate(local_material(maxval(material_map)))
+    local_material = [(c, c = 1, size(local_material))]
+    if (allocated(library_material)) then
+      do c = 1, size(library_material)
+        if (library_material(c) <= size(local_material)) then
+          local_material(library_material(c)) = c
+        end if
+      end do  ! End c loop
+    end if
+
     ! Compute the mesh widths and read materials
     c = 1  ! Initialize counting variable for all cells
     cy = 1  ! Initialize counting variable for y cells
@@ -78,7 +92,7 @@ module mesh
         do ix = 1, nx  ! Loop over the coarse x cells
           ddx = (coarse_mesh_x(ix+1) - coarse_mesh_x(ix)) / fine_mesh_x(ix)
           do jx = 1, fine_mesh_x(ix)  ! Loop over the fine x cells in region ix
-            mMap(c) = material_map((iy - 1) * nx + ix)
+            mMap(c) = local_material(material_map((iy - 1) * nx + ix))
             dx(cx) = ddx  ! Store cell size in x direction
             cx = cx + 1  ! Increment x cells
             c = c + 1  ! Increment all cells
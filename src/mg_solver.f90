@@ -14,12 +14,15 @@ module mg_solver
     ! Use Statements
     use control, only : ignore_warnings, max_outer_iters, outer_print, outer_tolerance, &
                         min_outer_iters, number_cells, number_groups, spatial_dimension, &
-                        outer_converged, eigen_converged, max_eigen_iters, number_moments
+                        outer_converged, eigen_converged, max_eigen_iters, number_moments, &
+                        number_group_blocks, energy_iteration, upscatter_only, use_dsa, &
+                        iteration_type
     use sweeper_1D, only : apply_transport_operator_1D
     use sweeper_2D, only : apply_transport_operator_2D
-    use state, only : mg_phi, outer_count, exit_status
-    use omp_lib, only : omp_get_wtime
+    use state, only : mg_phi, outer_count, exit_status, group_block_speedup, update_scatter_kernel
+    use omp_lib, only : omp_get_wtime, omp_get_max_threads
     use dgm, only : dgm_order
+    use dsa, only : apply_dsa
 
     ! Variable definitions
     real(kind=dp) :: &
@@ -30,9 +33,26 @@ module mg_solver
         start,       & ! Start time of the sweep function
         ave_sweep_time ! Average time in seconds per sweep
     integer :: &
-        outer_iters    ! Number of outer iterations to do
+        outer_iters, & ! Number of outer iterations to do
+        number_blocks, & ! Number of group blocks to sweep concurrently
+        gs_start         ! First group iterated by the Gauss-Seidel sweeps
 
     ave_sweep_time = 0.0_8
+    group_block_speedup = 0.0_8
+
+    ! Pick up any change to mg_sig_s or mg_mMap since the last solve
+    call update_scatter_kernel()
+
+    ! Determine the number of group blocks for the Jacobi sweeps
+    if (number_group_blocks == 0) then
+      number_blocks = omp_get_max_threads()
+    else
+      number_blocks = number_group_blocks
+    end if
+    number_blocks = max(1, min(number_blocks, number_groups))
+    if (energy_iteration == 'gauss_seidel') then
+      number_blocks = 1
+    end if
 
     ! Initialize the outer convergence flag to False
     outer_converged = .false.
@@ -43,6 +63,19 @@ module mg_solver
       outer_iters = max_outer_iters * merge(100, 1, eigen_converged)
     end if
 
+    ! The Krylov solver replaces the fixed point iteration below
+    if (iteration_type == 'gmres') then
+      call solve_gmres(outer_iters)
+      return
+    end if
+
+    ! Groups without upscatter only need a single Gauss-Seidel pass
+    gs_start = 1
+    if (energy_iteration == 'gauss_seidel' .and. upscatter_only) then
+      gs_start = first_upscatter_group()
+      call converge_downscatter_groups(gs_start - 1, outer_iters)
+    end if
+
     ! Begin loop to converge on the in-scattering source
     do outer_count = 1, outer_iters
 
@@ -52,7 +85,11 @@ module mg_solver
       old_phi = mg_phi
 
       ! Update the scalar flux
-      if (spatial_dimension == 1) then
+      if (energy_iteration == 'gauss_seidel') then
+        call sweep_gauss_seidel(gs_start)
+      else if (number_blocks > 1) then
+        call sweep_group_blocks(number_blocks)
+      else if (spatial_dimension == 1) then
         call apply_transport_operator_1D(mg_phi)
       else if (spatial_dimension == 2) then
         call apply_transport_operator_2D(mg_phi)
@@ -61,6 +98,11 @@ module mg_solver
         stop
       end if
 
+      ! Accelerate the scattering source iteration (Gauss-Seidel corrects each group)
+      if (use_dsa .and. dgm_order == 0 .and. energy_iteration == 'jacobi') then
+        call apply_dsa(old_phi(0, :, :), 1, number_groups)
+      end if
+
       ! Update the error
       outer_error = maxval(abs(mg_phi - old_phi))
 
@@ -77,6 +119,10 @@ module mg_solver
       if (outer_print > 0) then
         write(*, 1001) outer_count, outer_error, ave_sweep_time
         1001 format ( "    outer: ", i4, " Error: ", es12.5E2, " ave sweep time: ", f5.2, " s")
+        if (number_blocks > 1) then
+          write(*, 1003) number_blocks, omp_get_max_threads(), group_block_speedup
+          1003 format ( "      group blocks: ", i4, " threads: ", i4, " ave speedup: ", f6.2)
+        end if
         if (outer_print > 1) then
           print *, mg_phi
         end if
@@ -101,4 +147,417 @@ module mg_solver
 
   end subroutine mg_solve
 
+  subroutine solve_gmres(max_iters)
+    ! ##########################################################################
+    ! Solve the outer problem with restarted GMRES instead of source iteration
+    !
+    ! A sweep is the affine map T(x) = Kx + b of the flux moments and the stored
+    ! boundary fluxes, so GMRES solves (I - K)x = b with one sweep per
+    ! iteration.  The residual T(x) - x is the change of a source iteration, so
+    ! outer_tolerance applies to its 2-norm.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : outer_tolerance, outer_print, min_outer_iters, outer_converged, &
+                        ignore_warnings, gmres_restart
+    use state, only : mg_phi, mg_incident_x, mg_incident_y, outer_count, exit_status
+    use omp_lib, only : omp_get_wtime
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        max_iters      ! Maximum number of sweeps
+    real(kind=dp), dimension(size(mg_phi) + size(mg_incident_x) + size(mg_incident_y)) :: &
+        x,           & ! Current iterate
+        b,           & ! Sweep of a zero iterate
+        r,           & ! Residual of the current iterate
+        w              ! Next Krylov vector
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        basis,       & ! Orthonormal Krylov basis
+        hessenberg     ! Projected operator (rotated to upper triangular)
+    real(kind=dp), dimension(gmres_restart) :: &
+        rot_cos,     & ! Cosines of the Givens rotations
+        rot_sin,     & ! Sines of the Givens rotations
+        y              ! Coefficients of the update in the Krylov basis
+    real(kind=dp), dimension(gmres_restart + 1) :: &
+        residual       ! Rotated residual of the least squares problem
+    real(kind=dp) :: &
+        beta,        & ! Norm of the residual at the start of a cycle
+        temp,        & ! Temporary value for the rotations
+        start,       & ! Start time of the sweep function
+        ave_sweep_time ! Average time in seconds per sweep
+    integer :: &
+        m,           & ! Number of Krylov vectors in the cycle
+        i              ! Row index
+
+    allocate(basis(size(x), gmres_restart + 1), hessenberg(gmres_restart + 1, gmres_restart))
+
+    ave_sweep_time = 0.0_8
+    outer_count = 0
+
+    ! Constant part of the sweep
+    call pack_sweep_state(x)
+    w = 0.0_8
+    call apply_sweep_operator(w, b)
+
+    ! Initial residual
+    call apply_sweep_operator(x, r)
+    r = r - x
+
+    do
+      beta = norm2(r)
+
+      ! Check for NaN during convergence
+      if (beta /= beta) then
+        print *, "NaN detected...exiting"
+        exit_status = 1
+        return
+      end if
+
+      if (beta < outer_tolerance .and. outer_count >= min_outer_iters) then
+        outer_converged = .true.
+        exit
+      else if (outer_count >= max_iters) then
+        exit
+      end if
+
+      ! Build the Krylov basis for this cycle
+      basis(:, 1) = r / beta
+      residual = 0.0_8
+      residual(1) = beta
+      do m = 1, gmres_restart
+        start = omp_get_wtime()
+        outer_count = outer_count + 1
+
+        call apply_sweep_operator(basis(:, m), w)
+        w = basis(:, m) - (w - b)
+
+        ! Modified Gram-Schmidt orthogonalization
+        do i = 1, m
+          hessenberg(i, m) = dot_product(w, basis(:, i))
+          w = w - hessenberg(i, m) * basis(:, i)
+        end do  ! End i loop
+        hessenberg(m + 1, m) = norm2(w)
+        if (hessenberg(m + 1, m) > 0.0_8) then
+          basis(:, m + 1) = w / hessenberg(m + 1, m)
+        end if
+
+        ! Reduce the new column to upper triangular form
+        do i = 1, m - 1
+          temp = rot_cos(i) * hessenberg(i, m) + rot_sin(i) * hessenberg(i + 1, m)
+          hessenberg(i + 1, m) = -rot_sin(i) * hessenberg(i, m) + rot_cos(i) * hessenberg(i + 1, m)
+          hessenberg(i, m) = temp
+        end do  ! End i loop
+        temp = sqrt(hessenberg(m, m) ** 2 + hessenberg(m + 1, m) ** 2)
+        rot_cos(m) = hessenberg(m, m) / temp
+        rot_sin(m) = hessenberg(m + 1, m) / temp
+        hessenberg(m, m) = temp
+        hessenberg(m + 1, m) = 0.0_8
+        residual(m + 1) = -rot_sin(m) * residual(m)
+        residual(m) = rot_cos(m) * residual(m)
+
+        ave_sweep_time = ((outer_count - 1) * ave_sweep_time + (omp_get_wtime() - start)) / outer_count
+
+        ! Print output
+        if (outer_print > 0) then
+          write(*, 1001) outer_count, abs(residual(m + 1)), ave_sweep_time
+          1001 format ( "    gmres: ", i4, " Error: ", es12.5E2, " ave sweep time: ", f5.2, " s")
+        end if
+
+        if (abs(residual(m + 1)) < outer_tolerance .or. outer_count >= max_iters) then
+          exit
+        end if
+      end do  ! End m loop
+      m = min(m, gmres_restart)
+
+      ! Back substitution for the update in the Krylov basis
+      do i = m, 1, -1
+        y(i) = (residual(i) - dot_product(hessenberg(i, i + 1:m), y(i + 1:m))) / hessenberg(i, i)
+      end do  ! End i loop
+      x = x + matmul(basis(:, :m), y(:m))
+
+      ! The true residual leaves the state at one source iteration past x
+      call apply_sweep_operator(x, r)
+      r = r - x
+    end do
+
+    deallocate(basis, hessenberg)
+
+    if (.not. outer_converged .and. .not. ignore_warnings) then
+      ! Warning if more iterations are required
+      write(*, 1002) outer_count
+      1002 format ('gmres iteration did not converge in ', i4, ' iterations')
+    end if
+
+  end subroutine solve_gmres
+
+  subroutine apply_sweep_operator(x, y)
+    ! ##########################################################################
+    ! Sweep all groups starting from the packed flux moments and boundary fluxes
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : spatial_dimension
+    use sweeper_1D, only : apply_transport_operator_1D
+    use sweeper_2D, only : apply_transport_operator_2D
+    use state, only : mg_phi
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        x     ! Packed state before the sweep
+    real(kind=dp), intent(out), dimension(:) :: &
+        y     ! Packed state after the sweep
+
+    call unpack_sweep_state(x)
+
+    if (spatial_dimension == 1) then
+      call apply_transport_operator_1D(mg_phi)
+    else
+      call apply_transport_operator_2D(mg_phi)
+    end if
+
+    call pack_sweep_state(y)
+
+  end subroutine apply_sweep_operator
+
+  subroutine pack_sweep_state(x)
+    ! ##########################################################################
+    ! Copy the flux moments and the stored boundary fluxes into one vector
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_phi, mg_incident_x, mg_incident_y
+
+    ! Variable definitions
+    real(kind=dp), intent(out), dimension(:) :: &
+        x     ! Packed state
+    integer :: &
+        n1, & ! End of the flux moments
+        n2    ! End of the x boundary fluxes
+
+    n1 = size(mg_phi)
+    n2 = n1 + size(mg_incident_x)
+
+    x(:n1) = reshape(mg_phi, [n1])
+    x(n1 + 1:n2) = reshape(mg_incident_x, [size(mg_incident_x)])
+    x(n2 + 1:) = reshape(mg_incident_y, [size(mg_incident_y)])
+
+  end subroutine pack_sweep_state
+
+  subroutine unpack_sweep_state(x)
+    ! ##########################################################################
+    ! Copy a packed vector back into the flux moments and stored boundary fluxes
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_phi, mg_incident_x, mg_incident_y
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:) :: &
+        x     ! Packed state
+    integer :: &
+        n1, & ! End of the flux moments
+        n2    ! End of the x boundary fluxes
+
+    n1 = size(mg_phi)
+    n2 = n1 + size(mg_incident_x)
+
+    mg_phi = reshape(x(:n1), shape(mg_phi))
+    mg_incident_x = reshape(x(n1 + 1:n2), shape(mg_incident_x))
+    mg_incident_y = reshape(x(n2 + 1:), shape(mg_incident_y))
+
+  end subroutine unpack_sweep_state
+
+  subroutine sweep_group_blocks(number_blocks)
+    ! ##########################################################################
+    ! Sweep blocks of groups concurrently (Jacobi iteration in energy)
+    ! The scattering source is only exchanged between outer iterations
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_groups, spatial_dimension
+    use sweeper_1D, only : sweep_groups_1D, update_closure_tables_1D
+    use sweeper_2D, only : sweep_groups_2D, update_closure_tables_2D
+    use sources, only : compute_source
+    use state, only : mg_phi, sweep_count, outer_count, group_block_speedup
+    use omp_lib, only : omp_get_wtime
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        number_blocks  ! Number of group blocks
+    integer :: &
+        b,           & ! Group block index
+        gmin,        & ! Lower group in the block
+        gmax           ! Upper group in the block
+    real(kind=dp) :: &
+        start,       & ! Start time of the block sweeps
+        block_start, & ! Start time of a single block sweep
+        block_time     ! Total time spent sweeping the blocks
+
+    ! Increment the sweep counter
+    sweep_count = sweep_count + 1
+
+    ! Update the forcing function for all groups
+    call compute_source()
+
+    ! Update the closure tables before the threads share them
+    if (spatial_dimension == 1) then
+      call update_closure_tables_1D()
+    else
+      call update_closure_tables_2D()
+    end if
+
+    start = omp_get_wtime()
+    block_time = 0.0_8
+
+    !$omp parallel do default(shared) private(b, gmin, gmax, block_start) &
+    !$omp reduction(+:block_time) schedule(dynamic)
+    do b = 1, number_blocks
+      gmin = (b - 1) * number_groups / number_blocks + 1
+      gmax = b * number_groups / number_blocks
+
+      block_start = omp_get_wtime()
+      if (spatial_dimension == 1) then
+        call sweep_groups_1D(mg_phi, gmin, gmax)
+      else
+        call sweep_groups_2D(mg_phi, gmin, gmax)
+      end if
+      block_time = block_time + (omp_get_wtime() - block_start)
+    end do  ! End b loop
+    !$omp end parallel do
+
+    ! Track the average ratio of the serial work to the wall time
+    group_block_speedup = ((outer_count - 1) * group_block_speedup &
+                           + block_time / max(omp_get_wtime() - start, epsilon(start))) / outer_count
+
+  end subroutine sweep_group_blocks
+
+  subroutine sweep_gauss_seidel(gmin)
+    ! ##########################################################################
+    ! Sweep the groups from high to low energy (Gauss-Seidel iteration in energy)
+    ! The source for each group is rebuilt with the latest flux of higher groups
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_groups
+    use state, only : sweep_count
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        gmin  ! First group to sweep
+    integer :: &
+        g     ! Group index
+
+    ! Increment the sweep counter
+    sweep_count = sweep_count + 1
+
+    do g = gmin, number_groups
+      call sweep_single_group(g)
+    end do  ! End g loop
+
+  end subroutine sweep_gauss_seidel
+
+  subroutine converge_downscatter_groups(gmax, max_iters)
+    ! ##########################################################################
+    ! Converge groups 1 through gmax one at a time
+    ! These groups only scatter in from higher groups, so one pass is exact
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_moments, number_cells, outer_tolerance
+    use state, only : mg_phi
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        gmax,      & ! Last group without upscatter
+        max_iters    ! Maximum number of within-group iterations
+    integer :: &
+        g,         & ! Group index
+        inner_count  ! Within-group iteration counter
+    real(kind=dp), dimension(0:number_moments, number_cells) :: &
+        old_phi      ! Group flux from the previous iteration
+
+    do g = 1, gmax
+      do inner_count = 1, max_iters
+        old_phi = mg_phi(:, g, :)
+
+        call sweep_single_group(g)
+
+        if (maxval(abs(mg_phi(:, g, :) - old_phi)) < outer_tolerance) then
+          exit
+        end if
+      end do  ! End inner_count loop
+    end do  ! End g loop
+
+  end subroutine converge_downscatter_groups
+
+  subroutine sweep_single_group(g)
+    ! ##########################################################################
+    ! Rebuild the source for group g and sweep that group
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : spatial_dimension, number_cells, use_dsa
+    use dgm, only : dgm_order
+    use dsa, only : apply_dsa
+    use sweeper_1D, only : sweep_groups_1D, update_closure_tables_1D
+    use sweeper_2D, only : sweep_groups_2D, update_closure_tables_2D
+    use sources, only : compute_group_source
+    use state, only : mg_phi
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        g        ! Group index
+    real(kind=dp), dimension(1, number_cells) :: &
+        old_phi  ! Scalar flux of the group before the sweep
+
+    old_phi(1, :) = mg_phi(0, g, :)
+
+    call compute_group_source(g, g)
+
+    if (spatial_dimension == 1) then
+      call update_closure_tables_1D()
+      call sweep_groups_1D(mg_phi, g, g)
+    else
+      call update_closure_tables_2D()
+      call sweep_groups_2D(mg_phi, g, g)
+    end if
+
+    ! Accelerate the within-group scattering iteration
+    if (use_dsa .and. dgm_order == 0) then
+      call apply_dsa(old_phi, g, g)
+    end if
+
+  end subroutine sweep_single_group
+
+  function first_upscatter_group() result(g_up)
+    ! ##########################################################################
+    ! Find the highest energy group that receives upscatter from a lower group
+    ! Returns number_groups + 1 if there is no upscatter
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_groups, allow_fission, solver_type
+    use state, only : mg_sig_s
+    use dgm, only : dgm_order
+
+    ! Variable definitions
+    integer :: &
+        g_up  ! First group in the upscatter block
+
+    ! A fixed source fission problem couples all groups
+    if (allow_fission .and. solver_type == 'fixed' .and. dgm_order == 0) then
+      g_up = 1
+      return
+    end if
+
+    do g_up = 1, number_groups - 1
+      if (any(mg_sig_s(:, g_up + 1:, g_up, :) /= 0.0_8)) then
+        return
+      end if
+    end do  ! End g_up loop
+
+    g_up = number_groups + 1
+
+  end function first_upscatter_group
+
 end module mg_solver
@@ -0,0 +1,38 @@
+import sys
+import numpy as np
+
+
+def writeBinaryBasis(basis, groupMap, fname):
+    '''
+    Write a basis in the binary block format read by pydgm
+
+    basis    - (G, G) basis in the text layout, where row g holds the value of
+               each basis function of the coarse group containing g
+    groupMap - coarse group of each fine group (starting at 1)
+    fname    - name of the binary basis file
+    '''
+    basis = np.asarray(basis, dtype=np.float64)
+    groupMap = np.asarray(groupMap, dtype=np.int32)
+    G = len(groupMap)
+    CG = groupMap.max()
+
+    assert basis.shape == (G, G), 'The basis must have one row and column per fine group'
+
+    with open(fname, 'wb') as f:
+        f.write(b'DGMBASIS')
+        np.array([G, CG], dtype=np.int32).tofile(f)
+        groupMap.tofile(f)
+        for cg in range(1, CG + 1):
+            mask = groupMap == cg
+            # Write the block in column major order
+            basis[np.ix_(mask, mask)].T.tofile(f)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print('usage: python writeBinaryBasis.py <text basis> <energy group map> <binary basis>')
+        print('       the energy group map is a comma separated list such as 1,1,1,1,2,2,2')
+        sys.exit(1)
+
+    groupMap = [int(cg) for cg in sys.argv[2].split(',')]
+    writeBinaryBasis(np.loadtxt(sys.argv[1]), groupMap, sys.argv[3])
@@ -0,0 +1,121 @@
+import sys
+import numpy as np
+
+# Descriptive record of each material (96 bytes)
+MATERIAL_RECORD = np.dtype([('name', 'S64'), ('order', '<i4'), ('dataPresent', '<i4'),
+                            ('energyFission', '<f8'), ('energyCapture', '<f8'),
+                            ('gramAtomWeight', '<f8')])
+
+
+class _RecordReader(object):
+    '''
+    Read values the way a list directed Fortran read does, where each read
+    starts on a new line and skips what is left of its last line
+    '''
+
+    def __init__(self, fname):
+        with open(fname, 'r') as f:
+            self.lines = f.readlines()
+        self.index = 0
+
+    def line(self):
+        self.index += 1
+        return self.lines[self.index - 1]
+
+    def values(self, number):
+        values = []
+        while len(values) < number:
+            values += self.line().split()
+        return values[:number]
+
+
+def readAnlxs(fname):
+    '''
+    Read a cross section library in the proteus/anlxs text format
+
+    Returns a dictionary with the library data in the layout of the material module
+    '''
+    f = _RecordReader(fname)
+    M, G, debugFlag = [int(v) for v in f.values(3)]
+    ebounds = np.array(f.values(G + 1), dtype=np.float64)
+    velocity = np.array(f.values(G), dtype=np.float64)
+
+    records = np.zeros(M, dtype=MATERIAL_RECORD)
+    sig_t = np.zeros((G, M))
+    sig_f = np.zeros((G, M))
+    nu_sig_f = np.zeros((G, M))
+    chi = np.zeros((G, M))
+    sig_s = []
+    for m in range(M):
+        name = f.line().strip().encode()
+        L, dataPresent, eF, eC, gaw = f.values(5)
+        records[m] = (name, int(L) - 1, int(dataPresent), float(eF), float(eC), float(gaw))
+        for g in range(G):
+            if int(dataPresent) == 1:
+                sig_t[g, m], sig_f[g, m], nu_sig_f[g, m], chi[g, m] = [float(v) for v in f.values(4)]
+            else:
+                sig_t[g, m] = float(f.values(1)[0])
+        sig_s.append(np.array([[f.values(G) for g in range(G)] for l in range(int(L))], dtype=np.float64))
+
+    L = records['order'].max()
+    scatter = np.zeros((L + 1, G, G, M))
+    for m, s in enumerate(sig_s):
+        scatter[:len(s), :, :, m] = s
+
+    return {'debugFlag': debugFlag, 'ebounds': ebounds, 'velocity': velocity, 'materials': records,
+            'sig_t': sig_t, 'sig_f': sig_f, 'nu_sig_f': nu_sig_f, 'chi': chi, 'sig_s': scatter}
+
+
+def writeBinaryXS(xs, fname):
+    '''
+    Write a cross section library in the binary format read by pydgm
+
+    xs    - dictionary of library data as returned by readAnlxs
+    fname - name of the binary library
+    '''
+    M = len(xs['materials'])
+    L, G = xs['sig_s'].shape[:2]
+    with open(fname, 'wb') as f:
+        f.write(b'DGMXSLIB')
+        # Version, materials, groups, highest Legendre order, debug flag and a reserved entry
+        np.array([1, M, G, L - 1, xs['debugFlag'], 0], dtype='<i4').tofile(f)
+        np.asarray(xs['ebounds'], dtype='<f8').tofile(f)
+        np.asarray(xs['velocity'], dtype='<f8').tofile(f)
+        np.asarray(xs['materials'], dtype=MATERIAL_RECORD).tofile(f)
+        for name in ['sig_t', 'sig_f', 'nu_sig_f', 'chi', 'sig_s']:
+            # Write the arrays in column major order
+            np.asarray(xs[name], dtype='<f8').T.tofile(f)
+
+
+def readBinaryXS(fname):
+    '''
+    Memory map a cross section library in the binary format
+
+    Returns a dictionary with the same entries as readAnlxs
+    '''
+    # The first two entries hold the characters DGMXSLIB
+    header = np.fromfile(fname, dtype='<i4', count=8)
+    version, M, G, L, debugFlag = header[2:7]
+    assert version == 1, 'Unknown version {} of the binary cross section library'.format(version)
+
+    xs = {'debugFlag': int(debugFlag)}
+    offset = 32
+    for name, shape in [('ebounds', (G + 1,)), ('velocity', (G,))]:
+        xs[name] = np.memmap(fname, dtype='<f8', mode='r', offset=offset, shape=shape)
+        offset += xs[name].nbytes
+    xs['materials'] = np.memmap(fname, dtype=MATERIAL_RECORD, mode='r', offset=offset, shape=(M,))
+    offset += xs['materials'].nbytes
+    for name, shape in [('sig_t', (G, M)), ('sig_f', (G, M)), ('nu_sig_f', (G, M)), ('chi', (G, M)),
+                        ('sig_s', (L + 1, G, G, M))]:
+        xs[name] = np.memmap(fname, dtype='<f8', mode='r', offset=offset, shape=shape, order='F')
+        offset += xs[name].nbytes
+
+    return xs
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('usage: python writeBinaryXS.py <anlxs library> <binary library>')
+        sys.exit(1)
+
+    writeBinaryXS(readAnlxs(sys.argv[1]), sys.argv[2])
@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.io import FortranFile
+from readFlux import readFlux
 from matplotlib import rc
 rc('font',**{'family':'serif'})
 from matplotlib import rcParams
@@ -17,11 +17,10 @@ def computeError(ref, phi):
 
 def getErrors(kind):
 
-    index = np.s_[:,:,0] if kind == 'phi' else np.s_[:,:,:]
+    # Compare the scalar flux or the full angular flux
+    index = np.s_[0] if kind == 'phi' else np.s_[...]
 
-
-    with FortranFile('src/10pinreference_{}.bin'.format(kind), 'r') as f:
-        ref = f.read_reals(dtype=np.float).reshape(280,-1,8)[index]
+    ref = readFlux('src/10pinreference_{}.bin'.format(kind))[1][index]
 
     full_err = []
     mox_err = []
@@ -29,14 +28,10 @@ def getErrors(kind):
     comp_err = []
 
     for i in range(85):
-        with FortranFile('klt_full_7/10pin_dgm_7g_full_{}_{}.bin'.format(i+1, kind), 'r') as f:
-            full_err.append(computeError(ref, f.read_reals(dtype=np.float).reshape(280,-1,8)[index]))
-        with FortranFile('klt_mox_7/10pin_dgm_7g_mox_{}_{}.bin'.format(i+1, kind), 'r') as f:
-            mox_err.append(computeError(ref, f.read_reals(dtype=np.float).reshape(280,-1,8)[index]))
-        with FortranFile('klt_uo2_7/10pin_dgm_7g_uo2_{}_{}.bin'.format(i+1, kind), 'r') as f:
-            uo2_err.append(computeError(ref, f.read_reals(dtype=np.float).reshape(280,-1,8)[index]))
-        with FortranFile('klt_combine_7/10pin_dgm_7g_combine_{}_{}.bin'.format(i+1, kind), 'r') as f:
-            comp_err.append(computeError(ref, f.read_reals(dtype=np.float).reshape(280,-1,8)[index]))
+        full_err.append(computeError(ref, readFlux('klt_full_7/10pin_dgm_7g_full_{}_{}.bin'.format(i+1, kind))[1][index]))
+        mox_err.append(computeError(ref, readFlux('klt_mox_7/10pin_dgm_7g_mox_{}_{}.bin'.format(i+1, kind))[1][index]))
+        uo2_err.append(computeError(ref, readFlux('klt_uo2_7/10pin_dgm_7g_uo2_{}_{}.bin'.format(i+1, kind))[1][index]))
+        comp_err.append(computeError(ref, readFlux('klt_combine_7/10pin_dgm_7g_combine_{}_{}.bin'.format(i+1, kind))[1][index]))
 
     np.savetxt('full_err_{}'.format(kind), np.array(full_err))
     np.savetxt('mox_err_{}'.format(kind), np.array(mox_err))
@@ -0,0 +1,36 @@
+import sys
+import numpy as np
+
+# Header written by state.write_flux (64 bytes)
+FLUX_HEADER = np.dtype([('magic', 'S8'), ('name', 'S8'), ('version', '<i4'), ('rank', '<i4'),
+                        ('shape', '<i4', 3), ('groups', '<i4'), ('angles', '<i4'), ('moments', '<i4'),
+                        ('cells', '<i4'), ('dimension', '<i4'), ('reserved', '<i4', 2)])
+
+
+def readFlux(fname):
+    '''
+    Memory map a flux file written by pydgm
+
+    Returns the header as a dictionary and the flux as a read only array
+    indexed like the Fortran array, so slices are only read when used
+    '''
+    header = np.fromfile(fname, dtype=FLUX_HEADER, count=1)[0]
+    assert header['magic'] == b'DGMFLUX ', '{} is not a pydgm flux file'.format(fname)
+    assert header['version'] == 1, 'Unknown version {} of the flux file'.format(header['version'])
+
+    info = {name: header[name] for name in FLUX_HEADER.names if name not in ['magic', 'reserved']}
+    info['name'] = info['name'].decode().strip()
+    info['shape'] = tuple(int(n) for n in info['shape'])
+    flux = np.memmap(fname, dtype='<f8', mode='r', offset=FLUX_HEADER.itemsize, shape=info['shape'], order='F')
+
+    return info, flux
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('usage: python readFlux.py <flux file>')
+        sys.exit(1)
+
+    info, flux = readFlux(sys.argv[1])
+    for key, value in info.items():
+        print('{:10s} {}'.format(key, value))
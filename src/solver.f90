@@ -18,7 +18,7 @@ module solver
     ! Use Statements
     use state, only : initialize_state, mg_nu_sig_f, mg_chi, mg_sig_s, mg_sig_t, &
                       mg_phi, phi, mg_psi, psi, mg_mMap, &
-                      update_fission_density
+                      update_fission_density, update_scatter_kernel
     use material, only : nu_sig_f, chi, sig_s, sig_t, finalize_material
     use mesh, only : mMap
     use control, only : store_psi, number_regions,scatter_leg_order
@@ -40,6 +40,9 @@ module solver
       mg_sig_t(:,r) = sig_t(:,r)
     end do  ! End r loop
 
+    ! Cache the scattering kernel for the source computation
+    call update_scatter_kernel()
+
     ! Delete the fine-group cross sections
     call finalize_material()
 
@@ -53,31 +56,168 @@ module solver
 
   end subroutine initialize_solver
 
+  subroutine initialize_solver_with_xs(sig_t, nu_sig_f, chi, sig_s)
+    ! ##########################################################################
+    ! Initialize the solver using cross sections passed as arrays instead of
+    ! reading xs_name.  The arrays are sized (groups, materials) and
+    ! (legendre moments, groups, groups, materials) as the material module
+    ! The mg containers in state are set to fine group size
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : initialize_state, mg_phi, phi, mg_psi, psi, mg_mMap
+    use material, only : number_materials
+    use mesh, only : mMap
+    use control, only : store_psi, number_fine_groups, scatter_leg_order, material_map
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        sig_t,     & ! Total cross section
+        nu_sig_f,  & ! Fission cross section times nu
+        chi          ! Fission spectrum
+    real(kind=dp), intent(in), dimension(:,:,:,:) :: &
+        sig_s        ! Scattering cross section
+
+    number_fine_groups = size(sig_t, 1)
+    number_materials = size(sig_t, 2)
+    scatter_leg_order = size(sig_s, 1) - 1
+
+    if (maxval(material_map) > number_materials) then
+      print *, 'INPUT ERROR : material_map refers to material ', maxval(material_map), &
+               ' but only ', number_materials, ' materials were given'
+      stop
+    end if
+
+    ! allocate the solutions variables
+    call initialize_state(.true.)
+
+    mg_mMap(:) = mMap(:)
+    mg_phi(:, :, :) = phi(:, :, :)
+    if (store_psi) then
+      mg_psi(:, :, :) = psi(:, :, :)
+    end if
+
+    ! Fill the multigroup arrays and the caches that depend on them
+    call update_cross_sections(sig_t, nu_sig_f, chi, sig_s)
+
+  end subroutine initialize_solver_with_xs
+
+  subroutine update_cross_sections(sig_t, nu_sig_f, chi, sig_s)
+    ! ##########################################################################
+    ! Replace the multigroup cross sections of an initialized solver
+    ! The mesh, quadrature and fluxes are kept, so the next solve starts from
+    ! the last solution.  The arrays are sized (groups, regions) and
+    ! (legendre moments, groups, groups, regions) as the mg containers in state
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_nu_sig_f, mg_chi, mg_sig_s, mg_sig_t, &
+                      update_fission_density, update_scatter_kernel
+    use control, only : allow_fission, allow_scatter
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:) :: &
+        sig_t,     & ! Total cross section
+        nu_sig_f,  & ! Fission cross section times nu
+        chi          ! Fission spectrum
+    real(kind=dp), intent(in), dimension(:,:,:,:) :: &
+        sig_s        ! Scattering cross section
+
+    if (any(shape(sig_t) /= shape(mg_sig_t)) .or. any(shape(nu_sig_f) /= shape(mg_nu_sig_f)) .or. &
+        any(shape(chi) /= shape(mg_chi)) .or. any(shape(sig_s) /= shape(mg_sig_s))) then
+      print *, 'INPUT ERROR : cross sections do not match the shape of the initialized solver'
+      stop
+    end if
+
+    mg_sig_t(:,:) = sig_t(:,:)
+    mg_nu_sig_f(:,:) = nu_sig_f(:,:)
+    mg_chi(:,:) = chi(:,:)
+    mg_sig_s(:,:,:,:) = sig_s(:,:,:,:)
+
+    ! Remove the reactions that are turned off as when reading a library
+    if (.not. allow_fission) then
+      mg_nu_sig_f = 0.0_8
+    end if
+    if (.not. allow_scatter) then
+      mg_sig_s = 0.0_8
+    end if
+
+    ! The closure caches check their own inputs before each sweep
+    call update_scatter_kernel()
+    call update_fission_density()
+
+  end subroutine update_cross_sections
+
+  subroutine update_source(value)
+    ! ##########################################################################
+    ! Replace the constant source of an initialized solver
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_constant_source, scaling
+    use control, only : source_value
+
+    ! Variable definitions
+    real(kind=dp), intent(in) :: &
+        value      ! Constant source before scaling
+
+    source_value = value
+    mg_constant_source = value * scaling
+
+  end subroutine update_source
+
   subroutine solve()
     ! ##########################################################################
     ! Solve the neutron transport equation using discrete ordinates
     ! ##########################################################################
 
     ! Use Statements
-    use mg_solver, only : mg_solve
+    use mg_solver, only : mg_solve, pack_sweep_state, unpack_sweep_state
+    use cmfd, only : apply_cmfd
+    use acceleration, only : anderson_mix, chebyshev_coefficients
     use state, only : mg_phi, mg_psi, keff, normalize_flux, phi, psi, &
-                      eigen_count, update_fission_density, exit_status
+                      eigen_count, update_fission_density, exit_status, mg_current_x, &
+                      mg_incident_x, mg_incident_y, fission_shift, eigen_spectral_radius, &
+                      write_checkpoint, read_checkpoint
     use control, only : solver_type, eigen_print, ignore_warnings, max_eigen_iters, &
                         eigen_tolerance, number_cells, number_groups, &
                         use_DGM, min_eigen_iters, store_psi, eigen_converged, &
-                        outer_converged, number_moments
+                        outer_converged, number_moments, eigen_acceleration, &
+                        wielandt_shift, anderson_depth, checkpoint_interval, restart_name
     use dgm, only : dgm_order
     use omp_lib, only : omp_get_wtime
 
     ! Variable definitions
     real(kind=dp) :: &
         eigen_error,  & ! Error between successive iterations
+        first_error,  & ! Error of the first iteration
+        shift,        & ! Inverse of the Wielandt eigenvalue for this iteration
+        residual,     & ! Change of the packed state from the last power iteration
+        last_residual,& ! Residual of the previous iteration
+        sigma,        & ! Estimate of the dominance ratio for Chebyshev extrapolation
+        alpha,        & ! Chebyshev weight of the power iteration change
+        beta,         & ! Chebyshev weight of the previous change
         start,        & ! Start time of the sweep function
         ave_sweep_time  ! Average time in seconds per sweep
     real(kind=dp), dimension(0:number_moments, number_groups, number_cells) :: &
         old_phi         ! Scalar flux from previous iteration
+    real(kind=dp), allocatable, dimension(:) :: &
+        x,            & ! Packed state entering the power iteration
+        gx,           & ! Packed state leaving the power iteration
+        previous_x,   & ! Packed state entering the previous power iteration
+        last_f,       & ! Anderson residual of the previous iteration
+        last_g          ! Anderson map of the previous iteration
+    real(kind=dp), allocatable, dimension(:,:) :: &
+        delta_f,      & ! Anderson history of the residual differences
+        delta_g         ! Anderson history of the map differences
+    integer :: &
+        history,      & ! Number of iterations seen by the Anderson mixing
+        p,            & ! Step within the Chebyshev cycle (0 while estimating sigma)
+        first_eigen     ! First eigen iteration (after a restart)
 
     ave_sweep_time = 0.0_8
+    first_error = 0.0_8
+    eigen_spectral_radius = 0.0_8
 
     ! Initialize the eigen convergence flag to False
     eigen_converged = .false.
@@ -86,7 +226,30 @@ module solver
     if (solver_type == 'fixed' .or. dgm_order > 0) then
       call mg_solve()
     else if (solver_type == 'eigen') then
-      do eigen_count = 1, max_eigen_iters
+      ! Storage for the extrapolation of the power iteration
+      if (eigen_acceleration == 'chebyshev' .or. eigen_acceleration == 'anderson') then
+        allocate(x(size(mg_phi) + size(mg_incident_x) + size(mg_incident_y)))
+        allocate(gx(size(x)))
+        if (eigen_acceleration == 'anderson') then
+          allocate(delta_f(size(x), anderson_depth), delta_g(size(x), anderson_depth))
+          allocate(last_f(size(x)), last_g(size(x)))
+        else
+          ! Only the Chebyshev extrapolation keeps the previous iterate
+          allocate(previous_x(size(x)))
+        end if
+        history = 0
+        p = 0
+        sigma = 0.0_8
+        last_residual = 0.0_8
+      end if
+
+      ! Resume from a checkpoint of the eigen loop
+      first_eigen = 1
+      if (len_trim(restart_name) > 0 .and. .not. use_DGM) then
+        call read_checkpoint('eigen', first_eigen)
+      end if
+
+      do eigen_count = first_eigen, max_eigen_iters
 
         start = omp_get_wtime()
 
@@ -95,12 +258,27 @@ module solver
 
         ! Save the old value of the scalar flux
         old_phi = mg_phi
+        if (allocated(x)) then
+          call pack_sweep_state(x)
+        end if
 
         ! Solve the multigroup problem
-        call mg_solve()
+        if (eigen_acceleration == 'wielandt') then
+          ! Keep the shifted eigenvalue above the current estimate
+          shift = 1.0_8 / (keff + wielandt_shift)
+          fission_shift = shift
+          call mg_solve()
+          fission_shift = 0.0_8
+
+          ! Only the unshifted part of the fission source scales with 1 / keff
+          keff = 1.0_8 / (shift + (1.0_8 / keff - shift) * &
+                          sum(abs(old_phi(0,:,:))) / sum(abs(mg_phi(0,:,:))))
+        else
+          call mg_solve()
 
-        ! Compute new eigenvalue if eigen problem
-        keff = keff * sum(abs(mg_phi(0,:,:))) / sum(abs(old_phi(0,:,:)))
+          ! Compute new eigenvalue if eigen problem
+          keff = keff * sum(abs(mg_phi(0,:,:))) / sum(abs(old_phi(0,:,:)))
+        end if
         ! Check for infinity by comparing against the largest variable of the same type as keff
         if (keff > HUGE(keff)) then
             print *, "infinity detected...exiting"
@@ -110,24 +288,73 @@ module solver
             return
         end if
 
+        ! Accelerate with the coarse mesh problem if the currents were tallied
+        if (allocated(mg_current_x)) then
+          call apply_cmfd()
+        end if
+
         ! Normalize the fluxes
         call normalize_flux(mg_phi, mg_psi)
 
+        ! Extrapolate the power iteration
+        if (eigen_acceleration == 'anderson') then
+          call pack_sweep_state(gx)
+          call anderson_mix(x, gx, 1.0_8, delta_f, delta_g, last_f, last_g, history)
+          call unpack_sweep_state(x)
+        else if (eigen_acceleration == 'chebyshev') then
+          call pack_sweep_state(gx)
+          residual = norm2(gx - x)
+          if (p > 0 .and. residual > last_residual) then
+            ! Estimate the dominance ratio again if the extrapolation grows
+            p = 0
+          else if (p == 0 .and. last_residual > 0.0_8) then
+            ! Start once the power iterations settle on a dominance ratio
+            if (abs(residual / last_residual - sigma) < 0.01_8 * sigma .and. &
+                residual < last_residual) then
+              p = 1
+            end if
+            sigma = residual / last_residual
+          end if
+          if (p > 0) then
+            call chebyshev_coefficients(p, sigma, alpha, beta)
+            gx = x + alpha * (gx - x) + beta * (x - previous_x)
+            call unpack_sweep_state(gx)
+            p = p + 1
+          end if
+          previous_x(:) = x(:)
+          last_residual = residual
+        end if
+
         ! Update the error
         eigen_error = maxval(abs(mg_phi - old_phi))
 
-        ave_sweep_time = ((eigen_count - 1) * ave_sweep_time + (omp_get_wtime() - start)) / eigen_count
+        ! Average reduction of the error per iteration
+        if (eigen_count == first_eigen) then
+          first_error = eigen_error
+        else if (first_error > 0.0_8 .and. eigen_error > 0.0_8) then
+          eigen_spectral_radius = (eigen_error / first_error) ** (1.0_8 / (eigen_count - first_eigen))
+        end if
+
+        ave_sweep_time = ((eigen_count - first_eigen) * ave_sweep_time + (omp_get_wtime() - start)) / &
+                         (eigen_count - first_eigen + 1)
 
         ! Print output
         if (eigen_print > 0) then
-          write(*, 1001) eigen_count, eigen_error, keff, ave_sweep_time, outer_converged
+          write(*, 1001) eigen_count, eigen_error, keff, ave_sweep_time, outer_converged, eigen_spectral_radius
           1001 format ( "  eigen: ", i4, " Error: ", es12.5E2, " Eigenvalue: ", f14.10, " AveSweepTime: ", f5.2, " s", &
-                        " OuterConverged: ", L1)
+                        " OuterConverged: ", L1, " SpectralRadius: ", f6.4)
           if (eigen_print > 1) then
             print *, mg_phi
           end if
         end if
 
+        ! Save the iterate so an interrupted solve can resume
+        if (checkpoint_interval > 0 .and. .not. use_DGM) then
+          if (mod(eigen_count, checkpoint_interval) == 0) then
+            call write_checkpoint('eigen', eigen_count)
+          end if
+        end if
+
         ! Check if tolerance is reached
         if (eigen_error < eigen_tolerance .and. eigen_count >= min_eigen_iters) then
           ! Set the eigen convergence flag to True
@@ -143,6 +370,16 @@ module solver
 
       end do  ! End eigen_count loop
 
+      if (allocated(x)) then
+        deallocate(x, gx)
+      end if
+      if (allocated(previous_x)) then
+        deallocate(previous_x)
+      end if
+      if (allocated(delta_f)) then
+        deallocate(delta_f, delta_g, last_f, last_g)
+      end if
+
       if (eigen_count == max_eigen_iters) then
         if (.not. ignore_warnings) then
           ! Warning if more iterations are required
@@ -185,8 +422,12 @@ module solver
 
     ! Use Statements
     use state, only : finalize_state
+    use sweeper_1D, only : finalize_sweeper_1D
+    use sweeper_2D, only : finalize_sweeper_2D
 
     call finalize_state()
+    call finalize_sweeper_1D()
+    call finalize_sweeper_2D()
   end subroutine
 
 end module solver
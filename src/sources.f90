@@ -11,31 +11,63 @@ module sources
 
   subroutine compute_source()
     ! ##########################################################################
-    ! Compute the sources into group g from gp
+    ! Compute the sources into group g from gp for all groups
     ! ##########################################################################
 
     ! Use Statements
-    use state, only : mg_source, update_fission_density, sigphi, mg_sig_s, &
+    use control, only : number_groups
+
+    call compute_group_source(1, number_groups)
+
+  end subroutine compute_source
+
+  subroutine compute_group_source(g1, g2)
+    ! ##########################################################################
+    ! Compute the sources into groups g1 through g2 from gp
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_source, update_fission_density, sigphi, mg_sig_s_t, &
                       mg_mMap, mg_phi, keff, mg_chi, mg_density, mg_constant_source, &
-                      scaling
+                      scaling, region_offset, region_cells, update_scatter_kernel, &
+                      scatter_kernel_sized, mg_nu_sig_f, fission_shift
     use control, only : number_cells, allow_fission, solver_type, number_groups, &
-                        scatter_leg_order, use_DGM, spatial_dimension
+                        scatter_leg_order, use_DGM, spatial_dimension, number_regions, &
+                        sparse_scatter
     use dgm, only : dgm_order, phi_m, source_m
 
     ! Variable definitions
+    integer, intent(in) :: &
+      g1,  & ! Lowest group index to update
+      g2     ! Highest group index to update
     integer :: &
-      g,   & ! Group index
-      c,   & ! Cell index
-      mat, & ! Material index
-      l,   & ! Legendre index
-      m,   & ! Moment index
-      ll,  & ! Total moment index
-      ord    ! short name for scatter_legendre_order
+      c,        & ! Cell index
+      mat,      & ! Material index
+      l,        & ! Legendre index
+      m,        & ! Moment index
+      ll,       & ! Total moment index
+      i,        & ! Index of the cell within its region
+      first,    & ! Offset of the first cell of the region
+      nc,       & ! Number of cells in the region
+      number_m, & ! Number of moments for Legendre order l
+      ord         ! short name for scatter_legendre_order
     logical :: &
       dgm_switch    !
+    real(kind=dp) :: &
+      factor        ! Normalization of the scattering moment
+    real(kind=dp), dimension(number_groups) :: &
+      scatter       ! Scattering source of one moment in a cell
+    real(kind=dp), allocatable, dimension(:,:) :: &
+      flux,       & ! Flux moment gathered for the cells of a region
+      kernel_flux   ! Scattering source for the cells of a region
+
+    ! Build the cached kernel on first use or after the problem size changed
+    if (.not. scatter_kernel_sized()) then
+      call update_scatter_kernel()
+    end if
 
     ! Reset the sources
-    mg_source = 0.0_8
+    mg_source(g1:g2,:) = 0.0_8
 
     ! Update the fission density if needed
     if (allow_fission .or. solver_type == 'eigen') then
@@ -46,64 +78,198 @@ module sources
 
     dgm_switch = use_DGM .and. dgm_order > 0
 
-    sigphi = 0.0_8
     ord = scatter_leg_order
 
+    allocate(flux(number_groups, maxval(region_offset(2:) - region_offset(:number_regions))))
+    allocate(kernel_flux(number_groups, size(flux, 2)))
+
     ! Compute the source
     do c = 1, number_cells
       mat = mg_mMap(c)
 
       ! Add the external source
       if (use_DGM) then
-        mg_source(:,c) = mg_source(:,c) + source_m(:,dgm_order)
+        mg_source(g1:g2,c) = mg_source(g1:g2,c) + source_m(g1:g2,dgm_order)
       else
-        mg_source(:,c) = mg_source(:,c) + mg_constant_source
+        mg_source(g1:g2,c) = mg_source(g1:g2,c) + mg_constant_source
       end if
 
       ! Add the fission source
-      if (allow_fission .or. solver_type == 'eigen') then
-        mg_source(:,c) = mg_source(:,c) + scaling * mg_chi(:,mat) * mg_density(c) / keff
+      if (fission_shift > 0.0_8) then
+        ! The Wielandt shift moves part of the fission source onto the current flux
+        mg_source(g1:g2,c) = mg_source(g1:g2,c) + scaling * mg_chi(g1:g2,mat) * &
+                             (mg_density(c) * (1.0_8 / keff - fission_shift) + &
+                              fission_shift * sum(mg_nu_sig_f(:,mat) * mg_phi(0,:,c)))
+      else if (allow_fission .or. solver_type == 'eigen') then
+        mg_source(g1:g2,c) = mg_source(g1:g2,c) + scaling * mg_chi(g1:g2,mat) * mg_density(c) / keff
       end if
 
-      ! Compute the scattering matrix
-      if (spatial_dimension == 1) then
-        if (dgm_switch) then
-          do g = 1, number_groups
-            sigphi(:,g,c) = sum(phi_m(0, 0:ord,:,c) * mg_sig_s(:,:,g,mat), 2)
-          end do  ! End g loop
-        else
-          do g = 1, number_groups
-            sigphi(:,g,c) = sum(mg_phi(0:ord,:,c) * mg_sig_s(:,:,g,mat), 2)
-          end do  ! End g loop
-        end if
-        do l = 0, scatter_leg_order
-          sigphi(l,:,c) = sigphi(l,:,c) * (2.0_8 * l + 1.0_8) * scaling
-        end do
-      else
-        if (dgm_switch) then
-          do g = 1, number_groups
-            ll = 0
-            do l = 0, scatter_leg_order
-              do m = -l, l
-                sigphi(ll,g,c) = dot_product(phi_m(0,ll,:,c), mg_sig_s(l,:,g,mat)) * scaling
-                ll = ll + 1
-              end do  ! End m loop
-            end do  ! End l loop
-          end do  ! End g loop
+    end do  ! End c loop
+
+    ! The higher orders apply the stored coarse group blocks directly
+    if (dgm_switch .and. sparse_scatter) then
+      do c = 1, number_cells
+        mat = mg_mMap(c)
+        ll = 0
+        do l = 0, ord
+          if (spatial_dimension == 1) then
+            number_m = 1
+            factor = (2.0_8 * l + 1.0_8) * scaling
+          else
+            number_m = 2 * l + 1
+            factor = scaling
+          end if
+
+          do m = 1, number_m
+            call apply_scatter_blocks(l, mat, dgm_order, phi_m(0, ll, :, c), scatter)
+            sigphi(ll, g1:g2, c) = scatter(g1:g2) * factor
+            ll = ll + 1
+          end do  ! End m loop
+        end do  ! End l loop
+      end do  ! End c loop
+      return
+    end if
+
+    ! Compute the scattering source one region at a time
+    do mat = 1, number_regions
+      first = region_offset(mat)
+      nc = region_offset(mat + 1) - first
+      if (nc == 0) then
+        cycle
+      end if
+
+      ll = 0
+      do l = 0, ord
+        if (spatial_dimension == 1) then
+          number_m = 1
+          factor = (2.0_8 * l + 1.0_8) * scaling
         else
-          do g = 1, number_groups
-            ll = 0
-            do l = 0, scatter_leg_order
-              do m = -l, l
-                sigphi(ll,g,c) = dot_product(mg_phi(ll,:,c), mg_sig_s(l,:,g,mat)) * scaling
-                ll = ll + 1
-              end do  ! End m loop
-            end do  ! End l loop
-          end do  ! End g loop
+          number_m = 2 * l + 1
+          factor = scaling
         end if
+
+        do m = 1, number_m
+          ! Gather the flux moment for the cells in this region
+          do i = 1, nc
+            c = region_cells(first + i - 1)
+            if (dgm_switch) then
+              flux(:, i) = phi_m(0, ll, :, c)
+            else
+              flux(:, i) = mg_phi(ll, :, c)
+            end if
+          end do  ! End i loop
+
+          ! Apply the cached kernel to all cells at once
+          kernel_flux(g1:g2, :nc) = matmul(mg_sig_s_t(g1:g2, :, l, mat), flux(:, :nc))
+
+          do i = 1, nc
+            sigphi(ll, g1:g2, region_cells(first + i - 1)) = kernel_flux(g1:g2, i) * factor
+          end do  ! End i loop
+          ll = ll + 1
+        end do  ! End m loop
+      end do  ! End l loop
+    end do  ! End mat loop
+
+  end subroutine compute_group_source
+
+  subroutine compute_order_source(order, source)
+    ! ##########################################################################
+    ! Compute the angular source of a higher expansion order
+    ! The source only depends on the zeroth order moments, so it is fixed while
+    ! the order is solved and the mg containers are left untouched
+    ! ##########################################################################
+
+    ! Use Statements
+    use state, only : mg_mMap, mg_nu_sig_f, keff, scaling
+    use control, only : number_cells, number_angles, allow_fission, solver_type, &
+                        scatter_leg_order, spatial_dimension, sparse_scatter
+    use dgm, only : phi_m, psi_m, delta_m, source_m, chi_m, sig_s_m
+    use angle, only : p_leg
+
+    ! Variable definitions
+    integer, intent(in) :: &
+      order           ! Expansion order
+    real(kind=dp), intent(out), dimension(:,:,:) :: &
+      source          ! Angular source (group, angle, cell)
+    integer :: &
+      c,            & ! Cell index
+      mat,          & ! Material index
+      a,            & ! Angle index
+      l,            & ! Legendre index
+      m,            & ! Moment index
+      ll              ! Total moment index
+    real(kind=dp), dimension(size(source, 1)) :: &
+      cell_source,  & ! Isotropic source in the cell
+      scatter         ! Scattering source of one moment
+    real(kind=dp) :: &
+      factor          ! Normalization of the scattering moment
+
+    do c = 1, number_cells
+      mat = mg_mMap(c)
+
+      ! Add the external and fission sources
+      cell_source(:) = source_m(:, order)
+      if (allow_fission .or. solver_type == 'eigen') then
+        cell_source(:) = cell_source(:) + scaling * chi_m(:, mat, order) &
+                       * sum(mg_nu_sig_f(:, mat) * phi_m(0, 0, :, c)) / keff
       end if
+      do a = 1, number_angles
+        source(:, a, c) = cell_source(:)
+      end do  ! End a loop
+
+      ! Add the scattering source from the zeroth order moments
+      ll = 0
+      do l = 0, scatter_leg_order
+        factor = (2.0_8 * l + 1.0_8) * scaling
+        do m = 1, merge(1, 2 * l + 1, spatial_dimension == 1)
+          if (sparse_scatter) then
+            call apply_scatter_blocks(l, mat, order, phi_m(0, ll, :, c), scatter)
+            scatter(:) = scatter(:) * factor
+          else
+            scatter(:) = matmul(phi_m(0, ll, :, c), sig_s_m(l, :, :, mat, order)) * factor
+          end if
+          do a = 1, number_angles
+            source(:, a, c) = source(:, a, c) + scatter(:) * p_leg(ll, a)
+          end do  ! End a loop
+          ll = ll + 1
+        end do  ! End m loop
+      end do  ! End l loop
+
+      ! Remove the angular total cross section moment
+      do a = 1, number_angles
+        source(:, a, c) = source(:, a, c) - delta_m(:, a, mat, order) * psi_m(0, :, a, c)
+      end do  ! End a loop
     end do  ! End c loop
 
-  end subroutine compute_source
+  end subroutine compute_order_source
+
+  subroutine apply_scatter_blocks(l, region, order, flux, scatter)
+    ! ##########################################################################
+    ! Apply the stored coarse group blocks of the scattering moments of a
+    ! region to a flux moment
+    ! ##########################################################################
+
+    ! Use Statements
+    use dgm, only : sig_s_m_blocks, region_block_offset, region_block_cgp, region_block_cg
+
+    ! Variable definitions
+    integer, intent(in) :: &
+      l,        & ! Legendre index
+      region,   & ! Region index
+      order       ! Expansion order
+    real(kind=dp), intent(in), dimension(:) :: &
+      flux        ! Flux moment for each coarse group
+    real(kind=dp), intent(out), dimension(:) :: &
+      scatter     ! Scattering source into each coarse group
+    integer :: &
+      k           ! Block index
+
+    scatter(:) = 0.0_8
+    do k = region_block_offset(region), region_block_offset(region + 1) - 1
+      scatter(region_block_cg(k)) = scatter(region_block_cg(k)) &
+                                  + sig_s_m_blocks(l, k, order) * flux(region_block_cgp(k))
+    end do  ! End k loop
+
+  end subroutine apply_scatter_blocks
 
 end module sources
@@ -10,8 +10,11 @@ module state
   real(kind=dp), allocatable, dimension(:,:,:,:) :: &
       mg_incident_x,       & ! Angular flux incident on the current cell in x direction
       mg_incident_y,       & ! Angular flux incident on the current cell in y direction
-      mg_sig_s               ! Scattering cross section moments
+      mg_sig_s,            & ! Scattering cross section moments
+      mg_sig_s_t             ! Transposed scattering kernel (g, gp, l, region)
   real(kind=dp), allocatable, dimension(:,:,:) :: &
+      mg_current_x,        & ! Net current through the x faces (tallied for CMFD)
+      mg_current_y,        & ! Net current through the y faces (tallied for CMFD)
       psi,                 & ! Angular flux
       phi,                 & ! Scalar Flux
       mg_phi,              & ! Scalar flux mg container
@@ -25,13 +28,18 @@ module state
   real(kind=dp), allocatable, dimension(:) :: &
       mg_density             ! Fission density
   integer, allocatable, dimension(:) :: &
-      mg_mMap                ! material map mg container
+      mg_mMap,             & ! material map mg container
+      region_offset,       & ! Start of each region in region_cells
+      region_cells           ! Cell indices sorted by region
   real(kind=dp) :: &
       mg_constant_source,  & ! Constant multigroup source
       keff,                & ! k-eigenvalue
       norm_frac,           & ! Fraction of normalization for eigenvalue problems
       scaling,             & ! Scaling factor for source terms
-      recon_convergence_rate ! Approximate rate of convergence for recon iters
+      recon_convergence_rate, & ! Approximate rate of convergence for recon iters
+      group_block_speedup,   & ! Measured speedup of the concurrent group block sweeps
+      eigen_spectral_radius, & ! Average reduction of the eigen error per iteration
+      fission_shift            ! Inverse of the Wielandt eigenvalue (zero without a shift)
   integer :: &
       exit_status,         & ! Allows setting exit signals
       sweep_count,         & ! Counter for the number of transport sweeps
@@ -54,7 +62,7 @@ module state
                         verify_control, homogenization_map, number_regions, &
                         scatter_leg_order, delta_leg_order, truncate_delta, &
                         number_cells_x, number_cells_y, spatial_dimension, number_moments, &
-                        store_phi_order
+                        store_phi_order, use_cmfd, equation_type
     use mesh, only : create_mesh
     use material, only : create_material, number_materials
     use angle, only : initialize_angle, initialize_polynomials, PI
@@ -142,11 +150,15 @@ module state
     ! Set the sweep counter to zero
     sweep_count = 0
 
+    ! Start without a Wielandt shift
+    fission_shift = 0.0_8
+    eigen_spectral_radius = 0.0_8
+
     ! Allocate the scalar flux and source containers
     allocate(phi(0:number_moments, number_fine_groups, number_cells))
     ! Initialize phi
     ! Attempt to read file or use default if file does not exist
-    open(unit = 10, status='old', file=initial_phi, form='unformatted', iostat=ios)
+    call read_flux(initial_phi, phi, ios)
     if (ios > 0) then
       if (.not. ignore_warnings) then
         print *, "initial phi file, ", initial_phi, " is missing, using default value"
@@ -156,10 +168,7 @@ module state
       else if (solver_type == 'eigen') then
         phi = 1.0_8
       end if
-    else
-      read(10) phi ! read the data in array x to the file
     end if
-    close(10) ! close the file
 
     ! Only allocate psi if the option is to store psi
     if (store_psi) then
@@ -167,7 +176,7 @@ module state
 
       ! Initialize psi
       ! Attempt to read file or use default if file does not exist
-      open(unit = 10, status='old', file=initial_psi, form='unformatted', iostat=ios)
+      call read_flux(initial_psi, psi, ios)
       if (ios > 0) then
         if (.not. ignore_warnings) then
           print *, "initial psi file, ", initial_psi, " is missing, using default value"
@@ -184,10 +193,7 @@ module state
             end do  ! End a loop
           end do  ! End c loop
         end if
-      else
-        read(10) psi ! read the data in array x to the file
       end if
-      close(10) ! close the file
     end if
 
     ! Initialize the angular flux incident on the boundary
@@ -235,6 +241,23 @@ module state
       allocate(mg_psi(number_groups, number_angles, number_cells))
     end if
 
+    ! The sweeps only tally the face currents if these are allocated
+    ! The 2D step closures do not conserve balance with their face fluxes
+    if (use_cmfd .and. spatial_dimension == 2 .and. equation_type /= 'DD') then
+      if (.not. ignore_warnings) then
+        print *, "CMFD requires the DD equation in 2D, continuing without acceleration"
+      end if
+    else if (use_cmfd .and. use_DGM) then
+      if (.not. ignore_warnings) then
+        print *, "CMFD is not available with DGM, continuing without acceleration"
+      end if
+    else if (use_cmfd) then
+      allocate(mg_current_x(number_groups, number_cells_x + 1, number_cells_y))
+      allocate(mg_current_y(number_groups, number_cells_x, number_cells_y + 1))
+      mg_current_x(:, :, :) = 0.0_8
+      mg_current_y(:, :, :) = 0.0_8
+    end if
+
   end subroutine initialize_state
   
   subroutine finalize_state()
@@ -297,39 +320,323 @@ module state
     if (allocated(sigphi)) then
       deallocate(sigphi)
     end if
+    if (allocated(mg_sig_s_t)) then
+      deallocate(mg_sig_s_t)
+    end if
+    if (allocated(region_offset)) then
+      deallocate(region_offset)
+    end if
+    if (allocated(region_cells)) then
+      deallocate(region_cells)
+    end if
+    if (allocated(mg_current_x)) then
+      deallocate(mg_current_x)
+    end if
+    if (allocated(mg_current_y)) then
+      deallocate(mg_current_y)
+    end if
   end subroutine finalize_state
 
   subroutine output_state()
     ! ##########################################################################
-    ! Save the scalar and angular flux objects to unformatted fortran file
+    ! Save the scalar and angular flux objects to self-describing binary files
     ! ##########################################################################
 
     ! Use Statements
     use control, only : file_name, store_psi
 
+    call write_flux(trim(file_name) // "_phi.bin", 'phi', phi)
+
+    if (store_psi) then
+      call write_flux(trim(file_name) // "_psi.bin", 'psi', psi)
+    end if
+
+  end subroutine output_state
+
+  subroutine write_flux(fname, name, flux)
+    ! ##########################################################################
+    ! Write a flux array to a self-describing binary file
+    !
+    ! The 64 byte header holds the characters DGMFLUX, the 8 character name of
+    ! the array and the 4 byte integers version, rank, the three extents of
+    ! the array, number of groups, number of angles, highest Legendre moment,
+    ! number of cells, spatial dimension and two reserved entries.  The values
+    ! follow as double precision in column major order, written one cell at a
+    ! time, so the file can be memory mapped from the end of the header.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_fine_groups, number_angles, number_moments, number_cells, &
+                        spatial_dimension
+
     ! Variable definitions
-    character(:), allocatable :: &
-        fname  ! Base file name
+    character(len=*), intent(in) :: &
+        fname,  & ! Name of the file
+        name      ! Name of the array
+    real(kind=dp), intent(in), dimension(:,:,:) :: &
+        flux      ! Flux to save (the last index is the cell)
+    character(len=8) :: &
+        label     ! Name of the array padded to the header width
+    integer :: &
+        c         ! Cell index
 
-    fname = trim(file_name) // "_phi.bin"
+    label = name
 
     ! create a new file, or overwrite an existing one
-    open(unit = 10, status='replace', file=fname, form='unformatted')
-    write(10) phi ! write the data in array x to the file
-    close(10) ! close the file
+    open(unit=10, status='replace', file=fname, access='stream', form='unformatted')
+    write(10) 'DGMFLUX ', label, 1_4, 3_4, int(shape(flux), 4), int(number_fine_groups, 4), &
+              int(number_angles, 4), int(number_moments, 4), int(number_cells, 4), &
+              int(spatial_dimension, 4), 0_4, 0_4
+    do c = 1, size(flux, 3)
+      write(10) flux(:, :, c)
+    end do  ! End c loop
+    close(10)
+
+  end subroutine write_flux
+
+  subroutine read_flux(fname, flux, ios)
+    ! ##########################################################################
+    ! Read a flux array saved by write_flux or as one unformatted record
+    !
+    ! ios is positive if the file could not be opened
+    ! ##########################################################################
 
-    if (store_psi) then
-      fname = trim(file_name) // "_psi.bin"
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        fname      ! Name of the file
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        flux       ! Flux read from the file
+    integer, intent(out) :: &
+        ios        ! I/O status of opening the file
+    character(len=8) :: &
+        magic,   & ! First characters of the file
+        label      ! Name of the array in the file
+    integer(kind=4), dimension(12) :: &
+        header     ! Version, rank, extents and sizes of the saved array
+    integer :: &
+        status     ! I/O status of reading the header
 
-      ! create a new file, or overwrite an existing one
-      open(unit = 10, status='replace', file=fname, form='unformatted')
-      write(10) psi ! write the data in array x to the file
-      close(10) ! close the file
+    open(unit=10, status='old', file=fname, access='stream', form='unformatted', iostat=ios)
+    if (ios /= 0) then
+      return
+    end if
+    magic = ''
+    read(10, iostat=status) magic
+
+    if (magic == 'DGMFLUX ') then
+      read(10) label, header
+      if (header(2) /= 3 .or. any(header(3:5) /= shape(flux))) then
+        print *, "INPUT ERROR : The ", trim(label), " in ", trim(fname), " has shape ", header(3:5), &
+                 " instead of ", shape(flux)
+        stop
+      end if
+      read(10) flux
+      close(10)
+    else
+      ! Files written before the header was added hold a single record
+      close(10)
+      open(unit=10, status='old', file=fname, form='unformatted')
+      read(10) flux
+      close(10)
     end if
 
-    deallocate(fname)
+  end subroutine read_flux
 
-  end subroutine output_state
+  subroutine write_checkpoint(label, iteration)
+    ! ##########################################################################
+    ! Save the iterate of the eigen or recon loop so that the solve can resume
+    !
+    ! The file starts with the characters DGMCHECK, the 8 character loop
+    ! label, the 4 byte integers version, completed iterations, eigen_count
+    ! and a reserved entry, and keff.  A record for each array (8 character
+    ! name, 8 byte length and values) follows and the file ends with the same
+    ! characters.  It is written under a temporary name and renamed when
+    ! complete, so a job stopped while writing keeps the previous checkpoint.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : checkpoint_name
+    use iso_c_binding, only : c_char, c_int, c_null_char
+
+    ! Interface to the C library rename, which replaces the target in one step
+    interface
+      integer(c_int) function c_rename(old_name, new_name) bind(c, name='rename')
+        import :: c_char, c_int
+        character(kind=c_char), dimension(*), intent(in) :: old_name, new_name
+      end function c_rename
+    end interface
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        label      ! Loop to save [eigen, recon]
+    integer, intent(in) :: &
+        iteration  ! Number of completed iterations of the loop
+    character(len=8) :: &
+        tag        ! Loop label padded to the header width
+    integer(kind=8) :: &
+        position   ! Unused position in the file
+    logical :: &
+        valid      ! Unused status of the transfer
+    integer :: &
+        ios        ! Status of the rename
+
+    tag = label
+
+    open(unit=10, status='replace', file=trim(checkpoint_name) // '.tmp', access='stream', &
+         form='unformatted')
+    write(10) 'DGMCHECK', tag, 1_4, int(iteration, 4), int(eigen_count, 4), 0_4, keff
+    call transfer_checkpoint(label, 'write', position, valid)
+    write(10) 'DGMCHECK'
+    close(10)
+
+    ios = c_rename(trim(checkpoint_name) // '.tmp' // c_null_char, trim(checkpoint_name) // c_null_char)
+    if (ios /= 0) then
+      print *, "unable to replace the checkpoint file ", trim(checkpoint_name)
+    end if
+
+  end subroutine write_checkpoint
+
+  subroutine read_checkpoint(label, iteration)
+    ! ##########################################################################
+    ! Resume the eigen or recon loop from the checkpoint in restart_name
+    !
+    ! On exit iteration is the first iteration left to do.  It is unchanged
+    ! if the file is missing, was written for the other loop or for another
+    ! problem size, or was cut short, so the loop starts from the beginning.
+    ! restart_name is cleared after a resume so later solves start afresh.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : restart_name, ignore_warnings
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        label        ! Loop to resume [eigen, recon]
+    integer, intent(inout) :: &
+        iteration    ! First iteration of the loop
+    character(len=8) :: &
+        magic,     & ! First characters of the file
+        tag,       & ! Loop label in the file
+        last         ! Last characters of the file
+    integer(kind=4), dimension(4) :: &
+        header       ! Version, completed iterations, eigen_count and a reserved entry
+    integer(kind=8) :: &
+        position,  & ! Position of the next record
+        file_size    ! Size of the file in bytes
+    integer :: &
+        ios          ! I/O status
+    logical :: &
+        valid        ! Flag for a checkpoint matching this problem
+
+    open(unit=10, status='old', file=restart_name, access='stream', form='unformatted', &
+         action='read', iostat=ios)
+    if (ios /= 0) then
+      if (.not. ignore_warnings) then
+        print *, "restart file, ", trim(restart_name), " is missing, starting from the first iteration"
+      end if
+      return
+    end if
+    inquire(unit=10, size=file_size)
+
+    ! Check the layout of the whole file before changing the state
+    magic = ''
+    read(10, iostat=ios) magic, tag, header
+    valid = ios == 0 .and. magic == 'DGMCHECK' .and. tag == label .and. header(1) == 1
+    position = 41
+    call transfer_checkpoint(label, 'check', position, valid)
+    if (valid) then
+      read(10, pos=position, iostat=ios) last
+      valid = ios == 0 .and. last == 'DGMCHECK' .and. position + 7 == file_size
+    end if
+
+    if (valid) then
+      read(10, pos=33) keff
+      call transfer_checkpoint(label, 'read', position, valid)
+      iteration = header(2) + 1
+      eigen_count = header(3)
+      restart_name = ''
+    else if (.not. ignore_warnings) then
+      print *, "restart file, ", trim(restart_name), " does not match the problem, starting from the first iteration"
+    end if
+    close(10)
+
+  end subroutine read_checkpoint
+
+  subroutine transfer_checkpoint(label, mode, position, valid)
+    ! ##########################################################################
+    ! Write, check or read the arrays saved for the eigen or recon loop
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : store_psi
+    use dgm, only : phi_m, psi_m
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        label,     & ! Loop of the checkpoint [eigen, recon]
+        mode         ! Transfer to do [write, check, read]
+    integer(kind=8), intent(inout) :: &
+        position     ! Position of the next record when checking
+    logical, intent(inout) :: &
+        valid        ! Flag cleared when a record does not match its array
+
+    if (label == 'recon') then
+      call transfer_checkpoint_array('phi_m', phi_m, size(phi_m, kind=8), mode, position, valid)
+      call transfer_checkpoint_array('psi_m', psi_m, size(psi_m, kind=8), mode, position, valid)
+    else
+      call transfer_checkpoint_array('mg_phi', mg_phi, size(mg_phi, kind=8), mode, position, valid)
+      if (store_psi) then
+        call transfer_checkpoint_array('mg_psi', mg_psi, size(mg_psi, kind=8), mode, position, valid)
+      end if
+      call transfer_checkpoint_array('incidx', mg_incident_x, size(mg_incident_x, kind=8), mode, &
+                                     position, valid)
+      call transfer_checkpoint_array('incidy', mg_incident_y, size(mg_incident_y, kind=8), mode, &
+                                     position, valid)
+    end if
+
+  end subroutine transfer_checkpoint
+
+  subroutine transfer_checkpoint_array(name, values, n, mode, position, valid)
+    ! ##########################################################################
+    ! Write, check or read the record of one array in the checkpoint file
+    ! ##########################################################################
+
+    ! Variable definitions
+    character(len=*), intent(in) :: &
+        name,      & ! Name of the array
+        mode         ! Transfer to do [write, check, read]
+    integer(kind=8), intent(in) :: &
+        n            ! Number of values in the array
+    real(kind=dp), intent(inout), dimension(n) :: &
+        values       ! Values of the array
+    integer(kind=8), intent(inout) :: &
+        position     ! Position of the next record when checking
+    logical, intent(inout) :: &
+        valid        ! Flag cleared when the record does not match the array
+    character(len=8) :: &
+        tag,       & ! Name of the array padded to the record width
+        saved_tag    ! Name of the array in the file
+    integer(kind=8) :: &
+        saved_n      ! Number of values in the file
+    integer :: &
+        ios          ! I/O status
+
+    tag = name
+
+    select case (mode)
+    case ('write')
+      write(10) tag, n, values
+    case ('check')
+      if (valid) then
+        read(10, pos=position, iostat=ios) saved_tag, saved_n
+        valid = ios == 0 .and. saved_tag == tag .and. saved_n == n
+        position = position + 16 + 8 * n
+      end if
+    case ('read')
+      read(10) saved_tag, saved_n, values
+    end select
+
+  end subroutine transfer_checkpoint_array
 
   subroutine normalize_flux(phi, psi)
     ! ##########################################################################
@@ -411,6 +718,85 @@ module state
 
   end subroutine update_fission_density
 
+  subroutine update_scatter_kernel()
+    ! ##########################################################################
+    ! Cache the transposed scattering matrix and the cells of each region
+    ! mg_solve calls this before each solve, so changes to mg_sig_s or mg_mMap
+    ! between solves are always picked up
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells, number_regions, number_groups, scatter_leg_order
+
+    ! Variable definitions
+    integer :: &
+      c,   & ! Cell index
+      r,   & ! Region index
+      l      ! Legendre index
+    integer, dimension(number_regions) :: &
+      fill   ! Next free position for each region
+
+    ! Drop the cache if the problem size changed since the last call
+    if (allocated(mg_sig_s_t) .and. .not. scatter_kernel_sized()) then
+      deallocate(mg_sig_s_t, region_offset, region_cells)
+    end if
+
+    if (.not. allocated(mg_sig_s_t)) then
+      allocate(mg_sig_s_t(number_groups, number_groups, 0:scatter_leg_order, number_regions))
+      allocate(region_offset(number_regions + 1))
+      allocate(region_cells(number_cells))
+    end if
+
+    ! Transpose the scattering matrix so the product is over the inner index
+    do r = 1, number_regions
+      do l = 0, scatter_leg_order
+        mg_sig_s_t(:, :, l, r) = transpose(mg_sig_s(l, :, :, r))
+      end do  ! End l loop
+    end do  ! End r loop
+
+    ! Sort the cells by region
+    region_offset(:) = 0
+    do c = 1, number_cells
+      region_offset(mg_mMap(c) + 1) = region_offset(mg_mMap(c) + 1) + 1
+    end do  ! End c loop
+    region_offset(1) = 1
+    do r = 1, number_regions
+      region_offset(r + 1) = region_offset(r + 1) + region_offset(r)
+    end do  ! End r loop
+    fill(:) = region_offset(:number_regions)
+    do c = 1, number_cells
+      region_cells(fill(mg_mMap(c))) = c
+      fill(mg_mMap(c)) = fill(mg_mMap(c)) + 1
+    end do  ! End c loop
+
+  end subroutine update_scatter_kernel
+
+  function scatter_kernel_sized() result(sized)
+    ! ##########################################################################
+    ! Check if the cached scattering kernel matches the current problem size
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_cells, number_regions, number_groups, scatter_leg_order
+
+    ! Variable definitions
+    logical :: &
+      sized  ! Flag if the cached arrays can be indexed with the current sizes
+
+    sized = .false.
+
+    if (.not. allocated(mg_sig_s_t)) then
+      return
+    else if (any(shape(mg_sig_s_t) /= [number_groups, number_groups, scatter_leg_order + 1, number_regions])) then
+      return
+    else if (size(region_offset) /= number_regions + 1 .or. size(region_cells) /= number_cells) then
+      return
+    end if
+
+    sized = .true.
+
+  end function scatter_kernel_sized
+
   subroutine output_moments()
     ! ##########################################################################
     ! Print the output of the cross sections to the standard output
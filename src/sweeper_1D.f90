@@ -4,6 +4,23 @@ module sweeper_1D
 
   implicit none
 
+  integer :: &
+      closure_type                 ! Closure of the cached tables [DD=1, SC=2, SD=3]
+  integer, allocatable, dimension(:) :: &
+      closure_index,             & ! Table entry used by each cell
+      closure_mMap                 ! Material map used to build the tables
+  real(kind=dp), allocatable, dimension(:,:,:,:) :: &
+      closure_coef                 ! Closure coefficients (group, coefficient, angle, entry)
+  real(kind=dp), allocatable, dimension(:,:) :: &
+      closure_sig_t                ! Total cross section used to build the tables
+  real(kind=dp), allocatable, dimension(:) :: &
+      closure_dx,                & ! Cell widths used to build the tables
+      closure_mu                   ! Angles used to build the tables
+  character(len=2) :: &
+      closure_equation             ! Equation type used to build the tables
+  logical :: &
+      closure_cached=.false.       ! Flag if the closure coefficients fit in the cache
+
   contains
   
   subroutine apply_transport_operator_1D(phi)
@@ -11,29 +28,60 @@ module sweeper_1D
     ! Sweep over each cell, angle, and octant
     ! ##########################################################################
 
+    ! Use Statements
+    use control, only : number_groups
+    use state, only : sweep_count
+    use sources, only : compute_source
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        phi           ! Scalar flux for current iteration and group g
+
+    ! Increment the sweep counter
+    sweep_count = sweep_count + 1
+
+    ! Update the forcing function
+    call compute_source()
+
+    ! Make sure the closure tables match the current cross sections
+    call update_closure_tables_1D()
+
+    ! Sweep all of the groups together
+    call sweep_groups_1D(phi, 1, number_groups)
+
+  end subroutine apply_transport_operator_1D
+
+  subroutine sweep_groups_1D(phi, gmin, gmax)
+    ! ##########################################################################
+    ! Sweep over each cell, angle, and octant for the groups gmin to gmax
+    ! The sources and closure tables must already be computed for the current iterate
+    ! ##########################################################################
+
     ! Use Statements
     use angle, only : p_leg, wt, mu
     use mesh, only : dx
     use control, only : store_psi, number_angles_per_octant, number_cells, scatter_leg_order, &
-                        number_legendre, number_groups, use_DGM, boundary_east, number_angles, &
-                        boundary_west
-    use state, only : mg_sig_t, sweep_count, mg_mMap, mg_incident_x, mg_psi, &
-                      mg_source, sigphi
-    use sources, only : compute_source
-    use omp_lib, only : omp_get_wtime
+                        number_legendre, use_DGM, boundary_east, number_angles, &
+                        boundary_west, parallel_sweep
+    use state, only : mg_sig_t, mg_mMap, mg_incident_x, mg_psi, mg_source, sigphi, mg_current_x
     use dgm, only : delta_m, psi_m, dgm_order
 
     ! Variable definitions
     real(kind=dp), intent(inout), dimension(:,:,:) :: &
         phi           ! Scalar flux for current iteration and group g
-    real(kind=dp), dimension(0:number_legendre, number_groups, number_cells) :: &
+    integer, intent(in) :: &
+        gmin,       & ! Lower group to sweep
+        gmax          ! Upper group to sweep
+    real(kind=dp), dimension(0:number_legendre, gmin:gmax, number_cells) :: &
         phi_update    ! Container to hold the updated scalar flux
+    real(kind=dp), allocatable, dimension(:,:,:) :: &
+        psi_octant, & ! Angular flux for each angle within the current octant
+        edge_octant   ! Outgoing edge angular flux for each angle within the current octant
     integer :: &
         g,          & ! Group index
         o,          & ! Octant index
         oo,         & ! Octant order index
         c,          & ! Cell index
-        mat,        & ! Material index
         a,          & ! Angle index
         an,         & ! Global angle index
         cmin,       & ! Lower cell number
@@ -41,25 +89,31 @@ module sweeper_1D
         cstep,      & ! Cell stepping direction
         amin,       & ! Lower angle number
         amax,       & ! Upper angle number
-        astep         ! Angle stepping direction
+        astep,      & ! Angle stepping direction
+        face          ! Outgoing face index
     real(kind=dp), dimension(0:number_legendre) :: &
         M           ! Legendre polynomial integration vector
-    real(kind=dp), dimension(number_groups) :: &
+    real(kind=dp), dimension(gmin:gmax) :: &
         psi_center, & ! Angular flux at cell center
         source        ! Fission, In-Scattering, External source in group g
     integer, dimension(2) :: &
         octant_map    ! Map of the octant order
     logical :: &
-        octant        ! Positive/Negative octant flag
-
-    ! Increment the sweep counter
-    sweep_count = sweep_count + 1
+        octant,     & ! Positive/Negative octant flag
+        tally         ! Tally the net current through each face
 
     ! Reset phi
     phi_update = 0.0_8
 
-    ! Update the forcing function
-    call compute_source()
+    tally = allocated(mg_current_x)
+    if (tally) then
+      mg_current_x(gmin:gmax, :, :) = 0.0_8
+    end if
+
+    if (parallel_sweep) then
+      allocate(psi_octant(gmin:gmax, number_angles_per_octant, number_cells))
+      allocate(edge_octant(gmin:gmax, number_angles_per_octant, number_cells))
+    end if
 
     ! Change octant order if right boundary is vacuum
     if (boundary_east == 0.0 .and. boundary_west /= 0.0) then
@@ -81,47 +135,269 @@ module sweeper_1D
 
       ! set boundary conditions
       if (o == 1) then
-        mg_incident_x = boundary_west * mg_incident_x  ! Set albedo conditions
+        mg_incident_x(gmin:gmax,:,:,:) = boundary_west * mg_incident_x(gmin:gmax,:,:,:)  ! Set albedo conditions
       else
-        mg_incident_x = boundary_east * mg_incident_x  ! Set albedo conditions
+        mg_incident_x(gmin:gmax,:,:,:) = boundary_east * mg_incident_x(gmin:gmax,:,:,:)  ! Set albedo conditions
       end if
 
-      do c = cmin, cmax, cstep  ! Sweep over cells
-        mat = mg_mMap(c)
+      ! Tally the current entering through the boundary
+      if (tally) then
+        face = merge(1, number_cells + 1, octant)
+        do a = 1, number_angles_per_octant
+          mg_current_x(gmin:gmax, face, 1) = mg_current_x(gmin:gmax, face, 1) &
+                                           + merge(1.0_8, -1.0_8, octant) * wt(a) * mu(a) &
+                                           * mg_incident_x(gmin:gmax, a, 1, 1)
+        end do  ! End a loop
+      end if
 
-        do a = amin, amax, astep  ! Sweep over angle
-          ! Get the correct angle index
-          an = merge(a, number_angles - a + 1, octant)
+      if (parallel_sweep) then
+        ! Sweep the angles and groups of the octant concurrently
+        call sweep_octant_1D(octant, gmin, gmax, psi_octant, edge_octant)
 
-          ! legendre polynomial integration vector
-          M = wt(a) * p_leg(:, an)
+        ! Accumulate the moments in the same order as the serial sweep
+        !$omp parallel do default(shared) private(c, a, an, M, g) schedule(static)
+        do c = cmin, cmax, cstep
+          do a = amin, amax, astep
+            an = merge(a, number_angles - a + 1, octant)
+            M = wt(a) * p_leg(:, an)
+            if (store_psi) then
+              mg_psi(gmin:gmax, an, c) = psi_octant(:, a, c)
+            end if
+            do g = gmin, gmax
+              phi_update(:, g, c) = phi_update(:, g, c) + M(:) * psi_octant(g, a, c)
+            end do  ! End g loop
+          end do  ! End a loop
+        end do  ! End c loop
+        !$omp end parallel do
 
-          ! Get the source in this cell, group, and angle
-          source(:) = mg_source(:, c)
-          source(:) = source(:) + matmul(transpose(sigphi(:scatter_leg_order,:,c)), p_leg(:scatter_leg_order,an))
-          if (use_DGM) then
-            source(:) = source(:) - delta_m(:, an, mg_mMap(c), dgm_order) * psi_m(0, :, an, c)
-          end if
+        if (tally) then
+          do c = cmin, cmax, cstep
+            face = merge(c + 1, c, octant)
+            do a = amin, amax, astep
+              mg_current_x(gmin:gmax, face, 1) = mg_current_x(gmin:gmax, face, 1) &
+                                               + merge(1.0_8, -1.0_8, octant) * wt(a) * mu(a) &
+                                               * edge_octant(:, a, c)
+            end do  ! End a loop
+          end do  ! End c loop
+        end if
+      else
+        do c = cmin, cmax, cstep  ! Sweep over cells
+          do a = amin, amax, astep  ! Sweep over angle
+            ! Get the correct angle index
+            an = merge(a, number_angles - a + 1, octant)
 
-          call computeEQ(source(:), mg_sig_t(:, mat), dx(c), mu(a), mg_incident_x(:, a, 1, 1), psi_center)
+            ! legendre polynomial integration vector
+            M = wt(a) * p_leg(:, an)
 
-          if (store_psi) then
-            mg_psi(:, an, c) = psi_center(:)
-          end if
+            ! Get the source in this cell, group, and angle
+            source(:) = mg_source(gmin:gmax, c)
+            source(:) = source(:) + matmul(transpose(sigphi(:scatter_leg_order,gmin:gmax,c)), &
+                                           p_leg(:scatter_leg_order,an))
+            if (use_DGM) then
+              source(:) = source(:) - delta_m(gmin:gmax, an, mg_mMap(c), dgm_order) * psi_m(0, gmin:gmax, an, c)
+            end if
+
+            if (closure_cached) then
+              call apply_closure_1D(source(:), closure_coef(gmin:gmax, :, a, closure_index(c)), &
+                                    mg_incident_x(gmin:gmax, a, 1, 1), psi_center)
+            else
+              call computeEQ(source(:), mg_sig_t(gmin:gmax, mg_mMap(c)), dx(c), mu(a), &
+                             mg_incident_x(gmin:gmax, a, 1, 1), psi_center)
+            end if
+
+            if (store_psi) then
+              mg_psi(gmin:gmax, an, c) = psi_center(:)
+            end if
+
+            ! Tally the current leaving through the outgoing face
+            if (tally) then
+              face = merge(c + 1, c, octant)
+              mg_current_x(gmin:gmax, face, 1) = mg_current_x(gmin:gmax, face, 1) &
+                                               + merge(1.0_8, -1.0_8, octant) * wt(a) * mu(a) &
+                                               * mg_incident_x(gmin:gmax, a, 1, 1)
+            end if
+
+            ! Loop over the energy groups
+            do g = gmin, gmax
+
+              ! Increment the legendre expansions of the scalar flux
+              phi_update(:, g, c) = phi_update(:, g, c) + M(:) * psi_center(g)
+            end do  ! End g loop
+          end do  ! End a loop
+        end do  ! End c loop
+      end if
+    end do  ! End o loop
+
+    phi(:, gmin:gmax, :) = phi_update
 
-          ! Loop over the energy groups
-          do g = 1, number_groups
+    if (allocated(psi_octant)) then
+      deallocate(psi_octant)
+    end if
+    if (allocated(edge_octant)) then
+      deallocate(edge_octant)
+    end if
+
+  end subroutine sweep_groups_1D
+
+  subroutine sweep_source_1D(source, incident, phi, psi)
+    ! ##########################################################################
+    ! Sweep all groups with a fixed angular source into the given containers
+    ! Nothing in state is modified, so several sources can be swept at once
+    ! provided the closure tables are current
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : p_leg, wt, mu
+    use mesh, only : dx
+    use control, only : number_angles_per_octant, number_cells, number_angles, &
+                        boundary_east, boundary_west
+    use state, only : mg_sig_t, mg_mMap
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:,:) :: &
+        source        ! Angular source (group, angle, cell)
+    real(kind=dp), intent(inout), dimension(:,:) :: &
+        incident      ! Angular flux incident on the current cell (group, angle)
+    real(kind=dp), intent(out), dimension(:,:,:) :: &
+        phi           ! Scalar flux moments (1 indexed)
+    real(kind=dp), intent(out), dimension(:,:,:) :: &
+        psi           ! Angular flux
+    integer :: &
+        g,          & ! Group index
+        o,          & ! Octant index
+        oo,         & ! Octant order index
+        c,          & ! Cell index
+        a,          & ! Angle index
+        an            ! Global angle index
+    real(kind=dp), dimension(size(source, 1)) :: &
+        psi_center    ! Angular flux at cell center
+    integer, dimension(2) :: &
+        octant_map    ! Map of the octant order
+    logical :: &
+        octant        ! Positive/Negative octant flag
+
+    phi = 0.0_8
+
+    ! Change octant order if right boundary is vacuum
+    if (boundary_east == 0.0 .and. boundary_west /= 0.0) then
+      octant_map = [2, 1]
+    else
+      octant_map = [1, 2]
+    end if
+
+    do oo = 1, 2  ! Sweep over octants
+      o = octant_map(oo)
+      octant = o == 1
+
+      ! set boundary conditions
+      incident(:,:) = merge(boundary_west, boundary_east, octant) * incident(:,:)
 
-            ! Increment the legendre expansions of the scalar flux
-            phi_update(:, g, c) = phi_update(:, g, c) + M(:) * psi_center(g)
+      do c = merge(1, number_cells, octant), merge(number_cells, 1, octant), merge(1, -1, octant)
+        do a = merge(1, number_angles_per_octant, octant), merge(number_angles_per_octant, 1, octant), &
+               merge(1, -1, octant)
+          an = merge(a, number_angles - a + 1, octant)
+
+          if (closure_cached) then
+            call apply_closure_1D(source(:, an, c), closure_coef(:, :, a, closure_index(c)), &
+                                  incident(:, a), psi_center)
+          else
+            call computeEQ(source(:, an, c), mg_sig_t(:, mg_mMap(c)), dx(c), mu(a), &
+                           incident(:, a), psi_center)
+          end if
+
+          psi(:, an, c) = psi_center(:)
+          do g = 1, size(source, 1)
+            phi(:, g, c) = phi(:, g, c) + wt(a) * p_leg(:, an) * psi_center(g)
           end do  ! End g loop
         end do  ! End a loop
       end do  ! End c loop
-    end do  ! End o loop
+    end do  ! End oo loop
 
-    phi = phi_update
+  end subroutine sweep_source_1D
 
-  end subroutine apply_transport_operator_1D
+  subroutine sweep_octant_1D(octant, gmin, gmax, psi_octant, edge_octant)
+    ! ##########################################################################
+    ! Sweep all angles of one octant with the angles and blocks of groups
+    ! distributed across OpenMP threads
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : p_leg, mu
+    use mesh, only : dx
+    use control, only : number_angles_per_octant, number_cells, scatter_leg_order, &
+                        use_DGM, number_angles
+    use state, only : mg_sig_t, mg_mMap, mg_incident_x, mg_source, sigphi
+    use omp_lib, only : omp_get_max_threads
+    use dgm, only : delta_m, psi_m, dgm_order
+
+    ! Variable definitions
+    logical, intent(in) :: &
+        octant        ! Positive/Negative octant flag
+    integer, intent(in) :: &
+        gmin,       & ! Lower group to sweep
+        gmax          ! Upper group to sweep
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        psi_octant, & ! Angular flux for each angle within the octant (group gmin at index 1)
+        edge_octant   ! Outgoing edge angular flux for each angle within the octant
+    integer :: &
+        number_blocks,& ! Number of group blocks per angle
+        b,          & ! Group block index
+        g1,         & ! Lower group in the block
+        g2,         & ! Upper group in the block
+        c,          & ! Cell index
+        a,          & ! Angle index
+        an,         & ! Global angle index
+        cmin,       & ! Lower cell number
+        cmax,       & ! Upper cell number
+        cstep         ! Cell stepping direction
+    real(kind=dp), dimension(gmin:gmax) :: &
+        psi_center, & ! Angular flux at cell center
+        source        ! Fission, In-Scattering, External source in group g
+
+    cmin = merge(1, number_cells, octant)
+    cmax = merge(number_cells, 1, octant)
+    cstep = merge(1, -1, octant)
+
+    ! Split the groups if there are more threads than angles
+    number_blocks = (omp_get_max_threads() - 1) / number_angles_per_octant + 1
+    number_blocks = max(1, min(number_blocks, gmax - gmin + 1))
+
+    !$omp parallel do collapse(2) default(shared) schedule(static) &
+    !$omp private(a, b, an, g1, g2, c, source, psi_center)
+    do a = 1, number_angles_per_octant
+      do b = 1, number_blocks
+        ! Get the correct angle index
+        an = merge(a, number_angles - a + 1, octant)
+
+        ! Get the group bounds for this block
+        g1 = gmin + (b - 1) * (gmax - gmin + 1) / number_blocks
+        g2 = gmin + b * (gmax - gmin + 1) / number_blocks - 1
+
+        do c = cmin, cmax, cstep  ! Sweep over cells
+          ! Get the source in this cell, group, and angle
+          source(g1:g2) = mg_source(g1:g2, c)
+          source(g1:g2) = source(g1:g2) &
+                        + matmul(transpose(sigphi(:scatter_leg_order,g1:g2,c)), p_leg(:scatter_leg_order,an))
+          if (use_DGM) then
+            source(g1:g2) = source(g1:g2) - delta_m(g1:g2, an, mg_mMap(c), dgm_order) * psi_m(0, g1:g2, an, c)
+          end if
+
+          if (closure_cached) then
+            call apply_closure_1D(source(g1:g2), closure_coef(g1:g2, :, a, closure_index(c)), &
+                                  mg_incident_x(g1:g2, a, 1, 1), psi_center(g1:g2))
+          else
+            call computeEQ(source(g1:g2), mg_sig_t(g1:g2, mg_mMap(c)), dx(c), mu(a), &
+                           mg_incident_x(g1:g2, a, 1, 1), psi_center(g1:g2))
+          end if
+
+          psi_octant(g1-gmin+1:g2-gmin+1, a, c) = psi_center(g1:g2)
+          edge_octant(g1-gmin+1:g2-gmin+1, a, c) = mg_incident_x(g1:g2, a, 1, 1)
+        end do  ! End c loop
+      end do  ! End b loop
+    end do  ! End a loop
+    !$omp end parallel do
+
+  end subroutine sweep_octant_1D
   
   subroutine computeEQ(S, sig, dx, mua, incident, cellPsi)
     ! ##########################################################################
@@ -142,7 +418,7 @@ module sweeper_1D
         mua      ! Angle for the cell
     real(kind=dp), dimension(:), intent(inout) :: &
         cellPsi  ! Angular flux at cell center
-    real(kind=dp), allocatable, dimension(:) :: &
+    real(kind=dp), dimension(size(sig)) :: &
         tau,   & ! Parameter used in step characteristics
         A        ! Parameter used in step characteristics
     real(kind=dp) :: &
@@ -155,12 +431,10 @@ module sweeper_1D
       incident(:) = 2.0_8 * cellPsi(:) - incident(:)
     else if (equation_type == 'SC') then
       ! Step Characteristics relationship
-      allocate(tau(size(sig)), A(size(sig)))
       tau = sig(:) * dx / mua
       A = exp(-tau)
       cellPsi = incident * (1.0_8 - A) / tau + S * (sig * dx + mua * (A - 1.0_8)) / (sig ** 2.0_8 * dx)
       incident = A * incident + S * (1.0_8 - A) / sig
-      deallocate(tau, A)
     else if (equation_type == 'SD') then
       ! Step Difference relationship
       invmu = dx / (abs(mua))
@@ -172,5 +446,210 @@ module sweeper_1D
     end if
 
   end subroutine computeEQ
-  
+
+  subroutine apply_closure_1D(S, coef, incident, cellPsi)
+    ! ##########################################################################
+    ! Compute the closure relationship using the precomputed coefficients
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), dimension(:), intent(in) :: &
+        S        ! Source within the cell
+    real(kind=dp), dimension(:,:), intent(in) :: &
+        coef     ! Closure coefficients for the cell and angle
+    real(kind=dp), dimension(:), intent(inout) :: &
+        incident ! Angular flux incident on the cell
+    real(kind=dp), dimension(:), intent(inout) :: &
+        cellPsi  ! Angular flux at cell center
+
+    select case (closure_type)
+    case (1)
+      ! Diamond Difference relationship
+      cellPsi(:) = (incident(:) + coef(:, 1) * S(:)) * coef(:, 2)
+      incident(:) = 2.0_8 * cellPsi(:) - incident(:)
+    case (2)
+      ! Step Characteristics relationship
+      cellPsi(:) = incident(:) * coef(:, 2) + S(:) * coef(:, 3)
+      incident(:) = coef(:, 1) * incident(:) + S(:) * coef(:, 4)
+    case (3)
+      ! Step Difference relationship
+      cellPsi(:) = (incident(:) + coef(:, 1) * S(:)) * coef(:, 2)
+      incident(:) = cellPsi(:)
+    end select
+
+  end subroutine apply_closure_1D
+
+  subroutine update_closure_tables_1D()
+    ! ##########################################################################
+    ! Precompute the closure coefficients for each material/width and angle
+    ! The tables are only rebuilt if the cross sections, mesh, or closure change
+    ! If the tables exceed closure_cache_limit, the sweep uses computeEQ instead
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : mu
+    use mesh, only : dx
+    use control, only : equation_type, number_cells, number_groups, number_angles_per_octant, &
+                        closure_cache_limit
+    use state, only : mg_sig_t, mg_mMap
+
+    ! Variable definitions
+    integer :: &
+        c,              & ! Cell index
+        a,              & ! Angle index
+        e,              & ! Table entry index
+        mat,            & ! Material index
+        number_coef,    & ! Number of coefficients for the closure
+        number_entries    ! Number of unique material/width pairs
+    real(kind=dp), dimension(number_groups) :: &
+        sig,            & ! Total cross section of the entry
+        tau,            & ! Optical thickness
+        atten             ! Attenuation factor
+    real(kind=dp) :: &
+        invmu             ! Parameter used in diamond and step differences
+
+    if (closure_tables_current()) then
+      return
+    end if
+
+    select case (equation_type)
+    case ('DD')
+      closure_type = 1
+      number_coef = 2
+    case ('SC')
+      closure_type = 2
+      number_coef = 4
+    case ('SD')
+      closure_type = 3
+      number_coef = 2
+    case default
+      print *, 'ERROR : Equation not implemented'
+      stop
+    end select
+
+    call finalize_sweeper_1D()
+
+    ! Neighboring cells with the same material and width share an entry
+    allocate(closure_index(number_cells))
+    number_entries = 0
+    do c = 1, number_cells
+      if (c > 1) then
+        if (mg_mMap(c) == mg_mMap(c - 1) .and. dx(c) == dx(c - 1)) then
+          closure_index(c) = number_entries
+          cycle
+        end if
+      end if
+      number_entries = number_entries + 1
+      closure_index(c) = number_entries
+    end do  ! End c loop
+
+    ! Remember the inputs of the tables
+    closure_equation = equation_type
+    closure_sig_t = mg_sig_t
+    closure_mMap = mg_mMap
+    closure_dx = dx
+    closure_mu = mu
+
+    ! Fall back to computing the closure in the sweep if the tables are too large
+    closure_cached = 8.0_8 * number_groups * number_coef * number_angles_per_octant * number_entries &
+                     <= closure_cache_limit * 1024.0_8 ** 2
+    if (.not. closure_cached) then
+      return
+    end if
+
+    allocate(closure_coef(number_groups, number_coef, number_angles_per_octant, number_entries))
+
+    e = 0
+    do c = 1, number_cells
+      if (closure_index(c) == e) then
+        cycle
+      end if
+      e = closure_index(c)
+      mat = mg_mMap(c)
+      sig(:) = mg_sig_t(:, mat)
+
+      do a = 1, number_angles_per_octant
+        select case (closure_type)
+        case (1)
+          invmu = dx(c) / (2.0_8 * abs(mu(a)))
+          closure_coef(:, 1, a, e) = invmu
+          closure_coef(:, 2, a, e) = 1.0_8 / (1.0_8 + invmu * sig(:))
+        case (2)
+          tau(:) = sig(:) * dx(c) / mu(a)
+          atten(:) = exp(-tau(:))
+          closure_coef(:, 1, a, e) = atten(:)
+          closure_coef(:, 2, a, e) = (1.0_8 - atten(:)) / tau(:)
+          closure_coef(:, 3, a, e) = (sig(:) * dx(c) + mu(a) * (atten(:) - 1.0_8)) / (sig(:) ** 2.0_8 * dx(c))
+          closure_coef(:, 4, a, e) = (1.0_8 - atten(:)) / sig(:)
+        case (3)
+          invmu = dx(c) / (abs(mu(a)))
+          closure_coef(:, 1, a, e) = invmu
+          closure_coef(:, 2, a, e) = 1.0_8 / (1.0_8 + invmu * sig(:))
+        end select
+      end do  ! End a loop
+    end do  ! End c loop
+
+  end subroutine update_closure_tables_1D
+
+  function closure_tables_current() result(current)
+    ! ##########################################################################
+    ! Check if the closure tables were built from the current inputs
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : mu
+    use mesh, only : dx
+    use control, only : equation_type
+    use state, only : mg_sig_t, mg_mMap
+
+    ! Variable definitions
+    logical :: &
+        current  ! Flag if the tables can be reused
+
+    current = .false.
+
+    if (.not. allocated(closure_sig_t)) then
+      return
+    else if (closure_equation /= equation_type) then
+      return
+    else if (any(shape(closure_sig_t) /= shape(mg_sig_t)) .or. size(closure_mMap) /= size(mg_mMap) &
+             .or. size(closure_dx) /= size(dx) .or. size(closure_mu) /= size(mu)) then
+      return
+    else if (any(closure_sig_t /= mg_sig_t) .or. any(closure_mMap /= mg_mMap) &
+             .or. any(closure_dx /= dx) .or. any(closure_mu /= mu)) then
+      return
+    end if
+
+    current = .true.
+
+  end function closure_tables_current
+
+  subroutine finalize_sweeper_1D()
+    ! ##########################################################################
+    ! Deallocate the closure tables, which forces them to be rebuilt
+    ! ##########################################################################
+
+    closure_cached = .false.
+
+    if (allocated(closure_index)) then
+      deallocate(closure_index)
+    end if
+    if (allocated(closure_coef)) then
+      deallocate(closure_coef)
+    end if
+    if (allocated(closure_sig_t)) then
+      deallocate(closure_sig_t)
+    end if
+    if (allocated(closure_mMap)) then
+      deallocate(closure_mMap)
+    end if
+    if (allocated(closure_dx)) then
+      deallocate(closure_dx)
+    end if
+    if (allocated(closure_mu)) then
+      deallocate(closure_mu)
+    end if
+
+  end subroutine finalize_sweeper_1D
+
 end module sweeper_1D
@@ -4,6 +4,16 @@ module sweeper_2D
 
   implicit none
 
+  logical :: &
+      sc_cached=.false.      ! Flag if the step characteristic factors are cached
+  real(kind=dp), allocatable, dimension(:,:,:) :: &
+      sc_attenuation         ! Step characteristic exp and (1 - exp) / tau (factor, angle, cell)
+  real(kind=dp), allocatable, dimension(:) :: &
+      sc_dx,               & ! Cell widths in x used to build the factors
+      sc_dy,               & ! Cell widths in y used to build the factors
+      sc_mu,               & ! Cosines with the x axis used to build the factors
+      sc_eta                 ! Cosines with the y axis used to build the factors
+
   contains
   
   subroutine apply_transport_operator_2D(phi)
@@ -11,22 +21,53 @@ module sweeper_2D
     ! Sweep over each cell, angle, and octant
     ! ##########################################################################
 
+    ! Use Statements
+    use control, only : number_groups
+    use state, only : sweep_count
+    use sources, only : compute_source
+
+    ! Variable definitions
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        phi           ! Scalar flux for current iteration and group g
+
+    ! Increment the sweep counter
+    sweep_count = sweep_count + 1
+
+    ! Update the forcing function
+    call compute_source()
+
+    ! Make sure the cached closure factors are available
+    call update_closure_tables_2D()
+
+    ! Sweep all of the groups together
+    call sweep_groups_2D(phi, 1, number_groups)
+
+  end subroutine apply_transport_operator_2D
+
+  subroutine sweep_groups_2D(phi, gmin, gmax)
+    ! ##########################################################################
+    ! Sweep over each cell, angle, and octant for the groups gmin to gmax
+    ! The sources and closure tables must already be computed for the current iterate
+    ! ##########################################################################
+
     ! Use Statements
     use angle, only : p_leg, wt, mu, eta, PI
     use mesh, only : dx, dy
     use control, only : store_psi, number_angles_per_octant, number_cells, number_cells_x, &
-                        number_cells_y, number_groups, use_DGM, scatter_leg_order, &
-                        boundary_east, boundary_west, boundary_north, boundary_south, number_moments
-    use state, only : mg_sig_t, sweep_count, mg_mMap, mg_incident_x, mg_incident_y, &
-                      mg_psi, mg_source, sigphi
-    use sources, only : compute_source
-    use omp_lib, only : omp_get_wtime
+                        number_cells_y, use_DGM, scatter_leg_order, &
+                        boundary_east, boundary_west, boundary_north, boundary_south, number_moments, &
+                        parallel_sweep
+    use state, only : mg_sig_t, mg_mMap, mg_incident_x, mg_incident_y, &
+                      mg_psi, mg_source, sigphi, mg_current_x, mg_current_y
     use dgm, only : delta_m, psi_m, dgm_order
 
     ! Variable definitions
     real(kind=dp), intent(inout), dimension(:,:,:) :: &
         phi           ! Scalar flux for current iteration and group g
-    real(kind=dp), dimension(0:number_moments, number_groups, number_cells) :: &
+    integer, intent(in) :: &
+        gmin,       & ! Lower group to sweep
+        gmax          ! Upper group to sweep
+    real(kind=dp), dimension(0:number_moments, gmin:gmax, number_cells) :: &
         phi_update    ! Container to hold the updated scalar flux
     integer :: &
         o,          & ! Octant index
@@ -49,18 +90,20 @@ module sweeper_2D
         cy_start,   & ! Lower cell number in y direction
         cy_stop,    & ! Upper cell number in y direction
         cy_step       ! Cell stepping direction in y direction
-    real(kind=dp), dimension(number_groups) :: &
+    real(kind=dp), dimension(gmin:gmax) :: &
         psi_center, & ! Angular flux at cell center
         source        ! Fission, In-Scattering, External source in group g
-
-    ! Increment the sweep counter
-    sweep_count = sweep_count + 1
+    logical :: &
+        tally         ! Tally the net current through each face
 
     ! Reset phi
     phi_update = 0.0_8
 
-    ! Update the forcing function
-    call compute_source()
+    tally = allocated(mg_current_x)
+    if (tally) then
+      mg_current_x(gmin:gmax, :, :) = 0.0_8
+      mg_current_y(gmin:gmax, :, :) = 0.0_8
+    end if
 
     do o = 1, 4  ! Sweep over octants
 
@@ -71,14 +114,14 @@ module sweeper_2D
         cx_step = 1
         src_x = merge(1, 2, o == 1)
         dst_x = merge(4, 3, o == 1)
-        mg_incident_x(:,:,:,dst_x) = boundary_west * mg_incident_x(:,:,:,src_x)
+        mg_incident_x(gmin:gmax,:,:,dst_x) = boundary_west * mg_incident_x(gmin:gmax,:,:,src_x)
       else
         cx_start = number_cells_x
         cx_stop = 1
         cx_step = -1
         src_x = merge(3, 4, o == 3)
         dst_x = merge(2, 1, o == 3)
-        mg_incident_x(:,:,:,dst_x) = boundary_east * mg_incident_x(:,:,:,src_x)
+        mg_incident_x(gmin:gmax,:,:,dst_x) = boundary_east * mg_incident_x(gmin:gmax,:,:,src_x)
       end if
 
       ! Get sweep direction and set boundary condition for y cells
@@ -88,60 +131,414 @@ module sweeper_2D
         cy_step = 1
         src_y = merge(1, 4, o == 1)
         dst_y = merge(2, 3, o == 1)
-        mg_incident_y(:,:,:,dst_y) = boundary_north * mg_incident_y(:,:,:,src_y)
+        mg_incident_y(gmin:gmax,:,:,dst_y) = boundary_north * mg_incident_y(gmin:gmax,:,:,src_y)
       else
         cy_start = number_cells_y
         cy_stop = 1
         cy_step = -1
         src_y = merge(2, 3, o == 2)
         dst_y = merge(1, 4, o == 2)
-        mg_incident_y(:,:,:,dst_y) = boundary_south * mg_incident_y(:,:,:,src_y)
+        mg_incident_y(gmin:gmax,:,:,dst_y) = boundary_south * mg_incident_y(gmin:gmax,:,:,src_y)
+      end if
+
+      ! Tally the current entering through the boundaries
+      if (tally) then
+        call tally_boundary_current_2D(gmin, gmax, cx_start, cy_start, cx_step, cy_step, dst_x, dst_y)
+      end if
+
+      if (parallel_sweep) then
+        ! Sweep the octant along the diagonal wavefronts
+        call sweep_octant_2D(o, gmin, gmax, cx_step, cy_step, dst_x, dst_y, phi_update)
+      else
+        do cy = cy_start, cy_stop, cy_step  ! Sweep over cells in y direction
+          do cx = cx_start, cx_stop, cx_step  ! Sweep over cells in x direction
+            c = (cy - 1) * number_cells_x + cx
+            mat = mg_mMap(c)
+
+            do a = 1, number_angles_per_octant  ! Sweep over angle
+              an = (o - 1) * number_angles_per_octant + a
+
+              ! Get the source in this cell, group, and angle
+              source(:) = mg_source(gmin:gmax, c)
+              ll = 0
+              do l = 0, scatter_leg_order
+                do m = -l, l
+                  source(:) = source(:) + sigphi(ll,gmin:gmax,c) * p_leg(ll,an) * (2.0_8 * l + 1.0_8)
+                  ll = ll + 1
+                end do  ! End m loop
+              end do  ! End l loop
+
+              if (use_DGM) then
+                source(:) = source(:) - delta_m(gmin:gmax, an, mg_mMap(c), dgm_order) * psi_m(0, gmin:gmax, an, c)
+              end if
+
+              ! Solve the equation for psi_center
+              if (sc_cached) then
+                call computeSC(source(:), mg_sig_t(gmin:gmax, mat), dx(cx) / mu(a), dy(cy) / eta(a), &
+                               sc_attenuation(:, a, c), mg_incident_x(gmin:gmax, a, cy, dst_x), &
+                               mg_incident_y(gmin:gmax, a, cx, dst_y), psi_center)
+              else
+                call computeEQ(source(:), mg_sig_t(gmin:gmax, mat), dx(cx), dy(cy), mu(a), eta(a), &
+                               mg_incident_x(gmin:gmax, a, cy, dst_x), mg_incident_y(gmin:gmax, a, cx, dst_y), &
+                               psi_center)
+              end if
+
+              ! Store psi if desired
+              if (store_psi) then
+                mg_psi(gmin:gmax, an, c) = psi_center(:)
+              end if
+
+              ! Tally the current leaving through the outgoing faces
+              if (tally) then
+                call tally_current_2D(o, a, cx, cy, gmin, gmax, dst_x, dst_y)
+              end if
+
+              ! Increment the legendre expansions of the scalar flux
+              do ll = 0, number_moments
+                phi_update(ll, :, c) = phi_update(ll, :, c) + wt(a) * p_leg(ll,an) * psi_center(:)
+              end do  ! End ll loop
+            end do  ! End a loop
+          end do  ! End cx loop
+        end do  ! End cy loop
       end if
+    end do  ! End oo loop
+
+    phi(:, gmin:gmax, :) = phi_update
+
+  end subroutine sweep_groups_2D
+
+  subroutine sweep_source_2D(source, incident_x, incident_y, phi, psi)
+    ! ##########################################################################
+    ! Sweep all groups with a fixed angular source into the given containers
+    ! Nothing in state is modified, so several sources can be swept at once
+    ! provided the closure factors are current
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : p_leg, wt, mu, eta
+    use mesh, only : dx, dy
+    use control, only : number_angles_per_octant, number_cells_x, number_cells_y, number_moments, &
+                        boundary_east, boundary_west, boundary_north, boundary_south
+    use state, only : mg_sig_t, mg_mMap
+
+    ! Variable definitions
+    real(kind=dp), intent(in), dimension(:,:,:) :: &
+        source        ! Angular source (group, angle, cell)
+    real(kind=dp), intent(inout), dimension(:,:,:,:) :: &
+        incident_x, & ! Angular flux incident on the current cell in x direction
+        incident_y    ! Angular flux incident on the current cell in y direction
+    real(kind=dp), intent(out), dimension(:,:,:) :: &
+        phi           ! Scalar flux moments (1 indexed)
+    real(kind=dp), intent(out), dimension(:,:,:) :: &
+        psi           ! Angular flux
+    integer :: &
+        o,          & ! Octant index
+        c,          & ! Cell index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        mat,        & ! Material index
+        a,          & ! Angle index
+        an,         & ! Global angle index
+        ll,         & ! Basis index
+        src_x,      & ! Source index for cell boundary condition in x direction
+        src_y,      & ! Source index for cell boundary condition in y direction
+        dst_x,      & ! Destination index for cell boundary condition in x direction
+        dst_y,      & ! Destination index for cell boundary condition in y direction
+        cx_step,    & ! Cell stepping direction in x direction
+        cy_step       ! Cell stepping direction in y direction
+    real(kind=dp), dimension(size(source, 1)) :: &
+        psi_center    ! Angular flux at cell center
 
-      do cy = cy_start, cy_stop, cy_step  ! Sweep over cells in y direction
-        do cx = cx_start, cx_stop, cx_step  ! Sweep over cells in x direction
+    phi = 0.0_8
+
+    do o = 1, 4  ! Sweep over octants
+
+      ! Get sweep direction and set boundary condition for x cells
+      if (o == 1 .or. o == 2) then
+        cx_step = 1
+        src_x = merge(1, 2, o == 1)
+        dst_x = merge(4, 3, o == 1)
+        incident_x(:,:,:,dst_x) = boundary_west * incident_x(:,:,:,src_x)
+      else
+        cx_step = -1
+        src_x = merge(3, 4, o == 3)
+        dst_x = merge(2, 1, o == 3)
+        incident_x(:,:,:,dst_x) = boundary_east * incident_x(:,:,:,src_x)
+      end if
+
+      ! Get sweep direction and set boundary condition for y cells
+      if (o == 1 .or. o == 4) then
+        cy_step = 1
+        src_y = merge(1, 4, o == 1)
+        dst_y = merge(2, 3, o == 1)
+        incident_y(:,:,:,dst_y) = boundary_north * incident_y(:,:,:,src_y)
+      else
+        cy_step = -1
+        src_y = merge(2, 3, o == 2)
+        dst_y = merge(1, 4, o == 2)
+        incident_y(:,:,:,dst_y) = boundary_south * incident_y(:,:,:,src_y)
+      end if
+
+      do cy = merge(1, number_cells_y, cy_step == 1), merge(number_cells_y, 1, cy_step == 1), cy_step
+        do cx = merge(1, number_cells_x, cx_step == 1), merge(number_cells_x, 1, cx_step == 1), cx_step
           c = (cy - 1) * number_cells_x + cx
           mat = mg_mMap(c)
 
           do a = 1, number_angles_per_octant  ! Sweep over angle
             an = (o - 1) * number_angles_per_octant + a
 
-            ! Get the source in this cell, group, and angle
-            source(:) = mg_source(:, c)
-            ll = 0
-            do l = 0, scatter_leg_order
-              do m = -l, l
-                source(:) = source(:) + sigphi(ll,:,c) * p_leg(ll,an) * (2.0_8 * l + 1.0_8)
-                ll = ll + 1
-              end do  ! End m loop
-            end do  ! End l loop
-
-            if (use_DGM) then
-              source(:) = source(:) - delta_m(:, an, mg_mMap(c), dgm_order) * psi_m(0, :, an, c)
-            end if
-
             ! Solve the equation for psi_center
-            call computeEQ(source(:), mg_sig_t(:, mat), dx(cx), dy(cy), mu(a), eta(a), &
-                           mg_incident_x(:, a, cy, dst_x), mg_incident_y(:, a, cx, dst_y), psi_center)
-
-            ! Store psi if desired
-            if (store_psi) then
-              mg_psi(:, an, c) = psi_center(:)
+            if (sc_cached) then
+              call computeSC(source(:, an, c), mg_sig_t(:, mat), dx(cx) / mu(a), dy(cy) / eta(a), &
+                             sc_attenuation(:, a, c), incident_x(:, a, cy, dst_x), &
+                             incident_y(:, a, cx, dst_y), psi_center)
+            else
+              call computeEQ(source(:, an, c), mg_sig_t(:, mat), dx(cx), dy(cy), mu(a), eta(a), &
+                             incident_x(:, a, cy, dst_x), incident_y(:, a, cx, dst_y), psi_center)
             end if
 
-            ! Increment the legendre expansions of the scalar flux
+            psi(:, an, c) = psi_center(:)
             do ll = 0, number_moments
-              phi_update(ll, :, c) = phi_update(ll, :, c) + wt(a) * p_leg(ll,an) * psi_center(:)
+              phi(ll + 1, :, c) = phi(ll + 1, :, c) + wt(a) * p_leg(ll,an) * psi_center(:)
             end do  ! End ll loop
           end do  ! End a loop
         end do  ! End cx loop
       end do  ! End cy loop
-    end do  ! End oo loop
+    end do  ! End o loop
 
-    phi = phi_update
+  end subroutine sweep_source_2D
 
-  end subroutine apply_transport_operator_2D
+  subroutine sweep_octant_2D(o, gmin, gmax, cx_step, cy_step, dst_x, dst_y, phi_update)
+    ! ##########################################################################
+    ! Sweep one octant with a Koch-Baker-Alcouffe wavefront schedule
+    !
+    ! The cells on each anti-diagonal only depend on the previous diagonal, so
+    ! they are solved concurrently.  Each angle follows one diagonal behind the
+    ! previous angle, which keeps the cells of a stage distinct and adds the
+    ! angles to the flux moments in the same order as the serial sweep.
+    ! ##########################################################################
+
+    ! Use Statements
+    use control, only : number_angles_per_octant, number_cells_x, number_cells_y
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        o,          & ! Octant index
+        gmin,       & ! Lower group to sweep
+        gmax,       & ! Upper group to sweep
+        cx_step,    & ! Cell stepping direction in x direction
+        cy_step,    & ! Cell stepping direction in y direction
+        dst_x,      & ! Destination index for cell boundary condition in x direction
+        dst_y         ! Destination index for cell boundary condition in y direction
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        phi_update    ! Container to hold the updated scalar flux (1 indexed)
+    integer :: &
+        s,          & ! Pipeline stage index
+        k,          & ! Flattened (angle, x cell) work index
+        d,          & ! Diagonal index
+        i,          & ! x cell index in sweep order
+        j,          & ! y cell index in sweep order
+        a,          & ! Angle index
+        cx,         & ! x cell index
+        cy            ! y cell index
+
+    do s = 1, number_cells_x + number_cells_y + number_angles_per_octant - 2  ! Loop over stages
+      !$omp parallel do default(shared) private(k, a, d, i, j, cx, cy) schedule(dynamic)
+      do k = 0, number_angles_per_octant * number_cells_x - 1
+        a = k / number_cells_x + 1
+        i = mod(k, number_cells_x) + 1
+
+        ! Angle a works on the diagonal a - 1 stages behind the leading angle
+        d = s - a + 1
+        j = d - i + 1
+        if (j < 1 .or. j > number_cells_y) then
+          cycle
+        end if
+
+        cx = merge(i, number_cells_x - i + 1, cx_step == 1)
+        cy = merge(j, number_cells_y - j + 1, cy_step == 1)
+
+        call sweep_cell_2D(o, a, cx, cy, gmin, gmax, dst_x, dst_y, phi_update)
+      end do  ! End k loop
+      !$omp end parallel do
+    end do  ! End s loop
+
+  end subroutine sweep_octant_2D
+
+  subroutine sweep_cell_2D(o, a, cx, cy, gmin, gmax, dst_x, dst_y, phi_update)
+    ! ##########################################################################
+    ! Solve a single cell and angle and add it to the flux moments
+    ! This mirrors the body of the serial sweep for use by sweep_octant_2D
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : p_leg, wt, mu, eta
+    use mesh, only : dx, dy
+    use control, only : store_psi, number_angles_per_octant, number_cells_x, &
+                        use_DGM, scatter_leg_order, number_moments
+    use state, only : mg_sig_t, mg_mMap, mg_incident_x, mg_incident_y, &
+                      mg_psi, mg_source, sigphi, mg_current_x
+    use dgm, only : delta_m, psi_m, dgm_order
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        o,          & ! Octant index
+        a,          & ! Angle index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        gmin,       & ! Lower group to sweep
+        gmax,       & ! Upper group to sweep
+        dst_x,      & ! Destination index for cell boundary condition in x direction
+        dst_y         ! Destination index for cell boundary condition in y direction
+    real(kind=dp), intent(inout), dimension(:,:,:) :: &
+        phi_update    ! Container to hold the updated scalar flux (1 indexed)
+    integer :: &
+        c,          & ! Cell index
+        mat,        & ! Material index
+        an,         & ! Global angle index
+        l,          & ! Degree index for spherical harmonics
+        m,          & ! Order index for spherical harmonics
+        ll            ! Basis index
+    real(kind=dp), dimension(gmin:gmax) :: &
+        psi_center, & ! Angular flux at cell center
+        source        ! Fission, In-Scattering, External source in group g
+
+    c = (cy - 1) * number_cells_x + cx
+    mat = mg_mMap(c)
+    an = (o - 1) * number_angles_per_octant + a
+
+    ! Get the source in this cell, group, and angle
+    source(:) = mg_source(gmin:gmax, c)
+    ll = 0
+    do l = 0, scatter_leg_order
+      do m = -l, l
+        source(:) = source(:) + sigphi(ll,gmin:gmax,c) * p_leg(ll,an) * (2.0_8 * l + 1.0_8)
+        ll = ll + 1
+      end do  ! End m loop
+    end do  ! End l loop
+
+    if (use_DGM) then
+      source(:) = source(:) - delta_m(gmin:gmax, an, mg_mMap(c), dgm_order) * psi_m(0, gmin:gmax, an, c)
+    end if
+
+    ! Solve the equation for psi_center
+    if (sc_cached) then
+      call computeSC(source(:), mg_sig_t(gmin:gmax, mat), dx(cx) / mu(a), dy(cy) / eta(a), &
+                     sc_attenuation(:, a, c), mg_incident_x(gmin:gmax, a, cy, dst_x), &
+                     mg_incident_y(gmin:gmax, a, cx, dst_y), psi_center)
+    else
+      call computeEQ(source(:), mg_sig_t(gmin:gmax, mat), dx(cx), dy(cy), mu(a), eta(a), &
+                     mg_incident_x(gmin:gmax, a, cy, dst_x), mg_incident_y(gmin:gmax, a, cx, dst_y), psi_center)
+    end if
+
+    ! Store psi if desired
+    if (store_psi) then
+      mg_psi(gmin:gmax, an, c) = psi_center(:)
+    end if
+
+    ! Tally the current leaving through the outgoing faces
+    if (allocated(mg_current_x)) then
+      call tally_current_2D(o, a, cx, cy, gmin, gmax, dst_x, dst_y)
+    end if
+
+    ! Increment the legendre expansions of the scalar flux
+    do ll = 0, number_moments
+      phi_update(ll + 1, :, c) = phi_update(ll + 1, :, c) + wt(a) * p_leg(ll,an) * psi_center(:)
+    end do  ! End ll loop
+
+  end subroutine sweep_cell_2D
   
+  subroutine tally_current_2D(o, a, cx, cy, gmin, gmax, dst_x, dst_y)
+    ! ##########################################################################
+    ! Add the outgoing angular flux of a cell to the net face currents
+    ! Currents are positive toward increasing cx and cy
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : wt, mu, eta
+    use state, only : mg_incident_x, mg_incident_y, mg_current_x, mg_current_y
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        o,          & ! Octant index
+        a,          & ! Angle index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        gmin,       & ! Lower group to sweep
+        gmax,       & ! Upper group to sweep
+        dst_x,      & ! Destination index for cell boundary condition in x direction
+        dst_y         ! Destination index for cell boundary condition in y direction
+    integer :: &
+        face          ! Outgoing face index
+
+    ! Octants 1 and 2 move toward increasing cx
+    if (o == 1 .or. o == 2) then
+      face = cx + 1
+      mg_current_x(gmin:gmax, face, cy) = mg_current_x(gmin:gmax, face, cy) &
+                                        + wt(a) * mu(a) * mg_incident_x(gmin:gmax, a, cy, dst_x)
+    else
+      face = cx
+      mg_current_x(gmin:gmax, face, cy) = mg_current_x(gmin:gmax, face, cy) &
+                                        - wt(a) * mu(a) * mg_incident_x(gmin:gmax, a, cy, dst_x)
+    end if
+
+    ! Octants 1 and 4 move toward increasing cy
+    if (o == 1 .or. o == 4) then
+      face = cy + 1
+      mg_current_y(gmin:gmax, cx, face) = mg_current_y(gmin:gmax, cx, face) &
+                                        + wt(a) * eta(a) * mg_incident_y(gmin:gmax, a, cx, dst_y)
+    else
+      face = cy
+      mg_current_y(gmin:gmax, cx, face) = mg_current_y(gmin:gmax, cx, face) &
+                                        - wt(a) * eta(a) * mg_incident_y(gmin:gmax, a, cx, dst_y)
+    end if
+
+  end subroutine tally_current_2D
+
+  subroutine tally_boundary_current_2D(gmin, gmax, cx_start, cy_start, cx_step, cy_step, dst_x, dst_y)
+    ! ##########################################################################
+    ! Add the incident boundary flux of an octant to the net face currents
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : wt, mu, eta
+    use control, only : number_angles_per_octant, number_cells_x, number_cells_y
+    use state, only : mg_incident_x, mg_incident_y, mg_current_x, mg_current_y
+
+    ! Variable definitions
+    integer, intent(in) :: &
+        gmin,       & ! Lower group to sweep
+        gmax,       & ! Upper group to sweep
+        cx_start,   & ! First x cell of the sweep
+        cy_start,   & ! First y cell of the sweep
+        cx_step,    & ! Cell stepping direction in x direction
+        cy_step,    & ! Cell stepping direction in y direction
+        dst_x,      & ! Destination index for cell boundary condition in x direction
+        dst_y         ! Destination index for cell boundary condition in y direction
+    integer :: &
+        a,          & ! Angle index
+        cx,         & ! x cell index
+        cy,         & ! y cell index
+        face          ! Incoming face index
+
+    face = merge(cx_start, cx_start + 1, cx_step == 1)
+    do cy = 1, number_cells_y
+      do a = 1, number_angles_per_octant
+        mg_current_x(gmin:gmax, face, cy) = mg_current_x(gmin:gmax, face, cy) &
+                                          + cx_step * wt(a) * mu(a) * mg_incident_x(gmin:gmax, a, cy, dst_x)
+      end do  ! End a loop
+    end do  ! End cy loop
+
+    face = merge(cy_start, cy_start + 1, cy_step == 1)
+    do cx = 1, number_cells_x
+      do a = 1, number_angles_per_octant
+        mg_current_y(gmin:gmax, cx, face) = mg_current_y(gmin:gmax, cx, face) &
+                                          + cy_step * wt(a) * eta(a) * mg_incident_y(gmin:gmax, a, cx, dst_y)
+      end do  ! End a loop
+    end do  ! End cx loop
+
+  end subroutine tally_boundary_current_2D
+
   subroutine computeEQ(S, sig, dx, dy, mua, eta, inc_x, inc_y, cellPsi)
     ! ##########################################################################
     ! Compute the value for the closure relationship
@@ -164,17 +561,11 @@ module sweeper_2D
         mua             ! Angle for the cell
     real(kind=dp), dimension(:), intent(inout) :: &
         cellPsi         ! Angular flux at cell center
-    real(kind=dp), allocatable, dimension(:) :: &
-        out_y,        & ! Outgoing flux in y direction
-        out_x,        & ! Outgoing flux in x direction
-        Q               ! Source used in step characteristics
+    real(kind=dp), dimension(2) :: &
+        factors         ! Attenuation factors used in step characteristics
     real(kind=dp) :: &
         coef_x,       & ! Parameter used in diamond and step differences
         coef_y,       & ! Parameter used in diamond and step differences
-        rho,          & ! Ratio used in step characteristics
-        expf,         &
-        one_m_exp_x,  &
-        one_m_exp_y,  &
         coef(size(sig)) ! Parameter used in diamond and step differences
 
     if (equation_type == 'DD') then
@@ -186,27 +577,10 @@ module sweeper_2D
       inc_y(:) = 2_8 * cellPsi(:) - inc_y(:)
     else if (equation_type == 'SC') then
       ! Step Characteristics relationship
-      allocate(out_y(size(inc_y)), out_x(size(inc_x)), Q(size(S)))
-      Q(:) = S(:) / sig(:)
       coef_x = dx / mua
       coef_y = dy / eta
-      rho = coef_x / coef_y
-      if (rho <= 1) then
-        expf = exp(-coef_x)
-        one_m_exp_x = (1.0_8 - expf) / coef_x
-        out_y(:) = Q(:) + (inc_y(:) - Q(:)) * (1.0_8 - rho) * expf + (inc_x(:) - Q(:)) * rho * one_m_exp_x
-        out_x(:) = Q(:) + (inc_y(:) - Q(:)) * one_m_exp_x
-      else
-        expf = exp(-coef_y)
-        one_m_exp_y = (1.0_8 - expf) / coef_y
-        out_y(:) = Q(:) + (inc_x(:) - Q(:)) * one_m_exp_y
-        out_x(:) = Q(:) + (inc_y(:) - Q(:)) * one_m_exp_y / rho + (inc_x(:) - Q(:)) * (1.0_8 - 1.0_8 / rho) * expf
-      end if
-
-      cellPsi(:) = Q(:) - (out_x(:) - inc_x(:)) / coef_y - (out_y(:) - inc_y(:)) / coef_x
-      inc_x(:) = out_x(:)
-      inc_y(:) = out_y(:)
-      deallocate(out_y, out_x, Q)
+      call compute_sc_factors(coef_x, coef_y, factors)
+      call computeSC(S, sig, coef_x, coef_y, factors, inc_x, inc_y, cellPsi)
     else if (equation_type == 'SD') then
       ! Step Difference relationship
       coef_x = mua / dx
@@ -221,5 +595,179 @@ module sweeper_2D
     end if
 
   end subroutine computeEQ
-  
+
+  subroutine compute_sc_factors(coef_x, coef_y, factors)
+    ! ##########################################################################
+    ! Compute the attenuation factors for the step characteristics relationship
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), intent(in) :: &
+        coef_x,       & ! Optical path across the cell in x direction
+        coef_y          ! Optical path across the cell in y direction
+    real(kind=dp), dimension(2), intent(out) :: &
+        factors         ! exp(-tau) and (1 - exp(-tau)) / tau along the shorter path
+    real(kind=dp) :: &
+        expf            ! Attenuation along the shorter path
+
+    if (coef_x / coef_y <= 1) then
+      expf = exp(-coef_x)
+      factors = [expf, (1.0_8 - expf) / coef_x]
+    else
+      expf = exp(-coef_y)
+      factors = [expf, (1.0_8 - expf) / coef_y]
+    end if
+
+  end subroutine compute_sc_factors
+
+  subroutine computeSC(S, sig, coef_x, coef_y, factors, inc_x, inc_y, cellPsi)
+    ! ##########################################################################
+    ! Compute the step characteristics relationship with known attenuation factors
+    ! ##########################################################################
+
+    ! Variable definitions
+    real(kind=dp), dimension(:), intent(in) :: &
+        S,            & ! Source within the cell
+        sig             ! Total cross section within the cell
+    real(kind=dp), intent(in) :: &
+        coef_x,       & ! Optical path across the cell in x direction
+        coef_y          ! Optical path across the cell in y direction
+    real(kind=dp), dimension(2), intent(in) :: &
+        factors         ! exp(-tau) and (1 - exp(-tau)) / tau along the shorter path
+    real(kind=dp), dimension(:), intent(inout) :: &
+        inc_x,        & ! Angular flux incident on the cell from x direction
+        inc_y,        & ! Angular flux incident on the cell from y direction
+        cellPsi         ! Angular flux at cell center
+    real(kind=dp), dimension(size(S)) :: &
+        out_y,        & ! Outgoing flux in y direction
+        out_x,        & ! Outgoing flux in x direction
+        Q               ! Source used in step characteristics
+    real(kind=dp) :: &
+        rho             ! Ratio used in step characteristics
+
+    Q(:) = S(:) / sig(:)
+    rho = coef_x / coef_y
+    if (rho <= 1) then
+      out_y(:) = Q(:) + (inc_y(:) - Q(:)) * (1.0_8 - rho) * factors(1) + (inc_x(:) - Q(:)) * rho * factors(2)
+      out_x(:) = Q(:) + (inc_y(:) - Q(:)) * factors(2)
+    else
+      out_y(:) = Q(:) + (inc_x(:) - Q(:)) * factors(2)
+      out_x(:) = Q(:) + (inc_y(:) - Q(:)) * factors(2) / rho + (inc_x(:) - Q(:)) * (1.0_8 - 1.0_8 / rho) * factors(1)
+    end if
+
+    cellPsi(:) = Q(:) - (out_x(:) - inc_x(:)) / coef_y - (out_y(:) - inc_y(:)) / coef_x
+    inc_x(:) = out_x(:)
+    inc_y(:) = out_y(:)
+
+  end subroutine computeSC
+
+  subroutine update_closure_tables_2D()
+    ! ##########################################################################
+    ! Cache the step characteristic attenuation factors for each cell and angle
+    ! The factors only use the optical paths dx / mu and dy / eta, so the cache
+    ! is only rebuilt if the mesh or quadrature change.  If it would exceed
+    ! closure_cache_limit, the sweep computes the factors in computeEQ instead
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : mu, eta
+    use mesh, only : dx, dy
+    use control, only : equation_type, number_cells_x, number_cells_y, number_cells, &
+                        number_angles_per_octant, closure_cache_limit
+
+    ! Variable definitions
+    integer :: &
+        a,  & ! Angle index
+        cx, & ! x cell index
+        cy, & ! y cell index
+        c     ! Cell index
+
+    if (equation_type /= 'SC') then
+      call finalize_sweeper_2D()
+      return
+    else if (sc_cached) then
+      if (closure_tables_current_2D()) then
+        return
+      end if
+    end if
+
+    call finalize_sweeper_2D()
+
+    sc_cached = 16.0_8 * number_angles_per_octant * number_cells <= closure_cache_limit * 1024.0_8 ** 2
+    if (.not. sc_cached) then
+      return
+    end if
+
+    allocate(sc_attenuation(2, number_angles_per_octant, number_cells))
+
+    do cy = 1, number_cells_y
+      do cx = 1, number_cells_x
+        c = (cy - 1) * number_cells_x + cx
+        do a = 1, number_angles_per_octant
+          call compute_sc_factors(dx(cx) / mu(a), dy(cy) / eta(a), sc_attenuation(:, a, c))
+        end do  ! End a loop
+      end do  ! End cx loop
+    end do  ! End cy loop
+
+    ! Save the inputs to check the factors against
+    sc_dx = dx
+    sc_dy = dy
+    sc_mu = mu
+    sc_eta = eta
+
+  end subroutine update_closure_tables_2D
+
+  function closure_tables_current_2D() result(current)
+    ! ##########################################################################
+    ! Check if the cached factors were built from the current inputs
+    ! ##########################################################################
+
+    ! Use Statements
+    use angle, only : mu, eta
+    use mesh, only : dx, dy
+
+    ! Variable definitions
+    logical :: &
+        current  ! Flag if the factors can be reused
+
+    current = .false.
+
+    if (.not. allocated(sc_dx)) then
+      return
+    else if (size(sc_dx) /= size(dx) .or. size(sc_dy) /= size(dy) .or. size(sc_mu) /= size(mu) &
+             .or. size(sc_eta) /= size(eta)) then
+      return
+    else if (any(sc_dx /= dx) .or. any(sc_dy /= dy) .or. any(sc_mu /= mu) .or. any(sc_eta /= eta)) then
+      return
+    end if
+
+    current = .true.
+
+  end function closure_tables_current_2D
+
+  subroutine finalize_sweeper_2D()
+    ! ##########################################################################
+    ! Deallocate the cached closure factors, which forces them to be rebuilt
+    ! ##########################################################################
+
+    sc_cached = .false.
+
+    if (allocated(sc_attenuation)) then
+      deallocate(sc_attenuation)
+    end if
+    if (allocated(sc_dx)) then
+      deallocate(sc_dx)
+    end if
+    if (allocated(sc_dy)) then
+      deallocate(sc_dy)
+    end if
+    if (allocated(sc_mu)) then
+      deallocate(sc_mu)
+    end if
+    if (allocated(sc_eta)) then
+      deallocate(sc_eta)
+    end if
+
+  end subroutine finalize_sweeper_2D
+
 end module sweeper_2D
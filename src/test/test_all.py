@@ -1,6 +1,7 @@
 import unittest
 import argparse
 from test_angle import TestANGLE_1D, TestANGLE_2D
+from test_control import TestCONTROL
 from test_mesh import TestMESH
 from test_material import TestMATERIAL
 from test_state import TestSTATE
@@ -17,6 +18,7 @@ def AllSuite():
     suite = unittest.TestSuite()
     suite.addTests(unittest.makeSuite(TestANGLE_1D))
     suite.addTests(unittest.makeSuite(TestANGLE_2D))
+    suite.addTests(unittest.makeSuite(TestCONTROL))
     suite.addTests(unittest.makeSuite(TestMESH))
     suite.addTests(unittest.makeSuite(TestMATERIAL))
     suite.addTests(unittest.makeSuite(TestSTATE))
@@ -0,0 +1,70 @@
+import sys
+sys.path.append('../')
+
+import os
+import tempfile
+import unittest
+import pydgm
+import numpy as np
+
+
+class TestCONTROL(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.fname = os.path.join(tmpdir.name, 'options.inp')
+        # The material map is longer than the old line buffer
+        self.material_map = np.arange(300000) % 3 + 1
+        self.writeOptions(4)
+
+    def writeOptions(self, angle_order):
+        with open(self.fname, 'w', newline='') as f:
+            f.write('spatial_dimension 1\n')
+            f.write('fine_mesh_x {}\r\n'.format(' '.join(['1'] * len(self.material_map))))
+            f.write('coarse_mesh_x {}\n'.format(' '.join(str(x) for x in range(len(self.material_map) + 1))))
+            f.write('material_map {}\n'.format(' '.join(str(m) for m in self.material_map)))
+            f.write('xs_file test/7gXS.anlxs\n')
+            f.write('solver_type eigen\n')
+            f.write('angle_order {}'.format(angle_order))
+
+    def test_control_initialize_control(self):
+        '''
+        Test reading the options file
+        '''
+        pydgm.control.initialize_control(self.fname, True)
+
+        self.assertEqual(pydgm.control.spatial_dimension, 1)
+        self.assertEqual(len(pydgm.control.fine_mesh_x), len(self.material_map))
+        np.testing.assert_array_equal(pydgm.control.material_map, self.material_map)
+        self.assertEqual(pydgm.control.coarse_mesh_x[-1], len(self.material_map))
+        self.assertEqual(pydgm.control.xs_name.item().strip(), b'test/7gXS.anlxs')
+        self.assertEqual(pydgm.control.solver_type.item().strip(), b'eigen')
+        self.assertEqual(pydgm.control.angle_order, 4)
+
+    def test_control_initialize_control_again(self):
+        '''
+        Test that reading the file again gives the same options and sees changes
+        '''
+        pydgm.control.initialize_control(self.fname, True)
+        pydgm.control.finalize_control()
+
+        pydgm.control.angle_order = 0
+        pydgm.control.initialize_control(self.fname, True)
+        np.testing.assert_array_equal(pydgm.control.material_map, self.material_map)
+        self.assertEqual(pydgm.control.angle_order, 4)
+        pydgm.control.finalize_control()
+
+        self.writeOptions(8)
+        pydgm.control.initialize_control(self.fname, True)
+        np.testing.assert_array_equal(pydgm.control.material_map, self.material_map)
+        self.assertEqual(pydgm.control.angle_order, 8)
+
+    def tearDown(self):
+        pydgm.control.finalize_control()
+        pydgm.control.angle_order = 2
+
+
+if __name__ == '__main__':
+
+    unittest.main()
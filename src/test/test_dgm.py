@@ -1,6 +1,8 @@
 import sys
 sys.path.append('../')
 
+import os
+import tempfile
 import unittest
 import pydgm
 import numpy as np
@@ -81,6 +83,14 @@ class TestDGM(unittest.TestCase):
         self.assertEqual(pydgm.dgm.expansion_order, 2)
         self.assertEqual(pydgm.control.number_coarse_groups, 2)
 
+    def dense_basis(self):
+        '''
+        Expand the coarse group basis blocks into one row per fine group
+        '''
+        basis = np.zeros((int(pydgm.control.number_fine_groups), int(pydgm.dgm.expansion_order) + 1), order='F')
+        pydgm.dgm.expand_basis(basis)
+        return basis
+
     def test_dgm_initialize_basis(self):
         '''
         Test that the energy basis is properly initialized
@@ -91,7 +101,8 @@ class TestDGM(unittest.TestCase):
 
         np.set_printoptions(linewidth=132)
 
-        assert(pydgm.dgm.basis.shape == (7, 4))
+        basis = self.dense_basis()
+        assert(basis.shape == (7, 4))
         basis_test = np.array([[0.5, 0.6708203932499369, 0.5, 0.2236067977499789],
                                [0.5, 0.223606797749979, -0.5, -0.6708203932499369],
                                [0.5, -0.223606797749979, -0.5, 0.6708203932499369],
@@ -99,7 +110,7 @@ class TestDGM(unittest.TestCase):
                                [0.5773502691896258, 0.7071067811865475, 0.4082482904638631, 0.],
                                [0.5773502691896258, 0., -0.8164965809277261, 0.],
                                [0.5773502691896258, -0.7071067811865475, 0.4082482904638631, 0.]])
-        np.testing.assert_array_almost_equal(pydgm.dgm.basis, basis_test, 12)
+        np.testing.assert_array_almost_equal(basis, basis_test, 12)
 
     def test_dgm_noncontiguous_basis(self):
         pydgm.control.energy_group_map = [1, 2, 1, 2, 1, 2, 1]
@@ -110,7 +121,8 @@ class TestDGM(unittest.TestCase):
 
         np.set_printoptions(linewidth=132)
 
-        assert(pydgm.dgm.basis.shape == (7, 4))
+        basis = self.dense_basis()
+        assert(basis.shape == (7, 4))
         basis_test = np.array([[0.5, 0.6708203932499369, 0.5, 0.2236067977499789],
                                [0.5773502691896258, 0.7071067811865475, 0.4082482904638631, 0.],
                                [0.5, 0.223606797749979, -0.5, -0.6708203932499369],
@@ -118,7 +130,128 @@ class TestDGM(unittest.TestCase):
                                [0.5, -0.223606797749979, -0.5, 0.6708203932499369],
                                [0.5773502691896258, -0.7071067811865475, 0.4082482904638631, 0.],
                                [0.5, -0.6708203932499369, 0.5, -0.2236067977499789]])
-        np.testing.assert_array_almost_equal(pydgm.dgm.basis, basis_test, 12)
+        np.testing.assert_array_almost_equal(basis, basis_test, 12)
+
+    def test_dgm_binary_basis(self):
+        '''
+        Test that the binary basis format matches the text basis
+        '''
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonTools', 'basisMaking'))
+        from writeBinaryBasis import writeBinaryBasis
+
+        pydgm.control.energy_group_map = [1, 2, 1, 2, 1, 2, 1]
+        pydgm.control.dgm_basis_name = 'test/noncontig7dlp'.ljust(256)
+
+        # Load the text basis
+        pydgm.dgmsolver.initialize_dgmsolver()
+        basis_test = self.dense_basis()
+        blocks_test = pydgm.dgm.basis_blocks.copy()
+        pydgm.dgmsolver.finalize_dgmsolver()
+        pydgm.control.finalize_control()
+
+        with tempfile.TemporaryDirectory() as directory:
+            fname = os.path.join(directory, 'noncontig7dlp.bin')
+            writeBinaryBasis(np.loadtxt('test/noncontig7dlp'), [1, 2, 1, 2, 1, 2, 1], fname)
+
+            self.setUp()
+            pydgm.control.energy_group_map = [1, 2, 1, 2, 1, 2, 1]
+            pydgm.control.dgm_basis_name = fname.ljust(256)
+
+            # Load the binary basis
+            pydgm.dgmsolver.initialize_dgmsolver()
+
+        np.testing.assert_array_almost_equal(self.dense_basis(), basis_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.dgm.basis_blocks, blocks_test, 12)
+        # The blocks only hold the fine groups of each coarse group
+        self.assertEqual(pydgm.dgm.basis_blocks.size, 4 * 4 + 3 * 3)
+
+    def project_cross_sections(self):
+        '''
+        Project the fine group cross sections with a direct sum over the fine groups
+        '''
+        # Reload the fine group cross sections released by the initialization
+        pydgm.material.create_material()
+        basis = self.dense_basis()
+        cg_map = np.array(pydgm.control.energy_group_map) - 1
+        sig_t = pydgm.material.sig_t.copy()
+        nu_sig_f = pydgm.material.nu_sig_f.copy()
+        sig_s = pydgm.material.sig_s[:pydgm.control.scatter_leg_order + 1].copy()
+        pydgm.material.finalize_material()
+        G, M = sig_t.shape
+        O = basis.shape[1]
+        L = sig_s.shape[0]
+        CG = cg_map.max() + 1
+
+        sig_t_test = np.zeros((O, CG, M, O))
+        nu_sig_f_test = np.zeros((O, CG, M))
+        sig_s_test = np.zeros((O, L, CG, CG, M, O))
+        nonzero_test = np.zeros((CG, CG, M), dtype=bool)
+        for g in range(G):
+            cg = cg_map[g]
+            sig_t_test[:, cg] += np.einsum('j,m,i->jmi', basis[g], sig_t[g], basis[g])
+            nu_sig_f_test[:, cg] += np.einsum('j,m->jm', basis[g], nu_sig_f[g])
+            for gp in range(G):
+                cgp = cg_map[gp]
+                sig_s_test[:, :, cgp, cg] += np.einsum('j,lm,i->jlmi', basis[gp], sig_s[:, gp, g], basis[g])
+                nonzero_test[cgp, cg] |= np.any(sig_s[:, gp, g] != 0, axis=0)
+
+        return sig_t_test, nu_sig_f_test, sig_s_test, nonzero_test
+
+    def test_dgm_expanded_cross_sections(self):
+        '''
+        Check the projected cross sections against a direct sum over the fine groups
+        '''
+        pydgm.control.energy_group_map = [1, 2, 1, 2, 1, 2, 1]
+        pydgm.control.dgm_basis_name = 'test/noncontig7dlp'.ljust(256)
+
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        sig_t_test, nu_sig_f_test, sig_s_test, nonzero_test = self.project_cross_sections()
+
+        np.testing.assert_array_almost_equal(pydgm.dgm.expanded_sig_t, sig_t_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.dgm.expanded_nu_sig_f, nu_sig_f_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.dgm.expanded_sig_s, sig_s_test, 12)
+        np.testing.assert_array_equal(pydgm.dgm.scatter_block_nonzero, nonzero_test)
+
+    def test_dgm_sparse_scatter(self):
+        '''
+        Check that only the nonzero scattering blocks are stored
+        '''
+        pydgm.control.sparse_scatter = True
+
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        pydgm.control.sparse_scatter = False
+
+        sig_t_test, nu_sig_f_test, sig_s_test, nonzero_test = self.project_cross_sections()
+
+        np.testing.assert_array_equal(pydgm.dgm.scatter_block_nonzero, nonzero_test)
+        index = pydgm.dgm.scatter_block_index
+        self.assertEqual(pydgm.dgm.expanded_sig_s_blocks.shape[2], nonzero_test.sum())
+        for cgp, cg, m in zip(*np.nonzero(nonzero_test)):
+            with self.subTest(cgp=cgp, cg=cg, m=m):
+                np.testing.assert_array_almost_equal(pydgm.dgm.expanded_sig_s_blocks[:, :, index[cgp, cg, m] - 1],
+                                                     sig_s_test[:, :, cgp, cg, m], 12)
+        self.assertTrue(np.all(index[~nonzero_test] == 0))
+
+    def test_dgm_moment_memory(self):
+        '''
+        Check that the moment containers are sized at initialization and reported
+        '''
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        G, L, R, O = 2, pydgm.control.scatter_leg_order, 1, pydgm.dgm.expansion_order
+        self.assertEqual(pydgm.dgm.delta_m.shape, (G, pydgm.control.number_angles, R, O + 1))
+        self.assertEqual(pydgm.dgm.sig_s_m.shape, (L + 1, G, G, R, O + 1))
+        np.testing.assert_array_almost_equal(pydgm.dgm.cell_volume, [1.0], 12)
+
+        names = ['phi_m', 'psi_m', 'source_m', 'chi_m', 'delta_m', 'sig_s_m',
+                 'expanded_sig_t', 'expanded_nu_sig_f', 'expanded_sig_s']
+        memory = sum(getattr(pydgm.dgm, name).size for name in names) * 8 / 2 ** 20
+        self.assertAlmostEqual(pydgm.dgm.moment_memory, memory, 12)
 
     def test_dgm_compute_flux_moments(self):
         ''' 
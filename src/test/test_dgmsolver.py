@@ -3,6 +3,8 @@ from numpy.ma.testutils import assert_almost_equal
 from bokeh.tests.test_driving import phi
 sys.path.append('../')
 
+import os
+import tempfile
 import unittest
 import pydgm
 import numpy as np
@@ -90,20 +92,10 @@ class TestDGMSOLVER(unittest.TestCase):
 
         np.testing.assert_array_almost_equal(pydgm.state.phi[0, :, :], phi_test, 12)
 
-    def test_dgmsolver_intialize_using_mass(self):
-        self.setGroups(2)
-        self.setSolver('eigen')
-        self.setMesh('10')
-        self.setBoundary('vacuum')
-        pydgm.control.material_map = [1]
-
-        sig_t = np.array([[1.0, 2.0], [1.0, 3.0]])
-        vsig_f = np.array([[0.5, 0.5], [0.0, 0.0]])
-        sig_s = np.array([[[0.3, 0.3],
-                           [0.0, 0.3]],
-                          [[0.8, 1.2],
-                           [0.0, 1.2]]])
-        chi = np.array([[1.0, 0.0], [1.0, 0.0]]).T
+    def massMatrices(self, sig_t, vsig_f, sig_s, chi):
+        '''
+        Expand the 2g cross sections with the 2g basis into one coarse group
+        '''
         basis = np.loadtxt('test/2gbasis')
 
         expansion_order = len(basis)
@@ -143,6 +135,24 @@ class TestDGMSOLVER(unittest.TestCase):
                 cg = 0
                 chi_m[cg, :, i] += basis[i, g] * chi[g, 0]
 
+        return expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, chi_m
+
+    def test_dgmsolver_intialize_using_mass(self):
+        self.setGroups(2)
+        self.setSolver('eigen')
+        self.setMesh('10')
+        self.setBoundary('vacuum')
+        pydgm.control.material_map = [1]
+
+        sig_t = np.array([[1.0, 2.0], [1.0, 3.0]])
+        vsig_f = np.array([[0.5, 0.5], [0.0, 0.0]])
+        sig_s = np.array([[[0.3, 0.3],
+                           [0.0, 0.3]],
+                          [[0.8, 1.2],
+                           [0.0, 1.2]]])
+        chi = np.array([[1.0, 0.0], [1.0, 0.0]]).T
+        expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, chi_m = self.massMatrices(sig_t, vsig_f, sig_s, chi)
+
         pydgm.dgmsolver.initialize_dgmsolver_with_moments(2, expanded_sig_t, expanded_nu_sig_f, expanded_sig_s, chi_m)
 
         # Set the test flux
@@ -161,6 +171,42 @@ class TestDGMSOLVER(unittest.TestCase):
         # Test the angular flux
         self.angular_test()
 
+    def test_dgmsolver_update_moments(self):
+        '''
+        Test that a solver initialized once and solved again with new mass
+        matrices matches a solver initialized with those mass matrices
+        '''
+        self.setGroups(2)
+        self.setSolver('eigen')
+        self.setMesh('10')
+        self.setBoundary('vacuum')
+        pydgm.control.material_map = [1]
+
+        sig_t = np.array([[1.0, 2.0], [1.0, 3.0]])
+        vsig_f = np.array([[0.5, 0.5], [0.0, 0.0]])
+        sig_s = np.array([[[0.3, 0.3],
+                           [0.0, 0.3]],
+                          [[0.8, 1.2],
+                           [0.0, 1.2]]])
+        chi = np.array([[1.0, 0.0], [1.0, 0.0]]).T
+
+        # Solve a problem with more absorption first
+        pydgm.dgmsolver.initialize_dgmsolver_with_moments(2, *self.massMatrices(1.5 * sig_t, vsig_f, sig_s, chi))
+        pydgm.dgmsolver.dgmsolve()
+        keff = float(pydgm.state.keff)
+
+        pydgm.dgmsolver.update_dgmsolver_moments(*self.massMatrices(sig_t, vsig_f, sig_s, chi))
+        pydgm.dgmsolver.dgmsolve()
+
+        # Set the test flux
+        phi_test = np.array([0.7263080826036219, 0.12171194697729938, 1.357489062141697, 0.2388759408761157, 1.8494817499319578, 0.32318764022244134, 2.199278050699694, 0.38550684315075284, 2.3812063412628075, 0.4169543421336097, 2.381206341262808, 0.41695434213360977, 2.1992780506996943, 0.38550684315075295, 1.8494817499319585, 0.3231876402224415, 1.3574890621416973, 0.23887594087611572, 0.7263080826036221, 0.12171194697729937])
+
+        self.assertLess(keff, 0.8099523232983424)
+        assert_almost_equal(pydgm.state.keff, 0.8099523232983424, 12)
+        phi = pydgm.state.phi[0, :, :].flatten('F')
+        np.testing.assert_array_almost_equal(phi / phi[0] * phi_test[0], phi_test, 12)
+        self.angular_test()
+
     def test_dgmsolver_solve_orders_fission(self):
         '''
         Test order 0 returns the same value when given the converged input for fixed problem
@@ -691,6 +737,42 @@ class TestDGMSOLVER(unittest.TestCase):
             with self.subTest(a=a):
                 np.testing.assert_array_almost_equal(pydgm.state.psi[:, a, 0].flatten(), phi_test * 0.5)
 
+    def test_dgmsolver_unfold_flux_moments_truncated(self):
+        '''
+        Test unfolding the angular flux from the truncated Legendre moments
+        '''
+        self.setGroups(7)
+        self.setSolver('fixed')
+        self.setMesh('1')
+        pydgm.control.material_map = [1]
+        self.setBoundary('reflect')
+        pydgm.control.angle_order = 4
+        pydgm.control.scatter_leg_order = 1
+        pydgm.control.delta_leg_order = 1
+        pydgm.control.truncate_delta = True
+
+        pydgm.state.initialize_state()
+
+        # Fill the flux moments with an anisotropic flux
+        phi_m = np.random.RandomState(3).rand(*pydgm.dgm.phi_m.shape)
+        pydgm.dgm.phi_m = phi_m
+
+        pydgm.dgmsolver.unfold_flux_moments()
+
+        pydgm.control.truncate_delta = False
+        pydgm.control.delta_leg_order = -1
+
+        # Unfold the moments directly
+        basis = np.zeros((int(pydgm.control.number_fine_groups), int(pydgm.dgm.expansion_order) + 1), order='F')
+        pydgm.dgm.expand_basis(basis)
+        cg_map = np.array(pydgm.control.energy_group_map) - 1
+        p_leg = pydgm.angle.p_leg
+        phi_test = np.einsum('gj,jlgc->lgc', basis, phi_m[:, :, cg_map])
+        psi_test = np.einsum('gj,jlgc,la->gac', basis, phi_m[:, :2, cg_map], p_leg[:2])
+
+        np.testing.assert_array_almost_equal(pydgm.state.phi, phi_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.state.psi, psi_test, 12)
+
     def test_dgmsolver_vacuum1(self):
         '''
         Test the 7g->2G dgm fixed source problem with vacuum boundary conditions
@@ -916,6 +998,174 @@ class TestDGMSOLVER(unittest.TestCase):
         # Test the angular flux
         self.angular_test()
 
+    def test_dgmsolver_eigenV7g_checkpoint_restart(self):
+        '''
+        Test that a recon loop resumed from a checkpoint matches an uninterrupted solve
+        '''
+        def setProblem():
+            self.setGroups(7)
+            self.setSolver('eigen')
+            self.setMesh('10')
+            self.setBoundary('vacuum')
+            pydgm.control.material_map = [1]
+            pydgm.control.lamb = 0.45
+
+        setProblem()
+        pydgm.dgmsolver.initialize_dgmsolver()
+        pydgm.dgmsolver.dgmsolve()
+        keff_test = float(pydgm.state.keff)
+        phi_test = np.copy(pydgm.state.phi)
+        count_test = int(pydgm.state.recon_count)
+        pydgm.dgmsolver.finalize_dgmsolver()
+        pydgm.control.finalize_control()
+
+        # Stop the solve part way with a checkpoint every other iteration
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = os.path.join(tmpdir.name, 'recon.chk')
+        try:
+            setProblem()
+            pydgm.control.checkpoint_name = fname.ljust(256)
+            pydgm.control.checkpoint_interval = 2
+            pydgm.control.max_recon_iters = 5
+            pydgm.dgmsolver.initialize_dgmsolver()
+            pydgm.dgmsolver.dgmsolve()
+            pydgm.dgmsolver.finalize_dgmsolver()
+            pydgm.control.finalize_control()
+            pydgm.control.checkpoint_interval = 0
+
+            setProblem()
+            pydgm.control.restart_name = fname.ljust(256)
+            pydgm.dgmsolver.initialize_dgmsolver()
+            pydgm.dgmsolver.dgmsolve()
+
+            # The checkpoint is only resumed once
+            self.assertEqual(pydgm.control.restart_name.item().strip(), b'')
+        finally:
+            pydgm.control.restart_name = ''.ljust(256)
+            pydgm.control.checkpoint_name = ''.ljust(256)
+            pydgm.control.checkpoint_interval = 0
+
+        assert_almost_equal(pydgm.state.keff, keff_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.state.phi, phi_test, 12)
+        self.assertEqual(pydgm.state.recon_count, count_test)
+
+    def test_dgmsolver_eigenV7g_anderson(self):
+        '''
+        Test that Anderson mixing of the flux moments needs fewer recon iterations
+        '''
+        # Set the variables for the test
+        self.setGroups(7)
+        self.setSolver('eigen')
+        self.setMesh('10')
+        self.setBoundary('vacuum')
+        pydgm.control.material_map = [1]
+        pydgm.control.lamb = 0.45
+
+        # Solve the problem without mixing
+        pydgm.dgmsolver.initialize_dgmsolver()
+        pydgm.dgmsolver.dgmsolve()
+        krasnoselskii_count = int(pydgm.state.recon_count)
+        pydgm.dgmsolver.finalize_dgmsolver()
+        pydgm.control.finalize_control()
+
+        self.setGroups(7)
+        self.setMesh('10')
+        pydgm.control.material_map = [1]
+        pydgm.control.recon_acceleration = 'anderson'.ljust(9)
+        pydgm.control.anderson_depth = 5
+
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        # Set the test flux
+        phi_test = np.array([0.19050251326520584, 1.9799335510805185, 0.69201814518126, 0.3927000245492841, 0.2622715078950253, 0.20936059119838546, 0.000683954269595958, 0.25253653423327665, 2.8930819653774895, 1.158606945184528, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.30559047625122115, 3.6329637815416556, 1.498034484581793, 0.9026484213739354, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502057, 0.3439534785160265, 4.153277746375052, 1.7302149163096785, 1.0513217539517374, 0.7215915434720093, 0.653666204542615, 0.0022067618449436725, 0.36402899896324237, 4.421934793951583, 1.8489909842118943, 1.127291245982061, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.36402899896324237, 4.421934793951582, 1.8489909842118946, 1.1272912459820612, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.34395347851602653, 4.153277746375052, 1.7302149163096785, 1.0513217539517377, 0.7215915434720092, 0.653666204542615, 0.002206761844943672, 0.3055904762512212, 3.6329637815416564, 1.498034484581793, 0.9026484213739353, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502063, 0.2525365342332767, 2.8930819653774895, 1.1586069451845278, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.19050251326520584, 1.9799335510805192, 0.6920181451812601, 0.3927000245492842, 0.26227150789502535, 0.20936059119838543, 0.0006839542695959579])
+
+        # Solve the problem
+        pydgm.dgmsolver.dgmsolve()
+
+        pydgm.control.recon_acceleration = 'none'.ljust(9)
+
+        # Test the eigenvalue
+        assert_almost_equal(pydgm.state.keff, 0.30413628310914226, 12)
+
+        # Test the scalar flux
+        phi = pydgm.state.phi[0, :, :].flatten('F')
+        np.testing.assert_array_almost_equal(phi / phi[0] * phi_test[0], phi_test, 12)
+
+        # Test the angular flux
+        self.angular_test()
+
+        self.assertLess(pydgm.state.recon_count, krasnoselskii_count)
+
+    def test_dgmsolver_eigenV7g_parallel_orders(self):
+        '''
+        Test that solving the higher orders concurrently matches the reference
+        '''
+        # Set the variables for the test
+        self.setGroups(7)
+        self.setSolver('eigen')
+        self.setMesh('10')
+        self.setBoundary('vacuum')
+        pydgm.control.material_map = [1]
+        pydgm.control.lamb = 0.45
+        pydgm.control.parallel_orders = True
+
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        # Set the test flux
+        phi_test = np.array([0.19050251326520584, 1.9799335510805185, 0.69201814518126, 0.3927000245492841, 0.2622715078950253, 0.20936059119838546, 0.000683954269595958, 0.25253653423327665, 2.8930819653774895, 1.158606945184528, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.30559047625122115, 3.6329637815416556, 1.498034484581793, 0.9026484213739354, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502057, 0.3439534785160265, 4.153277746375052, 1.7302149163096785, 1.0513217539517374, 0.7215915434720093, 0.653666204542615, 0.0022067618449436725, 0.36402899896324237, 4.421934793951583, 1.8489909842118943, 1.127291245982061, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.36402899896324237, 4.421934793951582, 1.8489909842118946, 1.1272912459820612, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.34395347851602653, 4.153277746375052, 1.7302149163096785, 1.0513217539517377, 0.7215915434720092, 0.653666204542615, 0.002206761844943672, 0.3055904762512212, 3.6329637815416564, 1.498034484581793, 0.9026484213739353, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502063, 0.2525365342332767, 2.8930819653774895, 1.1586069451845278, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.19050251326520584, 1.9799335510805192, 0.6920181451812601, 0.3927000245492842, 0.26227150789502535, 0.20936059119838543, 0.0006839542695959579])
+
+        # Solve the problem
+        pydgm.dgmsolver.dgmsolve()
+
+        pydgm.control.parallel_orders = False
+
+        # Test the eigenvalue
+        assert_almost_equal(pydgm.state.keff, 0.30413628310914226, 12)
+
+        # Test the scalar flux
+        phi = pydgm.state.phi[0, :, :].flatten('F')
+        np.testing.assert_array_almost_equal(phi / phi[0] * phi_test[0], phi_test, 12)
+
+        # Test the angular flux
+        self.angular_test()
+
+    def test_dgmsolver_eigenV7g_sparse_scatter(self):
+        '''
+        Test that storing only the nonzero scattering blocks matches the reference
+        '''
+        # Set the variables for the test
+        self.setGroups(7)
+        self.setSolver('eigen')
+        self.setMesh('10')
+        self.setBoundary('vacuum')
+        pydgm.control.material_map = [1]
+        pydgm.control.lamb = 0.45
+        pydgm.control.sparse_scatter = True
+
+        # Initialize the dependancies
+        pydgm.dgmsolver.initialize_dgmsolver()
+
+        # Set the test flux
+        phi_test = np.array([0.19050251326520584, 1.9799335510805185, 0.69201814518126, 0.3927000245492841, 0.2622715078950253, 0.20936059119838546, 0.000683954269595958, 0.25253653423327665, 2.8930819653774895, 1.158606945184528, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.30559047625122115, 3.6329637815416556, 1.498034484581793, 0.9026484213739354, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502057, 0.3439534785160265, 4.153277746375052, 1.7302149163096785, 1.0513217539517374, 0.7215915434720093, 0.653666204542615, 0.0022067618449436725, 0.36402899896324237, 4.421934793951583, 1.8489909842118943, 1.127291245982061, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.36402899896324237, 4.421934793951582, 1.8489909842118946, 1.1272912459820612, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.34395347851602653, 4.153277746375052, 1.7302149163096785, 1.0513217539517377, 0.7215915434720092, 0.653666204542615, 0.002206761844943672, 0.3055904762512212, 3.6329637815416564, 1.498034484581793, 0.9026484213739353, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502063, 0.2525365342332767, 2.8930819653774895, 1.1586069451845278, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.19050251326520584, 1.9799335510805192, 0.6920181451812601, 0.3927000245492842, 0.26227150789502535, 0.20936059119838543, 0.0006839542695959579])
+
+        # Solve the problem
+        pydgm.dgmsolver.dgmsolve()
+
+        pydgm.control.sparse_scatter = False
+
+        # Test the eigenvalue
+        assert_almost_equal(pydgm.state.keff, 0.30413628310914226, 12)
+
+        # Test the scalar flux
+        phi = pydgm.state.phi[0, :, :].flatten('F')
+        np.testing.assert_array_almost_equal(phi / phi[0] * phi_test[0], phi_test, 12)
+
+        # Test the angular flux
+        self.angular_test()
+
     # Test the eigenvalue solver for infinite media
 
     def test_dgmsolver_eigenR2g(self):
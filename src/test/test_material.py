@@ -1,6 +1,8 @@
 import sys
 sys.path.append('../')
 
+import os
+import tempfile
 import unittest
 import pydgm
 import numpy as np
@@ -73,6 +75,65 @@ class TestMATERIAL(unittest.TestCase):
         sig_s_test = [0.0879396, 0.0606981, 0.0464856, 0.0342624, 0.0249764, 0.016218, 0.00928166, 0.00463684, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0750404, 0.0210804, 0.00562259, -0.00512356, -0.00605188, -0.0027002, -5.57741e-05, 3.05752e-05, 0.257556, 0.109193, 0.0623677, 0.0222987, 0.00551627, -0.000785712, -0.000217445, 0.000805376, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.00355822, 0.00022365, -0.000806328, -0.000346468, 0.000518394, 0.000407935, -0.000317138, -0.000421643, 0.0541365, 0.0232098, -0.0037677, -0.0136007, -0.00631385, 0.00260433, 0.00337346, -0.000483995, 0.583345, 0.265722, 0.127938, 0.0284192, -0.0103672, -0.00810046, 0.00207444, 0.00357066, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 2.77986e-05, 1.11871e-06, -1.30906e-05, -1.77316e-06, 9.84462e-06, 2.17839e-06, -7.74945e-06, -2.39328e-06, 0.000740866, 5.10797e-05, -0.000363919, -7.55964e-05, 0.0002629, 9.27512e-05, -0.000206332, -0.000105234, 0.104898, 0.0464105, -0.0119437, -0.0281867, -0.00914859, 0.00796552, 0.00551195, -0.00336738, 0.655076, 0.338951, 0.163434, 0.0347732, -0.014664, -0.0103887, 0.00317343, 0.00465138, 4.09472e-08, 4.08948e-08, 4.07903e-08, 4.06338e-08, 4.04257e-08, 4.01666e-08, 3.9857e-08, 3.94977e-08, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 2.5065e-07, 7.90244e-08, -8.74569e-08, -9.81195e-08, 1.10188e-08, 8.36764e-08, 3.89832e-08, -4.77198e-08, 9.61778e-06, 8.4521e-07, -4.61924e-06, -1.18157e-06, 3.2012e-06, 1.36076e-06, -2.37655e-06, -1.42839e-06, 0.00137468, 8.81482e-05, -0.000675138, -0.000130248, 0.000485488, 0.00015849, -0.000378326, -0.000177931, 0.12866, 0.056289, -0.0152533, -0.0343655, -0.0108021, 0.0097357, 0.00671799, -0.00381995, 0.656076, 0.350086, 0.159275, 0.0306974, -0.0120426, -0.00668616, 0.00323594, 0.00275299, 0.00259756, 0.00147068, 0.000651605, 0.000139609, -7.90709e-05, -0.000146264, -0.000141253, -0.000100376, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 9.14102e-08, 4.05994e-08, -9.73696e-09, -2.35129e-08, -1.1876e-08, 4.92028e-10, 5.64279e-09, 4.92937e-09, 1.64171e-05, 1.52651e-06, -6.08385e-06, -1.37522e-06, 2.81771e-06, 9.09906e-07, -1.32883e-06, -5.07491e-07, 0.00156415, 8.72393e-05, -0.000596066, -9.67173e-05, 0.000287099, 7.86088e-05, -0.000135358, -5.36397e-05, 0.124816, 0.0341514, -0.0114264, -0.0118027, -0.00341444, 0.00061962, -0.00137936, -0.00167068, 1.21013, 0.335178, 0.0831993, 0.0253386, -0.00589629, 0.00508266, -0.0124162, -0.000132203, 3.07391, -0.0918581, -0.0831578, -0.0340589, -0.0397422, -0.0123302, -0.0511599, -0.00604631, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 3.56495e-08, 2.54202e-08, 1.08365e-08, -3.6197e-10, -3.65092e-09, -2.416e-10, 4.55678e-09, 5.60963e-09, 6.63537e-06, -2.27065e-08, -3.44519e-07, 5.91797e-08, -5.36598e-08, -1.3637e-09, 7.15057e-08, 4.65949e-08, 0.000296306, 2.23088e-07, -1.75888e-06, 3.55369e-07, -1.3927e-06, -7.30074e-07, -3.19381e-06, 6.3792e-07, 0.0119, -0.000375452, -0.000318901, -0.000122848, -0.000145178, -4.32521e-05, -0.000193124, -2.22286e-05, 1.24284, 0.273954, 0.100243, 0.0519744, 0.0199418, 0.0242043, -0.00441744, 0.0190722]
         np.testing.assert_array_equal(pydgm.material.sig_s[:, :, :, 0].flatten('F'), sig_s_test)
 
+    def test_material_binary_library(self):
+        '''
+        Test that a library converted to the binary format matches the text library
+        '''
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../pythonTools/makeXS'))
+        from writeBinaryXS import readAnlxs, writeBinaryXS, readBinaryXS
+
+        names = ['number_materials', 'ebounds', 'velocity', 'sig_t', 'sig_f', 'nu_sig_f', 'chi', 'sig_s']
+        text = {name: np.copy(getattr(pydgm.material, name)) for name in names}
+        pydgm.material.finalize_material()
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = os.path.join(tmpdir.name, '7gXS.bin')
+        writeBinaryXS(readAnlxs('test/7gXS.anlxs'), fname)
+        pydgm.control.xs_name = fname.ljust(256)
+        pydgm.material.create_material()
+        pydgm.control.xs_name = 'test/7gXS.anlxs'.ljust(256)
+
+        for name in names:
+            np.testing.assert_array_equal(getattr(pydgm.material, name), text[name], name)
+        self.assertEqual(pydgm.control.number_legendre, 7)
+
+        # The layout can also be memory mapped
+        xs = readBinaryXS(fname)
+        np.testing.assert_array_equal(xs['sig_s'], text['sig_s'])
+        self.assertEqual(xs['materials']['name'][0], b'uo2')
+
+    def test_material_load_used_materials(self):
+        '''
+        Test that only the materials in material_map are loaded
+        '''
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../pythonTools/makeXS'))
+        from writeBinaryXS import readAnlxs, writeBinaryXS
+
+        names = ['sig_t', 'sig_f', 'nu_sig_f', 'chi', 'sig_s']
+        full = {name: np.copy(getattr(pydgm.material, name)) for name in names}
+        pydgm.material.finalize_material()
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = os.path.join(tmpdir.name, '7gXS.bin')
+        writeBinaryXS(readAnlxs('test/7gXS.anlxs'), fname)
+
+        pydgm.control.load_used_materials = True
+        for xs_name in ['test/7gXS.anlxs', fname]:
+            pydgm.control.xs_name = xs_name.ljust(256)
+            pydgm.material.create_material()
+
+            self.assertEqual(pydgm.material.number_materials, 2)
+            np.testing.assert_array_equal(pydgm.material.library_material, [1, 5])
+            for name in names:
+                np.testing.assert_array_equal(getattr(pydgm.material, name), full[name][..., [0, 4]], name)
+            pydgm.material.finalize_material()
+
+        pydgm.control.load_used_materials = False
+        pydgm.control.xs_name = 'test/7gXS.anlxs'.ljust(256)
+        pydgm.material.create_material()
+
     def tearDown(self):
         pydgm.material.finalize_material()
 
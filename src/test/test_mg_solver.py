@@ -74,6 +74,207 @@ class TestMG_SOLVER(unittest.TestCase):
         np.testing.assert_array_almost_equal(phi, phi_test, 12)
         np.testing.assert_array_almost_equal(incident, incident_test, 12)
 
+    def test_mg_solver_group_blocks(self):
+        '''
+        Test that sweeping the groups in concurrent blocks matches the reference
+        '''
+
+        pydgm.control.number_group_blocks = 3
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.number_group_blocks = 1
+
+        phi_test = [[[161.534959460539], [25.4529297193052813], [6.9146161770064944]]]
+        incident_test = np.array([[80.7674797302686329, 80.7674797302685761],
+                                  [12.7264648596526406, 12.7264648596526424],
+                                  [3.4573080885032477, 3.4573080885032477]])
+
+        phi = pydgm.state.mg_phi
+        incident = pydgm.state.mg_incident_x[:, :, 0, 0]
+
+        np.testing.assert_array_almost_equal(phi, phi_test, 12)
+        np.testing.assert_array_almost_equal(incident, incident_test, 12)
+        self.assertGreater(pydgm.state.group_block_speedup, 0.0)
+
+    def test_mg_solver_gauss_seidel(self):
+        '''
+        Test that Gauss-Seidel iteration in energy matches the reference
+        '''
+
+        pydgm.control.energy_iteration = 'gauss_seidel'.ljust(12)
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.energy_iteration = 'jacobi'.ljust(12)
+
+        phi_test = [[[161.534959460539], [25.4529297193052813], [6.9146161770064944]]]
+        incident_test = np.array([[80.7674797302686329, 80.7674797302685761],
+                                  [12.7264648596526406, 12.7264648596526424],
+                                  [3.4573080885032477, 3.4573080885032477]])
+
+        phi = pydgm.state.mg_phi
+        incident = pydgm.state.mg_incident_x[:, :, 0, 0]
+
+        np.testing.assert_array_almost_equal(phi, phi_test, 12)
+        np.testing.assert_array_almost_equal(incident, incident_test, 12)
+
+    def test_mg_solver_gauss_seidel_upscatter_only(self):
+        '''
+        Test that only iterating on the upscatter block needs fewer outer iterations
+        '''
+
+        pydgm.mg_solver.mg_solve()
+        jacobi_count = int(pydgm.state.outer_count)
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+        self.setUp()
+
+        pydgm.control.energy_iteration = 'gauss_seidel'.ljust(12)
+        pydgm.control.upscatter_only = True
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.energy_iteration = 'jacobi'.ljust(12)
+        pydgm.control.upscatter_only = False
+
+        phi_test = [[[161.534959460539], [25.4529297193052813], [6.9146161770064944]]]
+        incident_test = np.array([[80.7674797302686329, 80.7674797302685761],
+                                  [12.7264648596526406, 12.7264648596526424],
+                                  [3.4573080885032477, 3.4573080885032477]])
+
+        phi = pydgm.state.mg_phi
+        incident = pydgm.state.mg_incident_x[:, :, 0, 0]
+
+        np.testing.assert_array_almost_equal(phi, phi_test, 12)
+        np.testing.assert_array_almost_equal(incident, incident_test, 12)
+        self.assertLess(pydgm.state.outer_count, jacobi_count)
+
+    def test_mg_solver_dsa(self):
+        '''
+        Test that diffusion synthetic acceleration needs fewer outer iterations
+        '''
+
+        # The correction amplifies round off in the sweep
+        pydgm.control.outer_tolerance = 1e-10
+
+        pydgm.mg_solver.mg_solve()
+        si_count = int(pydgm.state.outer_count)
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+        self.setUp()
+
+        pydgm.control.outer_tolerance = 1e-10
+        pydgm.control.use_dsa = True
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.use_dsa = False
+
+        phi_test = [[[161.534959460539], [25.4529297193052813], [6.9146161770064944]]]
+        incident_test = np.array([[80.7674797302686329, 80.7674797302685761],
+                                  [12.7264648596526406, 12.7264648596526424],
+                                  [3.4573080885032477, 3.4573080885032477]])
+
+        phi = pydgm.state.mg_phi
+        incident = pydgm.state.mg_incident_x[:, :, 0, 0]
+
+        np.testing.assert_array_almost_equal(phi, phi_test, 8)
+        np.testing.assert_array_almost_equal(incident, incident_test, 8)
+        self.assertLess(pydgm.state.outer_count, si_count)
+
+    def test_mg_solver_dsa_2D_thick(self):
+        '''
+        Test that DSA accelerates a 2D problem with cells several mean free paths thick
+        '''
+
+        def setProblem():
+            pydgm.solver.finalize_solver()
+            pydgm.control.finalize_control()
+            pydgm.control.spatial_dimension = 2
+            pydgm.control.fine_mesh_x = [4]
+            pydgm.control.fine_mesh_y = [4]
+            pydgm.control.coarse_mesh_x = [0.0, 16.0]
+            pydgm.control.coarse_mesh_y = [0.0, 16.0]
+            pydgm.control.material_map = [1]
+            pydgm.control.boundary_east = 0.0
+            pydgm.control.boundary_west = 0.0
+            pydgm.control.boundary_north = 0.0
+            pydgm.control.boundary_south = 0.0
+            pydgm.control.angle_order = 4
+            pydgm.control.outer_tolerance = 1e-10
+            pydgm.solver.initialize_solver()
+
+        try:
+            setProblem()
+            pydgm.mg_solver.mg_solve()
+            si_count = int(pydgm.state.outer_count)
+            phi_test = np.copy(pydgm.state.mg_phi)
+
+            setProblem()
+            pydgm.control.use_dsa = True
+            pydgm.mg_solver.mg_solve()
+        finally:
+            pydgm.control.use_dsa = False
+            pydgm.control.spatial_dimension = 1
+
+        np.testing.assert_allclose(pydgm.state.mg_phi, phi_test, rtol=1e-8)
+        self.assertLess(pydgm.state.outer_count, si_count // 4)
+
+    def test_mg_solver_dsa_reflective_no_removal(self):
+        '''
+        Test that DSA leaves a group without removal or leakage to the sweep
+        '''
+
+        # Scatter everything in group 1 back into group 1
+        pydgm.state.mg_sig_s[0, 0, 0, :] = pydgm.state.mg_sig_t[0, :]
+
+        pydgm.control.max_outer_iters = 5
+        pydgm.control.use_dsa = True
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.use_dsa = False
+
+        self.assertTrue(np.all(np.isfinite(pydgm.state.mg_phi)))
+        self.assertTrue(np.all(np.isfinite(pydgm.state.mg_incident_x)))
+
+    def test_mg_solver_gmres(self):
+        '''
+        Test that GMRES matches the reference with fewer sweeps than source iteration
+        '''
+
+        pydgm.control.outer_tolerance = 1e-12
+
+        pydgm.mg_solver.mg_solve()
+        si_count = int(pydgm.state.sweep_count)
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+        self.setUp()
+
+        pydgm.control.outer_tolerance = 1e-12
+        pydgm.control.iteration_type = 'gmres'.ljust(6)
+
+        pydgm.mg_solver.mg_solve()
+
+        pydgm.control.iteration_type = 'source'.ljust(6)
+
+        phi_test = [[[161.534959460539], [25.4529297193052813], [6.9146161770064944]]]
+        incident_test = np.array([[80.7674797302686329, 80.7674797302685761],
+                                  [12.7264648596526406, 12.7264648596526424],
+                                  [3.4573080885032477, 3.4573080885032477]])
+
+        phi = pydgm.state.mg_phi
+        incident = pydgm.state.mg_incident_x[:, :, 0, 0]
+
+        np.testing.assert_array_almost_equal(phi, phi_test, 10)
+        np.testing.assert_array_almost_equal(incident, incident_test, 10)
+        self.assertTrue(pydgm.control.outer_converged)
+        self.assertLess(pydgm.state.sweep_count, si_count)
+
     def tearDown(self):
         pydgm.solver.finalize_solver()
         pydgm.control.finalize_control()
@@ -1,6 +1,8 @@
 import sys
 sys.path.append('../')
 
+import os
+import tempfile
 import unittest
 import pydgm
 import numpy as np
@@ -237,6 +239,31 @@ class TestSOLVER(unittest.TestCase):
         # Test the angular flux
         self.angular_test()
 
+    def test_solver_load_used_materials(self):
+        '''
+        Test that loading only the mapped materials leaves the solution unchanged
+        '''
+
+        self.setSolver('fixed')
+        pydgm.control.angle_order = 4
+
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        phi_test = np.copy(pydgm.state.mg_phi)
+        pydgm.solver.finalize_solver()
+
+        pydgm.control.load_used_materials = True
+        pydgm.solver.initialize_solver()
+        pydgm.control.load_used_materials = False
+
+        # Only the fuel and the water are kept
+        self.assertEqual(pydgm.control.number_regions, 2)
+        np.testing.assert_array_equal(np.unique(pydgm.mesh.mmap), [1, 2])
+
+        pydgm.solver.solve()
+
+        np.testing.assert_array_almost_equal(pydgm.state.mg_phi, phi_test, 12)
+
     def test_solver_2med_ref_7g(self):
         '''
         Test fixed source problem with reflective conditions with 7g
@@ -369,6 +396,271 @@ class TestSOLVER(unittest.TestCase):
         # Test the angular flux
         self.angular_test()
 
+    def test_solver_eigen_checkpoint_restart(self):
+        '''
+        Test that an eigen solve resumed from a checkpoint matches an uninterrupted solve
+        '''
+
+        pydgm.control.fine_mesh_x = [10]
+        pydgm.control.coarse_mesh_x = [0.0, 10.0]
+        pydgm.control.material_map = [1]
+        pydgm.control.angle_order = 2
+        pydgm.control.eigen_tolerance = 1e-12
+        self.setSolver('eigen')
+
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        keff_test = float(pydgm.state.keff)
+        phi_test = np.copy(pydgm.state.mg_phi)
+        count_test = int(pydgm.state.eigen_count)
+        pydgm.solver.finalize_solver()
+
+        # Stop the solve part way with a checkpoint of the last iteration
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = os.path.join(tmpdir.name, 'eigen.chk')
+        try:
+            pydgm.control.checkpoint_name = fname.ljust(256)
+            pydgm.control.checkpoint_interval = 1
+            pydgm.control.max_eigen_iters = 5
+            pydgm.solver.initialize_solver()
+            pydgm.solver.solve()
+            pydgm.solver.finalize_solver()
+            pydgm.control.checkpoint_interval = 0
+            pydgm.control.max_eigen_iters = 10000
+
+            pydgm.control.restart_name = fname.ljust(256)
+            pydgm.solver.initialize_solver()
+            pydgm.solver.solve()
+
+            self.assertAlmostEqual(pydgm.state.keff, keff_test, 12)
+            np.testing.assert_array_almost_equal(pydgm.state.mg_phi, phi_test, 12)
+            self.assertEqual(pydgm.state.eigen_count, count_test)
+
+            # The checkpoint is only resumed once
+            self.assertEqual(pydgm.control.restart_name.item().strip(), b'')
+            pydgm.solver.finalize_solver()
+
+            # A checkpoint cut short is ignored
+            with open(fname, 'r+b') as f:
+                f.truncate(os.path.getsize(fname) - 8)
+            pydgm.control.restart_name = fname.ljust(256)
+            pydgm.solver.initialize_solver()
+            pydgm.solver.solve()
+
+            self.assertAlmostEqual(pydgm.state.keff, keff_test, 12)
+            self.assertEqual(pydgm.state.eigen_count, count_test)
+        finally:
+            pydgm.control.restart_name = ''.ljust(256)
+            pydgm.control.checkpoint_name = ''.ljust(256)
+            pydgm.control.checkpoint_interval = 0
+
+    def test_solver_update_cross_sections(self):
+        '''
+        Test that a solver initialized once and solved again with new cross
+        sections matches a solver initialized with those cross sections
+        '''
+
+        pydgm.control.fine_mesh_x = [10]
+        pydgm.control.coarse_mesh_x = [0.0, 10.0]
+        pydgm.control.material_map = [2]
+        pydgm.control.angle_order = 2
+        pydgm.control.eigen_tolerance = 1e-12
+        self.setSolver('eigen')
+
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        keff_test = float(pydgm.state.keff)
+        phi_test = np.copy(pydgm.state.mg_phi)
+        xs = [np.copy(pydgm.state.mg_sig_t), np.copy(pydgm.state.mg_nu_sig_f),
+              np.copy(pydgm.state.mg_chi), np.copy(pydgm.state.mg_sig_s)]
+        pydgm.solver.finalize_solver()
+
+        pydgm.control.material_map = [1]
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        self.assertNotAlmostEqual(pydgm.state.keff, keff_test, 3)
+
+        # Put the second material in the place of the first one
+        order = [1, 0] + list(range(2, xs[0].shape[1]))
+        pydgm.solver.update_cross_sections(*[x[..., order] for x in xs])
+        pydgm.solver.solve()
+
+        self.assertAlmostEqual(pydgm.state.keff, keff_test, 10)
+        phi = pydgm.state.mg_phi
+        np.testing.assert_array_almost_equal(phi / phi[0, 0, 0], phi_test / phi_test[0, 0, 0], 10)
+
+    def test_solver_initialize_with_xs(self):
+        '''
+        Test that cross sections passed as arrays match those read from the library
+        '''
+
+        pydgm.control.fine_mesh_x = [10]
+        pydgm.control.coarse_mesh_x = [0.0, 10.0]
+        pydgm.control.material_map = [2]
+        pydgm.control.angle_order = 2
+        pydgm.control.eigen_tolerance = 1e-12
+        self.setSolver('eigen')
+
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        keff_test = float(pydgm.state.keff)
+        phi_test = np.copy(pydgm.state.mg_phi)
+        xs = [np.copy(pydgm.state.mg_sig_t), np.copy(pydgm.state.mg_nu_sig_f),
+              np.copy(pydgm.state.mg_chi), np.copy(pydgm.state.mg_sig_s)]
+        pydgm.solver.finalize_solver()
+
+        # Only pass the first two materials
+        pydgm.control.xs_name = 'missing.anlxs'.ljust(256)
+        pydgm.solver.initialize_solver_with_xs(*[x[..., :2] for x in xs])
+        pydgm.solver.solve()
+
+        self.assertEqual(pydgm.material.number_materials, 2)
+        self.assertAlmostEqual(pydgm.state.keff, keff_test, 12)
+        np.testing.assert_array_almost_equal(pydgm.state.mg_phi, phi_test, 12)
+
+    def test_solver_update_source(self):
+        '''
+        Test that a fixed source solve scales with a new source
+        '''
+
+        pydgm.control.fine_mesh_x = [10]
+        pydgm.control.coarse_mesh_x = [0.0, 10.0]
+        pydgm.control.material_map = [1]
+        pydgm.control.angle_order = 2
+        self.setSolver('fixed')
+
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        phi_test = 2 * pydgm.state.mg_phi
+
+        pydgm.solver.update_source(2.0)
+        pydgm.solver.solve()
+
+        np.testing.assert_array_almost_equal(pydgm.state.mg_phi / phi_test, np.ones(phi_test.shape), 12)
+
+    def test_solver_eigenV7g_cmfd(self):
+        '''
+        Test that CMFD on the coarse mesh needs fewer eigen iterations
+        '''
+
+        # Set the variables for the test
+        pydgm.control.fine_mesh_x = [10]
+        pydgm.control.coarse_mesh_x = [0.0, 10.0]
+        pydgm.control.material_map = [1]
+        pydgm.control.angle_order = 2
+        pydgm.control.eigen_tolerance = 1e-12
+        self.setSolver('eigen')
+
+        # Solve the problem without acceleration
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        power_count = int(pydgm.state.eigen_count)
+        pydgm.solver.finalize_solver()
+
+        # Split the problem into five coarse regions
+        pydgm.control.fine_mesh_x = [2, 2, 2, 2, 2]
+        pydgm.control.coarse_mesh_x = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+        pydgm.control.material_map = [1, 1, 1, 1, 1]
+        pydgm.control.use_cmfd = True
+
+        # Initialize the dependancies
+        pydgm.solver.initialize_solver()
+
+        assert(pydgm.control.number_groups == 7)
+
+        phi_test = [0.19050251326520584, 1.9799335510805185, 0.69201814518126, 0.3927000245492841, 0.2622715078950253, 0.20936059119838546, 0.000683954269595958, 0.25253653423327665, 2.8930819653774895, 1.158606945184528, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.30559047625122115, 3.6329637815416556, 1.498034484581793, 0.9026484213739354, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502057, 0.3439534785160265, 4.153277746375052, 1.7302149163096785, 1.0513217539517374, 0.7215915434720093, 0.653666204542615, 0.0022067618449436725, 0.36402899896324237, 4.421934793951583, 1.8489909842118943, 1.127291245982061, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.36402899896324237, 4.421934793951582, 1.8489909842118946, 1.1272912459820612, 0.7756443978822711, 0.705581398687358, 0.0023773065003326204, 0.34395347851602653, 4.153277746375052, 1.7302149163096785, 1.0513217539517377, 0.7215915434720092, 0.653666204542615, 0.002206761844943672, 0.3055904762512212, 3.6329637815416564, 1.498034484581793, 0.9026484213739353, 0.6162114941108023, 0.5517562407150877, 0.0018540270157502063, 0.2525365342332767, 2.8930819653774895, 1.1586069451845278, 0.6858113244922716, 0.4639601075261923, 0.4060114930207368, 0.0013808859451732852, 0.19050251326520584, 1.9799335510805192, 0.6920181451812601, 0.3927000245492842, 0.26227150789502535, 0.20936059119838543, 0.0006839542695959579]
+
+        # Solve the problem
+        pydgm.solver.solve()
+
+        pydgm.control.use_cmfd = False
+
+        # Test the eigenvalue
+        self.assertAlmostEqual(pydgm.state.keff, 0.30413628310914226, 10)
+
+        # Test the scalar flux
+        phi = pydgm.state.mg_phi[0, :, :].flatten('F')
+        np.testing.assert_array_almost_equal(phi / phi[0] * phi_test[0], phi_test, 10)
+
+        self.assertLess(pydgm.state.eigen_count, power_count)
+
+    def solve_large_slab(self, acceleration):
+        '''
+        Solve a slab with a large dominance ratio and return keff and the flux
+        '''
+
+        # Set the variables for the test
+        pydgm.control.fine_mesh_x = [50]
+        pydgm.control.coarse_mesh_x = [0.0, 100.0]
+        pydgm.control.material_map = [1]
+        pydgm.control.angle_order = 2
+        pydgm.control.eigen_tolerance = 1e-10
+        pydgm.control.eigen_acceleration = acceleration.ljust(9)
+
+        # Solve the problem
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+
+        pydgm.control.eigen_acceleration = 'none'.ljust(9)
+
+        return pydgm.state.keff, pydgm.state.mg_phi[0, :, :].flatten('F')
+
+    def test_solver_eigen_wielandt(self):
+        '''
+        Test that a Wielandt shift needs fewer eigen iterations with converged inners
+        '''
+
+        self.setSolver('eigen')
+        pydgm.control.max_outer_iters = 1000
+
+        keff_test, phi_test = self.solve_large_slab('none')
+        power_count = int(pydgm.state.eigen_count)
+        pydgm.solver.finalize_solver()
+
+        pydgm.control.wielandt_shift = 0.1
+        keff, phi = self.solve_large_slab('wielandt')
+
+        self.assertAlmostEqual(keff, keff_test, 9)
+        np.testing.assert_array_almost_equal(phi, phi_test, 8)
+        self.assertLess(pydgm.state.eigen_count, power_count)
+        self.assertLess(pydgm.state.eigen_spectral_radius, 1.0)
+
+    def test_solver_eigen_chebyshev(self):
+        '''
+        Test that Chebyshev extrapolation needs fewer eigen iterations
+        '''
+
+        self.setSolver('eigen')
+
+        keff_test, phi_test = self.solve_large_slab('none')
+        power_count = int(pydgm.state.eigen_count)
+        pydgm.solver.finalize_solver()
+
+        keff, phi = self.solve_large_slab('chebyshev')
+
+        self.assertAlmostEqual(keff, keff_test, 9)
+        np.testing.assert_array_almost_equal(phi, phi_test, 8)
+        self.assertLess(pydgm.state.eigen_count, power_count)
+
+    def test_solver_eigen_anderson(self):
+        '''
+        Test that Anderson mixing of the fission source needs fewer eigen iterations
+        '''
+
+        self.setSolver('eigen')
+
+        keff_test, phi_test = self.solve_large_slab('none')
+        power_count = int(pydgm.state.eigen_count)
+        pydgm.solver.finalize_solver()
+
+        pydgm.control.anderson_depth = 5
+        keff, phi = self.solve_large_slab('anderson')
+
+        self.assertAlmostEqual(keff, keff_test, 9)
+        np.testing.assert_array_almost_equal(phi, phi_test, 8)
+        self.assertLess(pydgm.state.eigen_count, power_count)
+
     def test_solver_eigenR1g(self):
         '''
         Test eigenvalue source problem with reflective conditions and 1g
@@ -788,6 +1080,43 @@ class TestSOLVER(unittest.TestCase):
         # Test the angular flux
         self.angular_test()
 
+    def test_solver_parallel_sweep(self):
+        '''
+        Test that the threaded sweep reproduces the serial sweep
+        '''
+
+        def set_parameters():
+            self.setUp()
+            pydgm.control.coarse_mesh_x = [0.0, 0.09, 1.17, 1.26]
+            pydgm.control.material_map = [5, 1, 5]
+            pydgm.control.xs_name = 'test/partisn_cross_sections/anisotropic_2g'.ljust(256)
+            pydgm.control.angle_order = 8
+            pydgm.control.scatter_leg_order = 7
+            pydgm.control.boundary_east = 1.0
+            self.setSolver('fixed')
+            pydgm.control.max_outer_iters = 50
+
+        # Solve the reference problem with the serial sweep
+        set_parameters()
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+
+        ref_phi = pydgm.state.mg_phi * 1
+        ref_psi = pydgm.state.mg_psi * 1
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+
+        # Solve the same problem with the threaded sweep
+        set_parameters()
+        pydgm.control.parallel_sweep = True
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        pydgm.control.parallel_sweep = False
+
+        np.testing.assert_array_equal(pydgm.state.mg_phi, ref_phi)
+        np.testing.assert_array_equal(pydgm.state.mg_psi, ref_psi)
+
     def test_solver_1loop(self):
 
         def set_parameters():
@@ -850,6 +1179,8 @@ class TestSOLVER(unittest.TestCase):
     def tearDown(self):
         pydgm.solver.finalize_solver()
         pydgm.control.finalize_control()
+        pydgm.control.wielandt_shift = 0.1
+        pydgm.control.anderson_depth = 5
 
 
 class TestSOLVER_2D(unittest.TestCase):
@@ -939,6 +1270,69 @@ class TestSOLVER_2D(unittest.TestCase):
             pydgm.control.coarse_mesh_y = [0.0, 1.0]
             pydgm.control.material_map = [1]
 
+    def test_solver_parallel_sweep_2D(self):
+        '''
+        Test that the wavefront sweep reproduces the serial sweep
+        '''
+
+        def set_parameters():
+            self.setUp()
+            self.set_mesh('c5g7')
+            pydgm.control.scatter_leg_order = 1
+            pydgm.control.max_outer_iters = 10
+
+        # Solve the reference problem with the serial sweep
+        set_parameters()
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+
+        ref_phi = pydgm.state.mg_phi * 1
+        ref_psi = pydgm.state.mg_psi * 1
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+
+        # Solve the same problem with the wavefront sweep
+        set_parameters()
+        pydgm.control.parallel_sweep = True
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        pydgm.control.parallel_sweep = False
+
+        np.testing.assert_array_equal(pydgm.state.mg_phi, ref_phi)
+        np.testing.assert_array_equal(pydgm.state.mg_psi, ref_psi)
+
+    def test_solver_group_blocks_2D(self):
+        '''
+        Test that sweeping the groups in concurrent blocks reproduces the default sweep
+        '''
+
+        def set_parameters():
+            self.setUp()
+            self.set_mesh('simple')
+            pydgm.control.max_outer_iters = 10
+
+        # Solve the reference problem sweeping all groups together
+        set_parameters()
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+
+        ref_phi = pydgm.state.mg_phi * 1
+        ref_psi = pydgm.state.mg_psi * 1
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+
+        # Solve the same problem with one block per group
+        set_parameters()
+        pydgm.control.number_group_blocks = 2
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        pydgm.control.number_group_blocks = 1
+
+        np.testing.assert_array_equal(pydgm.state.mg_phi, ref_phi)
+        np.testing.assert_array_equal(pydgm.state.mg_psi, ref_psi)
+
     def test_solver_basic_2D_1g_reflect(self):
         '''
         Test for a basic 1 group problem
@@ -1180,6 +1574,49 @@ class TestSOLVER_2D(unittest.TestCase):
 
         self.angular_test()
 
+    def test_solver_eigen_cmfd_2D(self):
+        '''
+        Test that CMFD on a 2D coarse mesh keeps the unaccelerated solution
+        '''
+
+        def set_parameters():
+            self.setUp()
+            self.set_eigen()
+            pydgm.control.fine_mesh_x = [2] * 6
+            pydgm.control.fine_mesh_y = [2] * 4
+            pydgm.control.coarse_mesh_x = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+            pydgm.control.coarse_mesh_y = [0.0, 1.0, 2.0, 3.0, 4.0]
+            pydgm.control.material_map = [1] * 24
+            pydgm.control.angle_order = 2
+            pydgm.control.boundary_east = 0.0
+            pydgm.control.boundary_west = 0.0
+            pydgm.control.boundary_north = 0.0
+            pydgm.control.boundary_south = 0.0
+
+        # Solve the problem without acceleration
+        set_parameters()
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+
+        keff_test = float(pydgm.state.keff)
+        phi_test = pydgm.state.mg_phi[0] * 1
+        power_count = int(pydgm.state.eigen_count)
+
+        pydgm.solver.finalize_solver()
+        pydgm.control.finalize_control()
+
+        # Solve the same problem with CMFD on the 6 x 4 coarse regions
+        set_parameters()
+        pydgm.control.use_cmfd = True
+        pydgm.solver.initialize_solver()
+        pydgm.solver.solve()
+        pydgm.control.use_cmfd = False
+
+        self.assertAlmostEqual(pydgm.state.keff, keff_test, 10)
+        phi = pydgm.state.mg_phi[0]
+        np.testing.assert_array_almost_equal(phi / np.linalg.norm(phi), phi_test / np.linalg.norm(phi_test), 10)
+        self.assertLess(pydgm.state.eigen_count, power_count)
+
     def test_solver_partisn_eigen_2g_l0_simple(self):
         '''
         Test eigenvalue source problem with reflective conditions and 2g
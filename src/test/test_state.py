@@ -1,6 +1,9 @@
 import sys
 sys.path.append('../')
 
+import os
+import shutil
+import tempfile
 import unittest
 import pydgm
 import numpy as np
@@ -60,6 +63,73 @@ class TestSTATE(unittest.TestCase):
 
         np.testing.assert_array_almost_equal(pydgm.state.mg_density, density_test, 12)
 
+    def test_state_scatter_kernel_resize(self):
+        '''
+        Test that a scattering kernel cached for another problem size is rebuilt
+        '''
+        pydgm.control.fine_mesh_x = [3, 10, 3]
+        pydgm.control.coarse_mesh_x = [0.0, 1.0, 2.0, 3.0]
+        pydgm.control.material_map = [1, 2, 6]
+
+        pydgm.solver.initialize_solver()
+
+        # Replace the cache with arrays sized for a smaller problem
+        pydgm.state.mg_sig_s_t = np.zeros((2, 2, 1, 1), order='F')
+        pydgm.state.region_offset = [1, 2]
+        pydgm.state.region_cells = [1]
+
+        pydgm.state.update_scatter_kernel()
+
+        self.assertEqual(pydgm.state.mg_sig_s_t.shape, (7, 7, 1, pydgm.control.number_regions))
+        np.testing.assert_array_equal(pydgm.state.mg_sig_s_t[:, :, 0, :],
+                                      pydgm.state.mg_sig_s[0].transpose(1, 0, 2))
+        np.testing.assert_array_equal(pydgm.state.region_offset, [1, 4, 14, 14, 14, 14, 17])
+        np.testing.assert_array_equal(pydgm.state.region_cells, np.arange(1, 17))
+
+    def test_state_flux_file(self):
+        '''
+        Test that a saved flux can be memory mapped and used as the initial flux
+        '''
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../pythonTools'))
+        from readFlux import readFlux
+
+        pydgm.control.fine_mesh_x = [3]
+        pydgm.control.store_psi = True
+        pydgm.state.initialize_state()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        phi_test = np.random.rand(*pydgm.state.phi.shape)
+        psi_test = np.random.rand(*pydgm.state.psi.shape)
+        pydgm.state.write_flux(os.path.join(directory, 'flux_phi.bin'), 'phi', phi_test)
+        pydgm.state.write_flux(os.path.join(directory, 'flux_psi.bin'), 'psi', psi_test)
+
+        info, phi = readFlux(os.path.join(directory, 'flux_phi.bin'))
+        self.assertEqual(info['name'], 'phi')
+        self.assertEqual(info['shape'], phi_test.shape)
+        self.assertEqual(info['groups'], 7)
+        self.assertEqual(info['angles'], 4)
+        self.assertEqual(info['moments'], phi_test.shape[0] - 1)
+        self.assertEqual(info['cells'], 3)
+        np.testing.assert_array_equal(phi, phi_test)
+        info, psi = readFlux(os.path.join(directory, 'flux_psi.bin'))
+        np.testing.assert_array_equal(psi[:, :, 1], psi_test[:, :, 1])
+
+        # Restart from the saved flux
+        pydgm.solver.finalize_solver()
+        pydgm.control.initial_phi = os.path.join(directory, 'flux_phi.bin').ljust(256)
+        pydgm.control.initial_psi = os.path.join(directory, 'flux_psi.bin').ljust(256)
+        pydgm.state.initialize_state()
+        pydgm.control.initial_phi = ''.ljust(256)
+        pydgm.control.initial_psi = ''.ljust(256)
+
+        np.testing.assert_array_equal(pydgm.state.phi, phi_test)
+        np.testing.assert_array_equal(pydgm.state.psi, psi_test)
+
+        del phi, psi
+        for name in ['phi', 'psi']:
+            os.remove(os.path.join(directory, 'flux_{}.bin'.format(name)))
+
     def tearDown(self):
         # Finalize the dependancies
         pydgm.solver.finalize_solver()
@@ -82,6 +82,32 @@ class TestSWEEPER_1D(unittest.TestCase):
         np.testing.assert_array_almost_equal(inc, np.ones(N) * 0.5373061574106336, 12)
         np.testing.assert_array_almost_equal(Ps, np.ones(N) * 0.5373061574106336, 12)
 
+    def test_sweeper_closure_cache(self):
+        '''
+        Test that the cached closure coefficients match computing the closure directly
+        '''
+        pydgm.control.equation_type = 'SC'
+
+        phi = pydgm.state.mg_phi.copy()
+        incident = pydgm.state.mg_incident_x.copy()
+
+        pydgm.sweeper_1d.apply_transport_operator_1d(pydgm.state.mg_phi)
+        self.assertTrue(pydgm.sweeper_1d.closure_cached)
+        phi_cached = pydgm.state.mg_phi.copy()
+
+        # Force the fallback by disabling the cache
+        pydgm.sweeper_1d.finalize_sweeper_1d()
+        pydgm.control.closure_cache_limit = 0.0
+        pydgm.state.mg_phi = phi
+        pydgm.state.mg_incident_x = incident
+
+        pydgm.sweeper_1d.apply_transport_operator_1d(pydgm.state.mg_phi)
+        self.assertFalse(pydgm.sweeper_1d.closure_cached)
+
+        pydgm.control.closure_cache_limit = 512.0
+
+        np.testing.assert_array_almost_equal(pydgm.state.mg_phi, phi_cached, 12)
+
     def tearDown(self):
         pydgm.solver.finalize_solver()
         pydgm.control.finalize_control()
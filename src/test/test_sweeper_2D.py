@@ -54,6 +54,59 @@ class TestSWEEPER_2D(unittest.TestCase):
         np.testing.assert_array_almost_equal(inc_y, np.ones(N) * 0.711895505609929, 12)
         np.testing.assert_array_almost_equal(Ps, np.ones(N) * 0.3559477528049645, 12)
 
+    def test_sweeper_closure_cache(self):
+        '''
+        Test that the cached step characteristic factors match the direct computation
+        '''
+        pydgm.control.equation_type = 'SC'
+
+        phi = pydgm.state.mg_phi.copy()
+        incident_x = pydgm.state.mg_incident_x.copy()
+        incident_y = pydgm.state.mg_incident_y.copy()
+
+        pydgm.sweeper_2d.apply_transport_operator_2d(pydgm.state.mg_phi)
+        self.assertTrue(pydgm.sweeper_2d.sc_cached)
+        phi_cached = pydgm.state.mg_phi.copy()
+
+        # Force the fallback by disabling the cache
+        pydgm.sweeper_2d.finalize_sweeper_2d()
+        pydgm.control.closure_cache_limit = 0.0
+        pydgm.state.mg_phi = phi
+        pydgm.state.mg_incident_x = incident_x
+        pydgm.state.mg_incident_y = incident_y
+
+        pydgm.sweeper_2d.apply_transport_operator_2d(pydgm.state.mg_phi)
+        self.assertFalse(pydgm.sweeper_2d.sc_cached)
+
+        pydgm.control.closure_cache_limit = 512.0
+        pydgm.control.equation_type = 'DD'
+
+        np.testing.assert_array_equal(pydgm.state.mg_phi, phi_cached)
+
+    def test_sweeper_closure_cache_key(self):
+        '''
+        Test that the cached factors are only rebuilt when the optical paths change
+        '''
+        pydgm.control.equation_type = 'SC'
+
+        pydgm.sweeper_2d.apply_transport_operator_2d(pydgm.state.mg_phi)
+        factors = pydgm.sweeper_2d.sc_attenuation.copy()
+
+        # The factors do not use the cross sections
+        pydgm.state.mg_sig_t = 2 * pydgm.state.mg_sig_t
+        pydgm.sweeper_2d.apply_transport_operator_2d(pydgm.state.mg_phi)
+        self.assertTrue(pydgm.sweeper_2d.sc_cached)
+        np.testing.assert_array_equal(pydgm.sweeper_2d.sc_attenuation, factors)
+
+        # A new mesh width rebuilds them
+        pydgm.mesh.dx = 2 * pydgm.mesh.dx
+        pydgm.sweeper_2d.apply_transport_operator_2d(pydgm.state.mg_phi)
+        self.assertTrue(pydgm.sweeper_2d.sc_cached)
+        np.testing.assert_array_equal(pydgm.sweeper_2d.sc_dx, pydgm.mesh.dx)
+        self.assertFalse(np.array_equal(pydgm.sweeper_2d.sc_attenuation, factors))
+
+        pydgm.control.equation_type = 'DD'
+
     def tearDown(self):
         pydgm.solver.finalize_solver()
         pydgm.control.finalize_control()